@@ -0,0 +1,113 @@
+import json
+import random
+import pytest
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from deval.llms.base_llm import BaseLLM
+from deval.llms.config import LLMAPIs, LLMArgs, LLMFormatType
+from deval.tasks.context import Context
+
+# pytest-benchmark is only needed for the benchmark suite, skip collection without it
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+
+MOCK_TOOL_RESPONSE = {
+    "context": "Alice: we need the report by Friday. Bob: I will send it over tomorrow morning.",
+    "claim": "Bob will send the report tomorrow morning.",
+    "action_item": "Bob: send the report tomorrow morning",
+    "response": "The report is due on Friday and Bob will send it tomorrow.",
+    "key_topics": [f"key topic {i}" for i in range(5)],
+    "summaries": [{"topic": f"key topic {i}", "summary": f"summary of key topic {i}"} for i in range(5)],
+    "query": "When is the report due?",
+    "answer": "The report is due on Friday.",
+}
+
+
+class MockLLM(BaseLLM):
+    """Offline LLM returning a fixed tool response that satisfies every task schema."""
+
+    def __init__(self, model_id: str = "mock-llm"):
+        super().__init__(LLMAPIs.OPENAI, model_id, LLMArgs(format=LLMFormatType.TEXT))
+
+    def query(
+        self, prompt: str, system_prompt: str, tool_schema: dict | None = None, max_tokens: int | None = None
+    ) -> str:
+        return self.forward(
+            [{"content": system_prompt, "role": "system"}, {"content": prompt, "role": "user"}],
+            tool_schema=tool_schema,
+        )
+
+    def forward(self, messages: list[dict[str, str]], tool_schema: dict | None = None) -> str:
+        return self.parse_response(MOCK_TOOL_RESPONSE)
+
+    def parse_response(self, output) -> str:
+        return json.dumps(output)
+
+    def load(self):
+        return None
+
+
+def make_wiki_context(num_sections: int = 8, words_per_section: int = 200) -> Context:
+    """Synthetic Wikipedia context so that wiki based tasks can run offline."""
+    rng = random.Random(42)
+    vocab = [f"word{i}" for i in range(500)]
+    sections = {
+        ("", f"Section {i}"): [" ".join(rng.choices(vocab, k=words_per_section))]
+        for i in range(num_sections)
+    }
+    content = "\n".join(["\n".join(s) for s in sections.values()])
+    return Context(
+        title="Synthetic article",
+        topic="All Sections",
+        subtopic=None,
+        content=content,
+        internal_links=[title for _, title in sections.keys()],
+        external_links=[],
+        source="Wikipedia",
+        sections=sections,
+        tags=[],
+        extra={},
+        stats={},
+    )
+
+
+@pytest.fixture
+def mock_llm() -> MockLLM:
+    return MockLLM()
+
+
+@pytest.fixture
+def wiki_context() -> Context:
+    return make_wiki_context()
+
+
+class _StubMinerHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps(
+            {"score": 0.5, "mistakes": ["a mistake"], "response_time": 0.01}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def stub_miner_server():
+    """Local stand-in for the miner-api container answering /eval_query."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubMinerHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(host="http://127.0.0.1", port=server.server_address[1])
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,100 @@
+import os
+import random
+import pytest
+from types import SimpleNamespace
+from deval.agent import HumanAgent
+from deval.api.models import EvalResponse, APIStatus
+from deval.protocol import BtEvalResponse
+from deval.rewards.pipeline import REWARD_MODELS
+from deval.rewards.models import RewardModelTypeEnum, RewardReferenceType
+from deval.rewards.reward import RewardResult
+from deval.task_repository import TASKS
+
+# the relevance model downloads embedding weights from HuggingFace
+ONLINE = os.getenv("DEVAL_BENCH_ONLINE", "0") == "1"
+OFFLINE_REWARD_MODELS = [name for name in REWARD_MODELS if ONLINE or name != "relevance"]
+
+
+def _uses_offline_models(task_name: str) -> bool:
+    base = TASKS[task_name]["base_function"]
+    definitions = base.reward_definition + base.penalty_definition
+    return all(d["name"] in OFFLINE_REWARD_MODELS for d in definitions)
+
+
+BENCH_TASKS = [task_name for task_name in TASKS if _uses_offline_models(task_name)]
+
+
+def make_mistakes(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(200)]
+    return [" ".join(rng.choices(vocab, k=12)) for _ in range(n)]
+
+
+def make_responses(task_name: str, n: int) -> list[BtEvalResponse]:
+    base = TASKS[task_name]["base_function"]
+    mistakes = make_mistakes(5)
+    task = SimpleNamespace(
+        name=task_name,
+        rag_context="synthetic context",
+        llm_response="synthetic response",
+        query="",
+        reference=0.6,
+        reference_mistakes=mistakes[:3],
+        reference_true_values=mistakes[3:],
+        reward_definition=base.reward_definition,
+        penalty_definition=base.penalty_definition,
+    )
+    agent = HumanAgent(task=task)
+
+    return [
+        BtEvalResponse(
+            uid=i,
+            response=EvalResponse(
+                score=round(random.Random(i).random(), 2),
+                mistakes=mistakes[i % 5:],
+                response_time=1.0,
+                status_message=APIStatus.SUCCESS,
+            ),
+            human_agent=agent,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def reward_pipeline() -> dict:
+    return {name: REWARD_MODELS[name](device="cpu") for name in OFFLINE_REWARD_MODELS}
+
+
+@pytest.mark.parametrize("task_name", BENCH_TASKS)
+@pytest.mark.parametrize("num_responses", [1, 30, 120])
+def test_reward_result(benchmark, reward_pipeline, task_name, num_responses):
+    responses = make_responses(task_name, num_responses)
+    result = benchmark(RewardResult, reward_pipeline, responses=responses, device="cpu")
+    assert len(result.rewards) == num_responses
+
+
+@pytest.mark.parametrize("model_name", OFFLINE_REWARD_MODELS)
+def test_reward_model_apply(benchmark, reward_pipeline, model_name):
+    model = reward_pipeline[model_name]
+    definition = next(
+        d
+        for task in TASKS.values()
+        for d in task["base_function"].reward_definition + task["base_function"].penalty_definition
+        if d["name"] == model_name
+    )
+    if definition["reference_type"] == RewardReferenceType.SCORE:
+        reference, completion = 1.0, 0.8
+    else:
+        reference, completion = make_mistakes(10, seed=1), make_mistakes(10, seed=2)
+
+    benchmark(model.apply, reference, completion, reward_type=RewardModelTypeEnum.WEIGHTED_REWARD)
+
+
+@pytest.mark.parametrize("num_mistakes", [10, 50, 200])
+def test_exact_match_large_mistake_lists(benchmark, reward_pipeline, num_mistakes):
+    model = reward_pipeline["exact_match"]
+    reference = make_mistakes(num_mistakes, seed=1)
+    completion = make_mistakes(num_mistakes, seed=2)
+
+    benchmark.pedantic(model.reward, args=(reference, completion), rounds=3, iterations=1)
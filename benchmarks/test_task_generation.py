@@ -0,0 +1,31 @@
+import random
+import pytest
+from deval.task_repository import TASKS
+from deval.tools import WikiDataset
+
+TASK_FUNCTIONS = [
+    (task_name, task["task_function"], task["dataset"])
+    for task_name, definition in TASKS.items()
+    for task in definition["tasks"]
+]
+
+
+@pytest.mark.parametrize(
+    "task_name, task_function, dataset",
+    TASK_FUNCTIONS,
+    ids=[task_function.__name__ for _, task_function, _ in TASK_FUNCTIONS],
+)
+def test_task_generation(benchmark, mock_llm, wiki_context, task_name, task_function, dataset):
+    random.seed(42)
+
+    # wikipedia is replaced with a synthetic article so the benchmark runs offline
+    if dataset is WikiDataset:
+        make_context = lambda: wiki_context
+    else:
+        make_context = dataset().next
+
+    def run():
+        return task_function(llm_pipeline=mock_llm, context=make_context())
+
+    task = benchmark(run)
+    assert task.name == task_name
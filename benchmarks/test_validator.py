@@ -0,0 +1,83 @@
+import os
+import torch
+import random
+import pytest
+from types import SimpleNamespace
+from deval.api.miner_docker_client import MinerDockerClient
+from deval.api.models import EvalRequest, APIStatus
+from deval.base.validator import BaseValidatorNeuron
+from deval.contest import DeValContest
+from deval.model.utils import compute_model_hash
+
+NUM_UIDS = 256
+HASH_SIZE_GBS = float(os.getenv("DEVAL_BENCH_HASH_GBS", "2"))
+
+
+def make_avg_rewards(n: int = NUM_UIDS, seed: int = 0) -> list[tuple[int, float]]:
+    rng = random.Random(seed)
+    return [(uid, rng.random()) for uid in range(n)]
+
+
+def make_contest(n: int = NUM_UIDS) -> DeValContest:
+    contest = DeValContest(reward_pipeline=None, forward_start_time=0, timeout=20)
+    for uid in range(n):
+        contest.model_hashes[f"hash_{uid}"] = SimpleNamespace(uid=uid, block=1000 + uid)
+    return contest
+
+
+@pytest.fixture(scope="module")
+def sparse_model_dir(tmp_path_factory):
+    """Sparse safetensors shards so that hashing is measured without using real disk space."""
+    model_dir = tmp_path_factory.mktemp("model")
+    shard_size = int(HASH_SIZE_GBS * 1024 ** 3 / 2)
+    for i in range(2):
+        with open(model_dir / f"model-0000{i}-of-00002.safetensors", "wb") as f:
+            f.truncate(shard_size)
+    return str(model_dir)
+
+
+def test_compute_model_hash(benchmark, sparse_model_dir):
+    benchmark.pedantic(compute_model_hash, args=(sparse_model_dir,), rounds=1, iterations=1)
+
+
+def test_rank_and_select_winners(benchmark):
+    avg_rewards = make_avg_rewards()
+
+    def setup():
+        return (make_contest(),), {}
+
+    def run(contest):
+        return contest.rank_and_select_winners(avg_rewards)
+
+    weights = benchmark.pedantic(run, setup=setup, rounds=20)
+    assert len(weights) == NUM_UIDS
+
+
+def test_update_scores(benchmark):
+    rng = random.Random(0)
+    avg_rewards = {uid: sum(rng.random() for _ in range(30)) / 30 for uid in range(NUM_UIDS)}
+    validator = SimpleNamespace(
+        metagraph=SimpleNamespace(n=NUM_UIDS),
+        device="cpu",
+        scores=torch.zeros(NUM_UIDS),
+    )
+
+    scores = benchmark(BaseValidatorNeuron.update_scores, validator, avg_rewards)
+    assert len(scores) == NUM_UIDS
+
+
+def test_query_eval(benchmark, stub_miner_server):
+    client = MinerDockerClient()
+    client.host = stub_miner_server.host
+    client.port = stub_miner_server.port
+    client.api_url = f"{client.host}:{client.port}"
+
+    request = EvalRequest(
+        tasks=["hallucination"],
+        rag_context="synthetic context " * 200,
+        query="",
+        llm_response="synthetic response",
+    )
+
+    response = benchmark(client.query_eval, request, 10)
+    assert response.status_message == APIStatus.SUCCESS
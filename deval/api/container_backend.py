@@ -0,0 +1,223 @@
+import json
+import os
+import queue
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import bittensor as bt
+
+from deval.api.docker_engine import DockerEngineAPI, DockerEngineError
+
+
+# the miner-api image built from docker-compose.yml, reused for every miner
+MINER_API_IMAGE = "de-val-miner-api:latest"
+MINER_API_NETWORK = "de-val-miner-net"
+
+# container events after which the miner api will not become ready without a restart
+EXIT_EVENTS = ("die", "oom", "destroy")
+
+
+@dataclass
+class ContainerSpec:
+    """The settings of the miner-api service in docker-compose.yml, applied directly when creating the container."""
+    name: str
+    image: str = MINER_API_IMAGE
+    env: dict[str, str] = field(default_factory=dict)
+    ports: dict[int, int] = field(default_factory=lambda: {8000: 8000}) # container port -> host port
+    network: str | None = MINER_API_NETWORK
+    cap_drop: list[str] = field(default_factory=lambda: ["ALL"])
+    cap_add: list[str] = field(default_factory=lambda: ["NET_BIND_SERVICE", "NET_ADMIN", "NET_RAW", "SETUID", "SETGID"])
+    security_opt: list[str] = field(default_factory=lambda: ["no-new-privileges"])
+    gpus: bool = True
+
+    def to_engine_config(self) -> dict:
+        host_config = {
+            "PortBindings": {f"{port}/tcp": [{"HostPort": str(host)}] for port, host in self.ports.items()},
+            "CapDrop": self.cap_drop,
+            "CapAdd": self.cap_add,
+            "SecurityOpt": self.security_opt,
+        }
+        if self.network:
+            host_config["NetworkMode"] = self.network
+        if self.gpus:
+            host_config["DeviceRequests"] = [{"Driver": "nvidia", "Count": -1, "Capabilities": [["gpu"]]}]
+
+        return {
+            "Image": self.image,
+            "Env": [f"{key}={value}" for key, value in self.env.items()],
+            "ExposedPorts": {f"{port}/tcp": {} for port in self.ports},
+            "HostConfig": host_config,
+        }
+
+
+class ContainerBackend(ABC):
+    """Creates and tears down the miner-api container."""
+
+    @abstractmethod
+    def ensure_image(self, spec: ContainerSpec) -> None:
+        """Makes sure the image of the spec exists, building it only when it is missing."""
+
+    @abstractmethod
+    def recreate(self, spec: ContainerSpec) -> None:
+        """Replaces any existing container of the same name with a new one running the spec, and starts it."""
+
+    @abstractmethod
+    def stop(self, name: str) -> None:
+        """Stops and removes the container."""
+
+    @abstractmethod
+    def remove_image(self, image: str) -> None:
+        pass
+
+    @abstractmethod
+    def is_running(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def events(self, name: str, since: float | None = None) -> Iterator[dict]:
+        """Yields the lifecycle events of the container, e.g. {"status": "die", ...}, until the stream is closed.
+
+        With `since`, a unix timestamp, the events from that time on are replayed before the new ones.
+        """
+
+
+class DockerEngineBackend(ContainerBackend):
+    """Talks to the Docker Engine API directly, so no docker CLI process is started per miner.
+
+    Only building the image goes through docker compose, as the build context is defined in docker-compose.yml, and
+    that happens once for as long as the image is kept.
+    """
+
+    def __init__(self, engine: DockerEngineAPI | None = None, compose_service: str = "miner-api"):
+        self.engine = engine or DockerEngineAPI()
+        self.compose_service = compose_service
+
+    def ensure_image(self, spec: ContainerSpec) -> None:
+        if not self.engine.image_exists(spec.image):
+            bt.logging.info(f"Building image {spec.image}...")
+            subprocess.run(["docker", "compose", "build", self.compose_service], check=True)
+
+    def recreate(self, spec: ContainerSpec) -> None:
+        self.ensure_image(spec)
+        if spec.network:
+            self.engine.ensure_network(spec.network)
+
+        try:
+            self.engine.remove_container(spec.name, force=True)
+        except DockerEngineError as e:
+            if e.status != 404:
+                raise
+
+        self.engine.create_container(spec.name, spec.to_engine_config())
+        self.engine.start_container(spec.name)
+
+    def stop(self, name: str) -> None:
+        try:
+            self.engine.stop_container(name)
+            self.engine.remove_container(name, force=True)
+        except DockerEngineError as e:
+            if e.status != 404:
+                raise
+
+    def remove_image(self, image: str) -> None:
+        self.engine.remove_image(image)
+
+    def is_running(self, name: str) -> bool:
+        try:
+            return self.engine.inspect_container(name)["State"]["Running"]
+        except DockerEngineError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def events(self, name: str, since: float | None = None) -> Iterator[dict]:
+        return self.engine.events({"container": [name], "type": ["container"]}, since=since)
+
+
+class ComposeBackend(ContainerBackend):
+    """The docker compose CLI, kept for hosts where the validator can not reach the Docker socket."""
+
+    def ensure_image(self, spec: ContainerSpec) -> None:
+        subprocess.run(["docker", "compose", "build", spec.name], check=True)
+
+    def recreate(self, spec: ContainerSpec) -> None:
+        env = {**os.environ, **spec.env}
+        subprocess.run(["docker", "compose", "up", "--force-recreate", "-d", spec.name], env=env, check=True)
+
+    def stop(self, name: str) -> None:
+        subprocess.run(["docker", "compose", "stop", name], check=True)
+        subprocess.run(["docker", "compose", "rm", "-f", name], check=True)
+
+    def remove_image(self, image: str) -> None:
+        subprocess.run(["docker", "rmi", image], check=True)
+
+    def is_running(self, name: str) -> bool:
+        result = subprocess.run(["docker", "compose", "ps", "-q", name], capture_output=True, text=True)
+        return bool(result.stdout.strip())
+
+    def events(self, name: str, since: float | None = None) -> Iterator[dict]:
+        process = subprocess.Popen(
+            ["docker", "events", "--filter", f"container={name}", "--format", "{{json .}}"]
+            + (["--since", f"{since:.9f}"] if since is not None else []),
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        try:
+            for line in process.stdout:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            process.terminate()
+
+
+class FakeBackend(ContainerBackend):
+    """In memory backend for tests, recording the calls and emitting the events a daemon would."""
+
+    def __init__(self):
+        self.images: set[str] = set()
+        self.containers: dict[str, ContainerSpec] = {}
+        self.calls: list[tuple[str, str]] = []
+        self.builds = 0
+        self.event_queue = queue.Queue()
+
+    def emit(self, name: str, status: str) -> None:
+        self.event_queue.put({
+            "status": status, "id": name, "timeNano": time.time_ns(), "Actor": {"Attributes": {"name": name}}
+        })
+
+    def close_events(self) -> None:
+        self.event_queue.put(None)
+
+    def ensure_image(self, spec: ContainerSpec) -> None:
+        if spec.image not in self.images:
+            self.builds += 1
+            self.images.add(spec.image)
+
+    def recreate(self, spec: ContainerSpec) -> None:
+        self.ensure_image(spec)
+        self.calls.append(("recreate", spec.name))
+        if spec.name in self.containers:
+            self.emit(spec.name, "destroy")
+        self.containers[spec.name] = spec
+        self.emit(spec.name, "start")
+
+    def stop(self, name: str) -> None:
+        self.calls.append(("stop", name))
+        if self.containers.pop(name, None) is not None:
+            self.emit(name, "die")
+
+    def remove_image(self, image: str) -> None:
+        self.calls.append(("remove_image", image))
+        self.images.discard(image)
+
+    def is_running(self, name: str) -> bool:
+        return name in self.containers
+
+    def events(self, name: str, since: float | None = None) -> Iterator[dict]:
+        # the queue keeps the events emitted before the subscription, so `since` is already honoured
+        while (event := self.event_queue.get()) is not None:
+            if event["id"] == name:
+                yield event
@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import bittensor as bt
+
+from deval.api.docker_engine import DockerEngineAPI, DockerEngineError
+
+
+GB = 1024 ** 3
+
+
+@dataclass
+class ContainerStats:
+    disk_gb: float | None
+    memory_gb: float | None
+    cpu_percent: float | None
+    sampled_at: float
+
+
+@dataclass
+class LimitViolation:
+    resource: str
+    value: float
+    limit: float
+    detected_at: float
+
+    def __str__(self) -> str:
+        return f"{self.resource} at {self.value:.2f} exceeds the limit of {self.limit:.2f}"
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the files below path, without following symlinks."""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+class ContainerMonitor:
+    """Samples the disk, memory and CPU usage of a container on a background thread.
+
+    The evaluation loop only reads the latest cached readings. The writable layer is measured from the overlay upper
+    directory when it is visible to this process, and otherwise through the Engine API `size` query, which is what
+    `docker inspect --size` does but off the evaluation path. Readings above a limit are recorded as violations and
+    passed to `on_violation` from the monitor thread.
+    """
+
+    def __init__(
+        self,
+        container_name: str,
+        engine: DockerEngineAPI | None = None,
+        sample_interval: float = 5.0,
+        max_disk_gb: float | None = None,
+        max_memory_gb: float | None = None,
+        on_violation: Callable[[LimitViolation], None] | None = None,
+    ):
+        self.container_name = container_name
+        self.engine = engine or DockerEngineAPI()
+        self.sample_interval = sample_interval
+        self.max_disk_gb = max_disk_gb
+        self.max_memory_gb = max_memory_gb
+        self.on_violation = on_violation
+
+        self.lock = threading.Lock()
+        self.sampled = threading.Condition(self.lock)
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets the readings of the previous container, to be called whenever the container is recreated."""
+        with self.lock:
+            self.latest: ContainerStats | None = None
+            self.violations: list[LimitViolation] = []
+            self.upper_dir: str | None = None
+            self.previous_cpu: tuple[int, int] | None = None
+            self.generation = getattr(self, "generation", 0) + 1
+        self.wakeup.set()
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.sample_interval + 1)
+            self.thread = None
+
+    def wait_for_sample(self, timeout: float) -> ContainerStats | None:
+        """The latest readings, waiting up to timeout seconds for the first sample after a reset."""
+        with self.sampled:
+            self.sampled.wait_for(lambda: self.latest is not None, timeout=timeout)
+            return self.latest
+
+    @property
+    def disk_gb(self) -> float | None:
+        latest = self.latest
+        return latest.disk_gb if latest is not None else None
+
+    @property
+    def violation(self) -> LimitViolation | None:
+        """The first limit violation since the last reset."""
+        violations = self.violations
+        return violations[0] if violations else None
+
+    def sample(self) -> ContainerStats:
+        with self.lock:
+            generation = self.generation
+
+        stats = ContainerStats(
+            disk_gb=self._disk_gb(),
+            memory_gb=None,
+            cpu_percent=None,
+            sampled_at=time.time(),
+        )
+        try:
+            stats.memory_gb, stats.cpu_percent = self._memory_and_cpu()
+        except (OSError, DockerEngineError, ValueError, KeyError, TypeError) as e:
+            bt.logging.debug(f"Unable to read stats of {self.container_name}: {e}")
+
+        violations = [
+            LimitViolation(resource, value, limit, stats.sampled_at)
+            for resource, value, limit in (
+                ("disk_gb", stats.disk_gb, self.max_disk_gb),
+                ("memory_gb", stats.memory_gb, self.max_memory_gb),
+            )
+            if value is not None and limit is not None and value > limit
+        ]
+
+        with self.sampled:
+            # readings of a container that was replaced while sampling are dropped
+            if generation != self.generation:
+                return stats
+            self.latest = stats
+            self.violations.extend(violations)
+            self.sampled.notify_all()
+
+        for violation in violations:
+            bt.logging.warning(f"Container {self.container_name} limit violation: {violation}")
+            if self.on_violation is not None:
+                self.on_violation(violation)
+
+        return stats
+
+    def _disk_gb(self) -> float | None:
+        try:
+            if self.upper_dir is None:
+                info = self.engine.inspect_container(self.container_name)
+                upper_dir = (info.get("GraphDriver") or {}).get("Data", {}).get("UpperDir")
+                self.upper_dir = upper_dir if upper_dir and os.path.isdir(upper_dir) else ""
+
+            if self.upper_dir:
+                return directory_size(self.upper_dir) / GB
+
+            info = self.engine.inspect_container(self.container_name, size=True)
+            return info.get("SizeRw", 0) / GB
+
+        except (OSError, DockerEngineError, ValueError) as e:
+            bt.logging.debug(f"Unable to read the disk usage of {self.container_name}: {e}")
+            return None
+
+    def _memory_and_cpu(self) -> tuple[float | None, float | None]:
+        stats = self.engine.container_stats(self.container_name)
+
+        memory = stats.get("memory_stats") or {}
+        memory_gb = None
+        if "usage" in memory:
+            # same as the docker CLI, the page cache that can be reclaimed is not counted
+            cache = (memory.get("stats") or {}).get("inactive_file", 0)
+            memory_gb = (memory["usage"] - cache) / GB
+
+        cpu = stats.get("cpu_stats") or {}
+        cpu_percent = None
+        if "system_cpu_usage" in cpu:
+            current = (cpu["cpu_usage"]["total_usage"], cpu["system_cpu_usage"])
+            if self.previous_cpu is not None:
+                cpu_delta = current[0] - self.previous_cpu[0]
+                system_delta = current[1] - self.previous_cpu[1]
+                online_cpus = cpu.get("online_cpus") or len(cpu["cpu_usage"].get("percpu_usage") or [1])
+                if system_delta > 0:
+                    cpu_percent = cpu_delta / system_delta * online_cpus * 100
+            self.previous_cpu = current
+
+        return memory_gb, cpu_percent
+
+    def _run(self) -> None:
+        while not self.stopped.is_set():
+            self.wakeup.clear()
+            try:
+                self.sample()
+            except Exception as e:
+                bt.logging.warning(f"Container monitor failed to sample {self.container_name}: {e}")
+            self.wakeup.wait(self.sample_interval)
@@ -0,0 +1,130 @@
+import http.client
+import json
+import os
+import socket
+from typing import Iterator
+from urllib.parse import quote, urlencode
+
+
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+
+
+class DockerEngineError(Exception):
+    """Raised when the Docker Engine API answers with an error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker Engine API error {status}: {message}")
+        self.status = status
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def docker_socket_path() -> str:
+    """The unix socket of the Docker daemon, honouring a unix:// DOCKER_HOST."""
+    host = os.getenv("DOCKER_HOST", "")
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return DEFAULT_DOCKER_SOCKET
+
+
+class DockerEngineAPI:
+    """Minimal client for the Docker Engine API, talking to the daemon over its unix socket.
+
+    Each request opens a short lived connection, so a single instance can be shared between threads.
+    """
+
+    def __init__(self, socket_path: str | None = None, timeout: float = 30):
+        self.socket_path = socket_path or docker_socket_path()
+        self.timeout = timeout
+
+    def _send(self, method: str, path: str, body: dict | None, timeout: float | None):
+        connection = UnixHTTPConnection(self.socket_path, timeout)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = connection.getresponse()
+
+        if response.status >= 400:
+            data = response.read()
+            connection.close()
+            try:
+                message = json.loads(data).get("message", "")
+            except ValueError:
+                message = data.decode(errors="replace")
+            raise DockerEngineError(response.status, message)
+
+        return connection, response
+
+    def request(self, method: str, path: str, body: dict | None = None, timeout: float | None = None):
+        connection, response = self._send(method, path, body, timeout or self.timeout)
+        try:
+            data = response.read()
+        finally:
+            connection.close()
+        return json.loads(data) if data else None
+
+    def stream(self, method: str, path: str, body: dict | None = None) -> Iterator[dict]:
+        """Yields the newline delimited JSON objects of a streaming endpoint until the daemon closes it."""
+        connection, response = self._send(method, path, body, None)
+        try:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+    def inspect_container(self, name: str, size: bool = False) -> dict:
+        return self.request("GET", f"/containers/{quote(name)}/json" + ("?size=1" if size else ""))
+
+    def container_stats(self, name: str) -> dict:
+        """A single stats snapshot, returned at once instead of waiting a second for the previous CPU reading."""
+        return self.request("GET", f"/containers/{quote(name)}/stats?stream=false&one-shot=true")
+
+    def image_exists(self, image: str) -> bool:
+        try:
+            self.request("GET", f"/images/{quote(image)}/json")
+            return True
+        except DockerEngineError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def remove_image(self, image: str) -> None:
+        self.request("DELETE", f"/images/{quote(image)}")
+
+    def ensure_network(self, name: str) -> None:
+        try:
+            self.request("GET", f"/networks/{quote(name)}")
+        except DockerEngineError as e:
+            if e.status != 404:
+                raise
+            self.request("POST", "/networks/create", {"Name": name, "Driver": "bridge", "CheckDuplicate": True})
+
+    def create_container(self, name: str, config: dict) -> str:
+        return self.request("POST", f"/containers/create?{urlencode({'name': name})}", config)["Id"]
+
+    def start_container(self, name: str) -> None:
+        self.request("POST", f"/containers/{quote(name)}/start")
+
+    def stop_container(self, name: str, timeout: int = 10) -> None:
+        # the request outlives the grace period the daemon waits before killing the container
+        self.request("POST", f"/containers/{quote(name)}/stop?t={timeout}", timeout=self.timeout + timeout)
+
+    def remove_container(self, name: str, force: bool = False) -> None:
+        self.request("DELETE", f"/containers/{quote(name)}?force={str(force).lower()}")
+
+    def events(self, filters: dict[str, list[str]], since: float | None = None) -> Iterator[dict]:
+        query = {"filters": json.dumps(filters)}
+        if since is not None:
+            query["since"] = f"{since:.9f}"
+        return self.stream("GET", f"/events?{urlencode(query)}")
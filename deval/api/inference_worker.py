@@ -0,0 +1,158 @@
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+class WorkerSaturated(Exception):
+    """Raised when the request queue of the inference worker is full."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Inference queue is full, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class InferenceJob:
+    requests: list[dict]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class InferenceWorker:
+    """Runs the blocking pipeline on a dedicated thread so the event loop stays responsive.
+
+    Requests are placed on a bounded queue. The worker drains whatever is waiting, up to max_batch_size requests
+    or max_batch_wait seconds, and evaluates it as a single micro-batch when the pipeline supports evaluate_batch.
+    """
+
+    def __init__(
+        self,
+        pipe,
+        max_queue_size: int = 16,
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.01,
+    ):
+        self.pipe = pipe
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.processed = 0
+        self.rejected = 0
+        self.avg_request_time = None
+
+        self.thread = None
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def retry_after(self) -> float:
+        """Estimated seconds until the queued work has been processed."""
+        avg_request_time = self.avg_request_time or 1.0
+        return max(1.0, (self.queue.qsize() + self.in_flight) * avg_request_time)
+
+    async def submit(self, requests: list[dict]) -> list[dict]:
+        """Queues the requests and waits for their completions, raising WorkerSaturated when the queue is full."""
+        if not requests:
+            return []
+
+        loop = asyncio.get_running_loop()
+        job = InferenceJob(requests=requests, future=loop.create_future(), loop=loop)
+
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise WorkerSaturated(self.retry_after())
+
+        return await job.future
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "in_flight": self.in_flight,
+                "processed": self.processed,
+                "rejected": self.rejected,
+                "avg_request_time": self.avg_request_time,
+            }
+
+    def _collect(self, first: InferenceJob) -> list[InferenceJob]:
+        """Gathers further queued jobs into the micro-batch of `first`."""
+        jobs = [first]
+        num_requests = len(first.requests)
+        deadline = time.time() + self.max_batch_wait
+
+        while num_requests < self.max_batch_size:
+            timeout = deadline - time.time()
+            try:
+                job = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            jobs.append(job)
+            num_requests += len(job.requests)
+
+        return jobs
+
+    def _evaluate(self, requests: list[dict]) -> list[dict]:
+        # fall back to one query at a time for pipelines without batch support
+        if len(requests) > 1 and hasattr(self.pipe, "evaluate_batch"):
+            return self.pipe.evaluate_batch(requests)
+        return [self.pipe("", **r) for r in requests]
+
+    @staticmethod
+    def _resolve(job: InferenceJob, result=None, error: Exception | None = None) -> None:
+        def set_result():
+            # the client may have disconnected and cancelled the future in the meantime
+            if job.future.done():
+                return
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+        job.loop.call_soon_threadsafe(set_result)
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._collect(self.queue.get())
+            requests = [r for job in jobs for r in job.requests]
+
+            with self.lock:
+                self.in_flight = len(requests)
+
+            start_time = time.time()
+            try:
+                completions = self._evaluate(requests)
+            except Exception as e:
+                print(f"Failed with error: {e}")
+                for job in jobs:
+                    self._resolve(job, error=e)
+                completions = None
+
+            if completions is not None:
+                offset = 0
+                for job in jobs:
+                    self._resolve(job, result=completions[offset:offset + len(job.requests)])
+                    offset += len(job.requests)
+
+            # nothing after the jobs are resolved may end the loop, it is the only thread serving the queue
+            try:
+                request_time = (time.time() - start_time) / max(len(requests), 1)
+                with self.lock:
+                    self.in_flight = 0
+                    self.processed += len(requests)
+                    self.avg_request_time = (
+                        request_time if self.avg_request_time is None
+                        else 0.8 * self.avg_request_time + 0.2 * request_time
+                    )
+            except Exception as e:
+                print(f"Failed to update the worker stats: {e}")
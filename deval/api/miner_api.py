@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import math
 import os
 import time
-from deval.api.models import EvalRequest, EvalResponse, ModelHashResponse, APIStatus, ModelColdkeyResponse
+from deval.api.models import EvalRequest, EvalResponse, EvalBatchRequest, EvalBatchResponse, ModelHashResponse, APIStatus, ModelColdkeyResponse, WorkerStatsResponse, LoadTimingsResponse
+from deval.api.inference_worker import InferenceWorker, WorkerSaturated
 from deval.model.huggingface_model import HuggingFaceModel
 import sys
 import hashlib
@@ -13,27 +16,92 @@ model_dir = "/app/eval_llm"
 sys.path.append(model_dir) # matches to the location of the mounted directory
 model_url = os.getenv("MODEL_URL", "")
 
-if model_url != "":
-    model_dir = HuggingFaceModel.pull_model_and_files(model_url)
+# synthetic query run through pipelines without a warmup method before the api reports ready
+WARMUP_REQUEST = {
+    "tasks": ["hallucination"],
+    "rag_context": "The earth is round. The sky is blue.",
+    "query": "",
+    "llm_response": "The sky is green.",
+}
+
+# seconds spent in each startup phase, exposed through /load_timings
+load_timings = {}
+
+def timed_phase(name: str, fn, *args, **kwargs):
+    start_time = time.time()
+    result = fn(*args, **kwargs)
+    load_timings[name] = time.time() - start_time
+    print(f"{name} took {load_timings[name]:.2f}s")
+    return result
 
+def import_pipeline():
     from model.pipeline import DeValPipeline
-    pipe = DeValPipeline("de_val", model_dir = model_dir)
+    return DeValPipeline
+
+def warmup(pipe):
+    if hasattr(pipe, "warmup"):
+        pipe.warmup()
+    else:
+        pipe("", **WARMUP_REQUEST)
+
+
+worker = None
+if model_url != "":
+    startup_time = time.time()
+    model_dir = timed_phase("pull_model", HuggingFaceModel.pull_model_and_files, model_url)
+
+    DeValPipeline = timed_phase("import_pipeline", import_pipeline)
+    pipe = timed_phase("load_pipeline", DeValPipeline, "de_val", model_dir = model_dir)
     print("SUCCESFULLY LOADED PIPELINE")
 
+    # the first generation pays for lazy initialization, so it happens here rather than within a validator timeout
+    try:
+        timed_phase("warmup", warmup, pipe)
+    except Exception as e:
+        print(f"Warmup failed with error: {e}")
+
+    # finer grained phases reported by the pipeline itself, e.g. tokenizer and weights loading
+    load_timings.update({f"pipeline.{k}": v for k, v in getattr(pipe, "load_timings", {}).items()})
+    load_timings["total"] = time.time() - startup_time
+
+    # inference runs on its own thread so health and hash requests are answered during generation
+    worker = InferenceWorker(
+        pipe,
+        max_queue_size = int(os.getenv("MAX_QUEUE_SIZE", 16)),
+        max_batch_size = int(os.getenv("MAX_BATCH_SIZE", 8)),
+        max_batch_wait = float(os.getenv("MAX_BATCH_WAIT", 0.01)),
+    )
+    worker.start()
+
+
+@app.exception_handler(WorkerSaturated)
+async def worker_saturated_handler(request: Request, exc: WorkerSaturated) -> JSONResponse:
+    return JSONResponse(
+        status_code = 429,
+        content = {"detail": str(exc), "retry_after": exc.retry_after},
+        headers = {"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+def model_unavailable() -> JSONResponse:
+    return JSONResponse(
+        status_code = 503,
+        content = {"detail": "Model is not loaded"},
+        headers = {"Retry-After": "30"},
+    )
+
 
 
 @app.post("/eval_query")
 async def query_model(request: EvalRequest) -> EvalResponse:
     """Process a user query through the miner's model."""
-    start_time = time.time()
-    tasks = request.tasks
-    rag_context = request.rag_context
-    query = request.query
-    llm_response = request.llm_response
+    if worker is None:
+        return model_unavailable()
 
-    completion = pipe("", tasks=tasks, rag_context=rag_context, query=query, llm_response=llm_response)
-    process_time = time.time() - start_time
+    start_time = time.time()
     try:
+        completion = (await worker.submit([request.dict()]))[0]
+        process_time = time.time() - start_time
         print(f"Completion: {completion}")
         score = completion.get("score_completion", None)
         if score is None:
@@ -48,19 +116,71 @@ async def query_model(request: EvalRequest) -> EvalResponse:
             response_time = process_time,
             status_message = APIStatus.SUCCESS
         )
+    except WorkerSaturated:
+        raise
     except Exception as e:
         print(f"Failed with error: {e}")
         return EvalResponse(
             score = -1.0,
             mistakes = [],
-            response_time = process_time,
+            response_time = time.time() - start_time,
             status_message = APIStatus.ERROR
         )
         
 
 
+@app.post("/eval_query_batch")
+async def query_model_batch(request: EvalBatchRequest) -> EvalBatchResponse:
+    """Process many user queries through the miner's model in shared batches."""
+    if worker is None:
+        return model_unavailable()
+
+    start_time = time.time()
+    requests = [r.dict() for r in request.requests]
+    if not requests:
+        return EvalBatchResponse(responses=[])
+
+    try:
+        completions = await worker.submit(requests)
+    except WorkerSaturated:
+        raise
+    except Exception as e:
+        print(f"Failed with error: {e}")
+        completions = [{} for _ in requests]
+
+    # the batch is processed together so each query is assigned an equal share of the time
+    process_time = (time.time() - start_time) / len(requests)
+
+    responses = []
+    for completion in completions:
+        score = completion.get("score_completion", None)
+        responses.append(EvalResponse(
+            score = score if score is not None else -1,
+            mistakes = completion.get("mistakes_completion", None),
+            response_time = process_time,
+            status_message = APIStatus.SUCCESS if completion else APIStatus.ERROR
+        ))
+
+    return EvalBatchResponse(responses=responses)
+
+
+@app.get("/load_timings")
+async def get_load_timings() -> LoadTimingsResponse:
+    """Seconds spent in each phase of loading and warming up the model."""
+    return LoadTimingsResponse(timings=load_timings)
+
+
+@app.get("/worker_stats")
+async def worker_stats() -> WorkerStatsResponse:
+    """Queue depth and in-flight requests of the inference worker."""
+    if worker is None:
+        return model_unavailable()
+    return WorkerStatsResponse(**worker.stats())
+
+
+# hashing reads the whole model from disk, so this is a sync endpoint served from the threadpool
 @app.get("/get_model_hash")
-async def get_model_hash()-> ModelHashResponse:
+def get_model_hash()-> ModelHashResponse:
     hash_value = compute_model_hash(model_dir)
     print(f"Hash of model: {hash_value}")
     return ModelHashResponse(hash =hash_value)
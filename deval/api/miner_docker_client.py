@@ -1,28 +1,110 @@
 import requests
 from deval.protocol import init_request_from_task
-from deval.api.models import EvalRequest, EvalResponse, APIStatus
+from deval.api.models import EvalRequest, EvalResponse, EvalBatchRequest, APIStatus
 import time
-import subprocess
+import threading
 import bittensor as bt
 import os
 from requests.exceptions import Timeout
-import json
+from deval.utils.tracing import tracer
+from deval.api.container_monitor import ContainerMonitor
+from deval.api.container_backend import (
+    ContainerBackend, ContainerSpec, ComposeBackend, DockerEngineBackend, EXIT_EVENTS, MINER_API_IMAGE
+)
+
+# settings of the host passed through to the miner-api container, as in docker-compose.yml
+PASSTHROUGH_ENV = ("MODEL_CPU_DTYPE", "MODEL_CPU_INT8")
+
+
+def create_backend(name: str) -> ContainerBackend:
+    if name == "compose":
+        return ComposeBackend()
+    if name == "engine":
+        return DockerEngineBackend()
+    raise ValueError(f"Unknown container backend: {name}")
+
 
 class MinerDockerClient:
+    event_retry_interval = 5
 
-    def __init__(self):
+    def __init__(
+        self, 
+        max_disk_gb: float | None = None, 
+        max_memory_gb: float | None = None,
+        backend: ContainerBackend | None = None,
+    ):
         self.service_name = "miner-api"
         self.host = f"http://0.0.0.0" 
         self.port = 8000
         self.api_url = f"{self.host}:{self.port}"
+        self.backend = backend or create_backend(os.getenv("CONTAINER_BACKEND", "engine"))
+        self.monitor = ContainerMonitor(
+            self.service_name,
+            sample_interval=float(os.getenv("CONTAINER_SAMPLE_INTERVAL", 5)),
+            max_disk_gb=max_disk_gb,
+            max_memory_gb=max_memory_gb,
+        )
+
+        # set by the event watcher once the container started after the last restart, and once it exited again
+        self.container_started = threading.Event()
+        self.container_exited = threading.Event()
+        # time of the last restart in ns, events before it belong to the replaced container
+        self.restarted_at = 0
+        self.event_thread = None
+        self.closed = threading.Event()
+
+    def _watch_events(self, since: int):
+        """Follows the container events until the client is closed, reconnecting whenever the stream ends.
+
+        Events are requested from `since` on, the time the watcher was started and later the last event seen, so a
+        start that happened before the stream connected is replayed rather than missed.
+        """
+        while not self.closed.is_set():
+            try:
+                for event in self.backend.events(self.service_name, since=since / 1e9):
+                    event_time = event.get("timeNano", 0)
+                    # events up to `since` were handled before the stream reconnected
+                    if event_time and event_time <= since:
+                        continue
+                    since = max(since, event_time)
+                    if event_time and event_time < self.restarted_at:
+                        continue
+
+                    status = event.get("status") or event.get("Action")
+                    if status == "start":
+                        self.container_started.set()
+                    # exit events of the replaced container arrive before the start of the new one
+                    elif status in EXIT_EVENTS and self.container_started.is_set():
+                        bt.logging.warning(f"{self.service_name} container event: {status}")
+                        self.container_exited.set()
+                    if self.closed.is_set():
+                        return
+                bt.logging.warning("The container event stream ended, reconnecting")
+
+            except Exception as e:
+                bt.logging.warning(f"Lost the container event stream, reconnecting: {e}")
+            self.closed.wait(self.event_retry_interval)
+
+    def _start_event_watcher(self):
+        if self.event_thread is None:
+            self.event_thread = threading.Thread(target=self._watch_events, args=(time.time_ns(),), daemon=True)
+            self.event_thread.start()
 
+    def close(self):
+        """Stops the event watcher and the container monitor, the miner-api container itself is left as is."""
+        self.closed.set()
+        self.monitor.stop()
+
+    @tracer.timed("docker.readiness")
     def _poll_service_for_readiness(self, max_wait_time: int) -> bool:
-        #TODO: check for errors to stop polling when we know we failed 
         num_checks = 50
         sleep_interval = int(max_wait_time/num_checks)
 
         for i in range(num_checks):
-            time.sleep(sleep_interval)
+            # the container stopping is reported by the event stream, so there is no point waiting any longer
+            if self.container_exited.wait(sleep_interval):
+                bt.logging.error(f"{self.service_name} container exited before becoming ready.")
+                return False
             try:
                 response = requests.get(f"{self.api_url}/health")
                 if response.status_code == 200:
@@ -39,76 +121,97 @@ class MinerDockerClient:
         return False
 
     def _is_container_running(self):
-        # Checks if a Docker container is running.
         try:
-            result = subprocess.run(
-                ['docker-compose', 'ps', '-q', self.service_name],
-                capture_output=True, text=True
-            )
-            bt.logging.info(f"Container is running: {result}")
-            
-            # If the result contains output, the container is running
-            return bool(result.stdout.strip())
-        except subprocess.CalledProcessError as e:
+            return self.backend.is_running(self.service_name)
+        except Exception as e:
             bt.logging.warning(f"Error checking container status: {e}")
             return False
 
+    def _container_spec(self, model_url: str) -> ContainerSpec:
+        env = {key: os.environ[key] for key in PASSTHROUGH_ENV if key in os.environ}
+        env["MODEL_URL"] = model_url
+        return ContainerSpec(name=self.service_name, env=env)
+
+    @tracer.timed("docker.start_service")
     def start_service(self):
-        """Start the miner-api service using Docker Compose."""
+        """Make sure the miner-api image exists, building it once if it does not."""
         bt.logging.info(f"Starting {self.service_name} service...")
-        subprocess.run(["docker-compose", "up", "--build", "--timeout", "300", "-d", self.service_name], check=True)
+        self.backend.ensure_image(self._container_spec(""))
 
+    @tracer.timed("docker.restart_service")
     def restart_service(self, model_url: str):
         try:
-            # Restart the miner-api container
-            my_env = os.environ.copy()
-            my_env["MODEL_URL"] = model_url
-            subprocess.run(["docker", "compose", "up", "--force-recreate", "-d", self.service_name], env=my_env)
+            # Recreate the miner-api container from the prebuilt image
+            self.restarted_at = time.time_ns()
+            self.container_started.clear()
+            self.container_exited.clear()
+            self.backend.recreate(self._container_spec(model_url))
 
             bt.logging.info("miner-api container restarted successfully.")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             bt.logging.warning(f"Error restarting miner-api: {e}")
 
     def initialize_miner_api(self, model_url: str) -> bool:
-        # determines if container is already running. If it is then restarts it otherwise starts it
+        self._start_event_watcher()
         self.restart_service(model_url)
+        self.monitor.reset()
+        self.monitor.start()
         
         max_wait_time = 500
-        return self._poll_service_for_readiness(max_wait_time)
+        ready = self._poll_service_for_readiness(max_wait_time)
+        if ready:
+            bt.logging.info(f"Miner model load timings: {self.get_load_timings()}")
+        return ready
 
+    @tracer.timed("docker.stop_service")
     def stop_service(self):
         """Stop and clean up the miner-api service without affecting the validator service."""
         bt.logging.info(f"Stopping {self.service_name} service...")
+        self.monitor.stop()
         
-        # Stop the miner-api service
-        subprocess.run(["docker-compose", "stop", self.service_name], check=True)
-        
-        # Remove the container
-        subprocess.run(["docker-compose", "rm", "-f", self.service_name], check=True)
+        # Stop and remove the miner-api container
+        self.backend.stop(self.service_name)
         
         # Remove the Docker image
         self.remove_image()
 
-    
-
     def remove_image(self):
         """Remove the Docker image associated with the miner-api service."""
         try:
-            image_name = f"de-val-{self.service_name}:latest" 
-            bt.logging.info(f"Removing Docker image: {image_name}...")
-            subprocess.run(["docker", "rmi", image_name], check=True)
-        except subprocess.CalledProcessError as e:
+            bt.logging.info(f"Removing Docker image: {MINER_API_IMAGE}...")
+            self.backend.remove_image(MINER_API_IMAGE)
+        except Exception as e:
             bt.logging.warning(f"Error removing image: {e}. It may not exist or is in use.")
 
+    def _post_with_retry(self, path: str, payload: dict, timeout: int) -> requests.Response:
+        """Posts to the miner API, waiting out 429/503 responses as long as their Retry-After fits in the timeout."""
+        deadline = time.time() + timeout
+        while True:
+            response = requests.post(
+                f"{self.api_url}{path}",
+                json=payload,
+                timeout=max(deadline - time.time(), 0.1)
+            )
+            if response.status_code not in (429, 503):
+                return response
+
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            if time.time() + retry_after >= deadline:
+                return response
+
+            bt.logging.debug(f"Miner API busy ({response.status_code}), retrying in {retry_after}s")
+            time.sleep(retry_after)
+
+    @tracer.timed("docker.query_eval")
     def query_eval(self, request: EvalRequest, timeout: int) -> EvalResponse:
         """Invoke the API running in the nested Docker container with queries."""
         #bt.logging.info(f"Querying API on container {self.service_name}...")
         try:
-            response = requests.post(
-                f"{self.api_url}/eval_query",
-                json=request.dict(),
-                timeout=timeout
-            )
+            response = self._post_with_retry("/eval_query", request.dict(), timeout)
+            response.raise_for_status()
             resp = response.json()
             return EvalResponse(
                 score = resp.get("score"),
@@ -135,6 +238,38 @@ class MinerDockerClient:
                 status_message = APIStatus.ERROR
             )
     
+    @tracer.timed("docker.query_eval_batch")
+    def query_eval_batch(self, eval_requests: list[EvalRequest], timeout: int) -> list[EvalResponse]:
+        """Invoke the batch API of the nested Docker container. The timeout applies to the whole batch."""
+        try:
+            response = self._post_with_retry(
+                "/eval_query_batch", 
+                EvalBatchRequest(requests=eval_requests).dict(), 
+                timeout
+            )
+            response.raise_for_status()
+            resp = response.json()
+            return [EvalResponse(**r) for r in resp.get("responses")]
+
+        except Timeout as e:
+            bt.logging.error(f"Timed out API batch request: {e}")
+            status = APIStatus.TIMEOUT
+
+        except Exception as e:
+            bt.logging.error(f"Failed to query batch API: {e}")
+            status = APIStatus.ERROR
+
+        return [
+            EvalResponse(
+                score = -1, 
+                mistakes = [],
+                response_time = None,
+                status_message = status
+            )
+            for _ in eval_requests
+        ]
+
+    @tracer.timed("docker.get_model_hash")
     def get_model_hash(self)->str:
         try:
             response = requests.get(
@@ -148,6 +283,20 @@ class MinerDockerClient:
             bt.logging.error(f"Failed to get hash: {e}")
             return None
 
+    def get_load_timings(self) -> dict[str, float] | None:
+        try:
+            response = requests.get(
+                f"{self.api_url}/load_timings",
+                timeout=10
+            )
+            resp = response.json()
+            return resp.get("timings")
+
+        except Exception as e:
+            bt.logging.error(f"Failed to get load timings: {e}")
+            return None
+
+    @tracer.timed("docker.get_model_coldkey")
     def get_model_coldkey(self)->str:
         try:
             response = requests.get(
@@ -161,28 +310,17 @@ class MinerDockerClient:
             bt.logging.error(f"Failed to get Coldkey: {e}")
             return None
 
-    def get_container_size(self):
-        try:
-            result = subprocess.run(
-                ["docker", "inspect", self.service_name, "--size"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            container_info = json.loads(result.stdout)
-            size_rw = container_info[0].get("SizeRw", 0)
-            
-            return size_rw / (1024 ** 3)  # to GB
-        
-        except subprocess.CalledProcessError as e:
-            print(f"Error running docker inspect: {e}")
-            return None
-        except (json.JSONDecodeError, IndexError, KeyError) as e:
-            print(f"Error parsing docker inspect output: {e}")
-            return None
+    def get_container_size(self, timeout: float = 0) -> float | None:
+        """Latest writable layer size of the container in GB, as sampled by the background monitor.
 
-        
+        Waits up to timeout seconds for the first sample after a restart. None means the monitor has no reading, the
+        size is not inspected here as that is the slow call the monitor keeps off the evaluation path.
+        """
+        stats = self.monitor.wait_for_sample(timeout)
+        if stats is None or stats.disk_gb is None:
+            bt.logging.warning(f"No size reading of container {self.service_name} within {timeout}s")
+            return None
+        return stats.disk_gb
 
 
 if __name__ == "__main__":
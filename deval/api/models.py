@@ -19,6 +19,25 @@ class EvalResponse(BaseModel):
     status_message: APIStatus | None = None
     
 
+class EvalBatchRequest(BaseModel):
+    requests: list[EvalRequest]
+
+class EvalBatchResponse(BaseModel):
+    responses: list[EvalResponse]
+    
+
+class WorkerStatsResponse(BaseModel):
+    queue_depth: int
+    in_flight: int
+    processed: int
+    rejected: int
+    avg_request_time: float | None
+    
+
+class LoadTimingsResponse(BaseModel):
+    timings: dict[str, float]
+
+
 class ModelHashResponse(BaseModel):
     hash: str
 
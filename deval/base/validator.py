@@ -35,6 +35,7 @@ import pickle
 import os
 from datetime import datetime, timedelta
 from deval.utils.constants import constants
+from deval.utils.tracing import tracer
 
 
 class BaseValidatorNeuron(BaseNeuron):
@@ -329,6 +330,7 @@ class BaseValidatorNeuron(BaseNeuron):
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
 
         
+    @tracer.timed("save_state")
     def save_state(self, save_weights = False):
         """Saves the state of the validator to a file."""
         bt.logging.info("Saving validator state.")
@@ -436,8 +438,8 @@ class BaseValidatorNeuron(BaseNeuron):
         for f in files:
             file_path = os.path.join(load_path, f)
 
-            # we want to maintain weights data over epochs 
-            if "weights.pt" in f:
+            # we want to maintain weights data and the wandb events not yet delivered over epochs 
+            if "weights.pt" in f or f == constants.wandb_spill_file:
                 continue
 
             # otherwise we delete all save files 
@@ -447,17 +449,14 @@ class BaseValidatorNeuron(BaseNeuron):
     def get_uid_coldkey(self, uid: int) -> str:
         return self.metagraph.axons[uid].coldkey
 
-    def update_scores(self, model_rewards: dict[int, dict[str, list[float]]], denom: int):
-        """Performs exponential moving average on the scores based on the rewards received from the miners."""
+    def update_scores(self, avg_rewards: dict[int, float]):
+        """Performs exponential moving average on the scores based on the average reward of each miner."""
 
         tmp_scores = torch.zeros(
             self.metagraph.n, dtype=torch.float32, device=self.device
         )
 
-        for uid, new_scores in model_rewards.items():
-            total_scores = [i for values in new_scores.values() for i in values]
-            avg_score = sum(total_scores) / denom
-
+        for uid, avg_score in avg_rewards.items():
             if avg_score == 0:
                 avg_score = self.scores[uid]
             tmp_scores[uid] = avg_score
@@ -467,4 +466,11 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.info(f"Updated moving avg scores: {self.scores}")
 
         # return expected format for contest 
-        return [(i, score) for i, score in enumerate(self.scores.tolist())]
\ No newline at end of file
+        return [(i, score) for i, score in enumerate(self.scores.tolist())]
+
+    def provisional_score(self, uid: int, avg_reward: float) -> float:
+        """The moving average score update_scores will give a miner evaluated this epoch."""
+        previous = float(self.scores[uid])
+        if avg_reward == 0:
+            avg_reward = previous
+        return max(constants.alpha * avg_reward + (1 - constants.alpha) * previous - constants.alpha_decay, 0.0)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import math
+import time
+
+from deval.api.models import APIStatus
+
+
+# the lower bound of the adaptive timeout as a fraction of the contest timeout
+MIN_TIMEOUT_FRACTION = 0.25
+
+
+class QueryBudget:
+    """Time budget and per-request timeouts for the queries made to a single miner.
+
+    Request timeouts adapt to the response times the miner reports as srtt + 4 * rttvar, the way TCP derives its
+    retransmission timeout. The estimate is kept per task type, as prompt lengths and so response times differ
+    between them, and the first response of the miner is left out of it as it includes the warm-up of the model.
+    Timeouts stay within [min_timeout, max_timeout] and never exceed what is left of the budget. The circuit breaker
+    trips after max_consecutive_failures timed out or failed requests in a row, across task types, after which the
+    miner is not queried again.
+    """
+
+    def __init__(
+        self,
+        max_timeout: float,
+        total_time: float | None = None,
+        min_timeout: float | None = None,
+        max_consecutive_failures: int = 5,
+    ):
+        """
+        Args:
+            max_timeout: the timeout of a single request before any latency is observed, and its upper bound
+            total_time: seconds the miner may spend answering queries, None for no limit
+            min_timeout: the lower bound of the adaptive timeout, MIN_TIMEOUT_FRACTION of max_timeout by default
+            max_consecutive_failures: failures in a row that trip the circuit breaker, 0 to disable it
+        """
+        self.max_timeout = max_timeout
+        self.total_time = total_time
+        self.min_timeout = min(max_timeout * MIN_TIMEOUT_FRACTION if min_timeout is None else min_timeout, max_timeout)
+        self.max_consecutive_failures = max_consecutive_failures
+
+        self.started_at = time.monotonic()
+        self.estimates: dict[str, tuple[float, float]] = {} # task type to (srtt, rttvar)
+        self.warmed_up = False
+        self.consecutive_failures = 0
+
+    def remaining(self) -> float:
+        if self.total_time is None:
+            return math.inf
+        return self.total_time - (time.monotonic() - self.started_at)
+
+    @property
+    def tripped(self) -> bool:
+        return 0 < self.max_consecutive_failures <= self.consecutive_failures
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0
+
+    def abort_reason(self) -> str | None:
+        """Why the miner should not be queried anymore, None while it still can be."""
+        if self.tripped:
+            return f"{self.consecutive_failures} consecutive failed requests"
+        if self.exhausted:
+            return f"time budget of {self.total_time:.0f}s exhausted"
+        return None
+
+    def next_timeout(self, task_name: str) -> float:
+        timeout = self.max_timeout
+        if task_name in self.estimates:
+            srtt, rttvar = self.estimates[task_name]
+            timeout = min(max(srtt + 4 * rttvar, self.min_timeout), self.max_timeout)
+        return max(min(timeout, self.remaining()), 0.0)
+
+    def record(self, task_name: str, status: APIStatus | None, response_time: float | None) -> None:
+        """Records the outcome of a request and the response time the miner reported for it."""
+        if status in (APIStatus.TIMEOUT, APIStatus.ERROR):
+            self.consecutive_failures += 1
+            return
+
+        self.consecutive_failures = 0
+        if response_time is None:
+            return
+        if not self.warmed_up:
+            # the first response includes the warm-up of the model
+            self.warmed_up = True
+            return
+
+        if task_name not in self.estimates:
+            self.estimates[task_name] = (response_time, response_time / 2)
+        else:
+            srtt, rttvar = self.estimates[task_name]
+            rttvar = 0.75 * rttvar + 0.25 * abs(srtt - response_time)
+            srtt = 0.875 * srtt + 0.125 * response_time
+            self.estimates[task_name] = (srtt, rttvar)
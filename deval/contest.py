@@ -4,34 +4,72 @@ from deval.rewards.pipeline import RewardPipeline
 import pytz
 import numpy as np
 from deval.utils.constants import constants
+from deval.racing import stratified_bounds, select_contenders
+from deval.model.duplicates import DuplicateScreen
+from deval.ranking import IncrementalRanking
 
 
 # Note to help with serialization during save, we do not have bittensor package here
 # TODO: add a better logger 
 class DeValContest:
 
-    def __init__(self, reward_pipeline: RewardPipeline, forward_start_time: int, timeout: int):
+    # share of the incentive paid to each tier, best tier first
+    TIERS = {
+        0 : 0.5,
+        1 : 0.3,
+        2 : 0.125,
+        3 : 0.05,
+        4 : 0.025
+    }
+
+    def __init__(
+        self, 
+        reward_pipeline: RewardPipeline, 
+        forward_start_time: int, 
+        timeout: int, 
+        start_block: int | None = None,
+    ):
         self.model_rewards: dict[int, dict[str, list[float]]] = {} # int = uid, str = task name, list[float] = list of rewards
+        self.model_sample_sizes: dict[int, dict[str, int]] = {} # int = uid, str = task name, int = tasks sampled
         self.ranked_rewards: list[tuple(int, float)] = [] # int = uid, float = reward
         self.model_hashes: dict[str, ModelState] = {} 
         self.start_time_datetime: datetime = datetime.fromtimestamp(forward_start_time, tz=pytz.UTC)
         self.reward_pipeline: RewardPipeline = reward_pipeline
         self.timeout: int = timeout
 
-        self.tiers = {
-            0 : 0.5,
-            1 : 0.3,
-            2 : 0.125,
-            3 : 0.05,
-            4 : 0.025
-        }
+        # racing state, the finalists are (uid, hotkey) pairs selected once every miner has been screened
+        self.racing_finalists: list[tuple[int, str]] | None = None
+        self.racing_completed: set[tuple[int, str]] = set()
+
+        # miners grouped by their committed chain hash, built before the first miner is evaluated
+        self.duplicate_screen: DuplicateScreen | None = None
+
+        # the order miners are evaluated in, persisted with the contest so a resumed epoch keeps to it
+        self.start_block: int | None = start_block
+        self.schedule: list[tuple[int, str]] | None = None
+
+        # scores carried over from earlier epochs, updated as each miner finishes, to publish weights mid epoch
+        self.provisional_ranking: IncrementalRanking | None = None
+
+        self.tiers = dict(DeValContest.TIERS)
+
+    def __setstate__(self, state):
+        # contests saved before racing was introduced
+        state.setdefault("racing_finalists", None)
+        state.setdefault("racing_completed", set())
+        state.setdefault("model_sample_sizes", {})
+        state.setdefault("duplicate_screen", None)
+        state.setdefault("start_block", None)
+        state.setdefault("schedule", None)
+        state.setdefault("provisional_ranking", None)
+        self.__dict__.update(state)
 
     def validate_model(
         self, 
         miner_state: ModelState, 
         model_hash: str | None, 
         model_coldkey: str | None, 
-        container_size: int,
+        container_size: float | None,
         max_model_size_in_gbs: int,
     ) -> bool:
         # ensure the last commit date is before forward start time
@@ -55,6 +93,10 @@ class DeValContest:
             print("Mismatch between the model hash on the chain commit and the model hash on huggingface")
             return False
 
+        if container_size is None:
+            print("Unable to read the container size, INVALID Model")
+            return False
+
         if container_size > max_model_size_in_gbs:
             print(f"Container too large at {container_size} GBs, failing")
             return False
@@ -76,6 +118,12 @@ class DeValContest:
             duplicated_model_uid = duplicated_model.uid
             duplicated_model_block = duplicated_model.block
 
+            # the entry of the miner itself, recorded when it was screened, is not a duplicate
+            if self.is_same_miner(duplicated_model, miner_state):
+                self.model_hashes[model_hash] = miner_state
+                print("Found the model of this miner from an earlier stage. This is a valid model")
+                return True
+
             if not duplicated_model_block:
                 if miner_state.uid is not None and miner_state.block:
                     self.model_hashes[model_hash] = miner_state
@@ -97,8 +145,80 @@ class DeValContest:
 
                 
         
+    @staticmethod
+    def is_same_miner(model_state: ModelState, other: ModelState) -> bool:
+        hotkey = getattr(model_state, "hotkey", None)
+        return model_state.uid == other.uid and hotkey is not None and hotkey == getattr(other, "hotkey", None)
+
+    def get_screened_model(self, uid: int, hotkey: str) -> ModelState | None:
+        """The model state a miner was validated with during screening, None when it holds no model hash."""
+        for model_state in self.model_hashes.values():
+            if model_state.uid == uid and getattr(model_state, "hotkey", None) == hotkey:
+                return model_state
+        return None
+
     def update_model_state_with_rewards(self, miner_state: ModelState) -> None:
         self.model_rewards[miner_state.uid] = miner_state.rewards 
+        self.model_sample_sizes[miner_state.uid] = dict(getattr(miner_state, "sample_sizes", {}))
+
+    def record_duplicate_outcome(self, uid: int, hotkey: str) -> None:
+        """
+            confirms an evaluated miner as the owner of its committed hash when its model was validated under it
+        """
+        if self.duplicate_screen is None:
+            return
+
+        model_hash = self.duplicate_screen.hashes.get((uid, hotkey))
+        owner = self.model_hashes.get(model_hash) if model_hash is not None else None
+        self.duplicate_screen.record_outcome((uid, hotkey), owner is not None and owner.uid == uid)
+
+    def get_average_rewards(self, task_counts: dict[str, int]) -> dict[int, float]:
+        """
+            averages each miner's rewards over the full task set. Task types where the miner was only sampled, e.g.
+            by racing or adaptive sampling, are weighted by their share of the task set. Otherwise tasks without a 
+            reward count as 0
+        """
+        if sum(task_counts.values()) == 0:
+            return {}
+
+        return {uid: self.get_average_reward(uid, task_counts) for uid in self.model_rewards}
+
+    def get_average_reward(self, uid: int, task_counts: dict[str, int]) -> float:
+        total = sum(task_counts.values())
+        rewards = self.model_rewards.get(uid, {})
+        sample_sizes = self.model_sample_sizes.get(uid, {})
+        if total == 0:
+            return 0.0
+
+        return sum(
+            n * sum(rewards.get(task_name, [])) / max(sample_sizes.get(task_name, n), 1)
+            for task_name, n in task_counts.items()
+        ) / total
+
+    def select_racing_finalists(
+        self, 
+        screened: list[tuple[int, str]], 
+        task_counts: dict[str, int], 
+        confidence: float,
+    ) -> list[tuple[int, str]]:
+        """
+            drops the screened miners that are statistically unable to reach a paid tier
+        """
+        # miners that were not evaluated at all, e.g. ineligible or invalid models, are not raced
+        bounds = {
+            uid: stratified_bounds(self.model_rewards[uid], task_counts, confidence)
+            for uid, _ in screened 
+            if any(len(rewards) > 0 for rewards in self.model_rewards.get(uid, {}).values())
+        }
+        print(f"Screening reward bounds: {bounds}")
+
+        contenders = select_contenders(
+            bounds, 
+            len(self.tiers), 
+            getattr(constants, "tier_improvement_threshold", 1.08)
+        )
+        hotkeys = dict(screened)
+        return [(uid, hotkeys[uid]) for uid in contenders]
 
     def _get_miner_tiers(self, miner_rewards: list[tuple[int, float]]) -> list[list[int]]:
         if not miner_rewards:
@@ -121,7 +241,7 @@ class DeValContest:
 
         return list(reversed(tiers))
 
-    def _adjust_tiers(self, num_participants: int) -> None:
+    def _adjusted_tiers(self, num_participants: int) -> dict[int, float]:
         # Sum of original tiers
         total_tiers_sum = sum(self.tiers.values())
         
@@ -136,7 +256,7 @@ class DeValContest:
         
         # Normalize adjusted tiers to ensure they sum up to 1
         adjusted_tiers_sum = sum(adjusted_tiers.values())
-        self.tiers = {rank: reward / adjusted_tiers_sum for rank, reward in adjusted_tiers.items()}
+        return {rank: reward / adjusted_tiers_sum for rank, reward in adjusted_tiers.items()}
         
     def _get_miner_sort_order(self) -> dict[int, int]:
         date_dict = {}
@@ -153,7 +273,8 @@ class DeValContest:
         self, 
         reward_tiers: list[list[int]], 
         uid_submit_date: list[int | None], 
-        node_count: int
+        node_count: int,
+        tiers: dict[int, float],
     ) -> list[float]:
         if not reward_tiers:
             return [1.0] * node_count
@@ -190,7 +311,7 @@ class DeValContest:
         scores = []
 
         for index, tier in enumerate(modified_tiers):
-            incentive_pool = self.tiers.get(index, 0)
+            incentive_pool = tiers.get(index, 0)
             
             num_participants = len(tier)
             # Exponential decay applied based on submit date
@@ -215,17 +336,30 @@ class DeValContest:
         ranked_rewards = sorted(avg_rewards, key=lambda x: x[1], reverse=True)
         print(f"Generated Rewards: {ranked_rewards}")
 
+        weights = self.select_winners(ranked_rewards)
+        print(f"Computed Weights: {weights}")
+
+        return weights
+
+    def select_winners(
+        self, 
+        ranked_rewards: list[tuple[int, float]], 
+        provisional: bool = False,
+    ) -> list[tuple[int, float]]: # (uid, weight)
+        """
+            assigns the tier weights to rewards that are already ranked, best first. Provisional weights, computed 
+            while the epoch is still running, leave the contest tiers untouched
+        """
         # group miners based on min score improvement
         tiered_rewards = self._get_miner_tiers(ranked_rewards)
-        print(f"Tiered Rewards: {tiered_rewards}")
 
         # adjust the weights we assign each tier
+        tiers = self.tiers
         num_rewards = len(tiered_rewards) 
-        if len(self.tiers) > num_rewards and num_rewards > 0:
-            self._adjust_tiers(num_rewards)
+        if len(tiers) > num_rewards and num_rewards > 0:
+            tiers = self._adjusted_tiers(num_rewards)
+        if not provisional:
+            self.tiers = tiers
            
         uid_submit_date = self._get_miner_sort_order()
-        weights = self._get_weights(tiered_rewards, uid_submit_date, len(ranked_rewards))
-        print(f"Computed Weights: {weights}")
-
-        return weights
\ No newline at end of file
+        return self._get_weights(tiered_rewards, uid_submit_date, len(ranked_rewards), tiers)
\ No newline at end of file
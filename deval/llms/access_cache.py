@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bittensor as bt
+
+from deval.llms.base_llm import BaseLLM
+
+
+DEFAULT_ACCESS_CACHE_PATH = os.path.join("~", ".cache", "deval", "model_access.json")
+DEFAULT_ACCESS_TTL = 24 * 60 * 60
+
+
+class ModelAccessCache:
+    """Results of model access checks, kept on disk for `ttl` seconds.
+
+    Entries are keyed by a fingerprint of the credentials as well as the model id, so changing the AWS keys
+    invalidates them. Only conclusive checks are cached, a check that failed for another reason is run again.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float | None = None):
+        self.path = os.path.expanduser(path or os.getenv("MODEL_ACCESS_CACHE_PATH", DEFAULT_ACCESS_CACHE_PATH))
+        self.ttl = ttl if ttl is not None else float(os.getenv("MODEL_ACCESS_TTL", DEFAULT_ACCESS_TTL))
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict] = self._read()
+
+    def __getstate__(self):
+        return {"path": self.path, "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.entries = self._read()
+
+    @staticmethod
+    def key(model_id: str, credentials: str) -> str:
+        fingerprint = hashlib.sha256(credentials.encode()).hexdigest()[:16]
+        return f"{fingerprint}:{model_id}"
+
+    def get(self, key: str) -> bool | None:
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry["checked_at"] > self.ttl:
+            return None
+        return entry["accessible"]
+
+    def set(self, key: str, accessible: bool) -> None:
+        with self.lock:
+            self.entries[key] = {"accessible": accessible, "checked_at": time.time()}
+
+    def save(self) -> None:
+        with self.lock:
+            entries = dict(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            bt.logging.warning(f"Unable to save the model access cache to {self.path}: {e}")
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def filter_accessible(
+    llms: list[BaseLLM],
+    cache: ModelAccessCache,
+    credentials: str,
+    max_workers: int = 8,
+) -> list[BaseLLM]:
+    """The models the credentials have access to. Models without a cached result are checked concurrently."""
+    keys = {llm.model_id: ModelAccessCache.key(llm.model_id, credentials) for llm in llms}
+    unknown = [llm for llm in llms if cache.get(keys[llm.model_id]) is None]
+
+    if unknown:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unknown))) as pool:
+            results = list(pool.map(lambda llm: llm.check_model_id_access(), unknown))
+
+        for llm, accessible in zip(unknown, results):
+            if accessible is not None:
+                cache.set(keys[llm.model_id], bool(accessible))
+        cache.save()
+
+    return [llm for llm in llms if cache.get(keys[llm.model_id])]
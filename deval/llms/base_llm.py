@@ -1,5 +1,7 @@
+import threading
 from abc import ABC, abstractmethod
 from deval.llms.config import LLMAPIs, LLMArgs
+from deval.llms.usage import usage_tracker
 
 
 class BaseLLM(ABC):
@@ -14,15 +16,57 @@ class BaseLLM(ABC):
         self.model_kwargs = model_kwargs.dict()
         self.model_id = model_id
         self.messages = []
-        self.times = [0]
+        self._llm = None
 
+        # running totals of the calls made through this instance, the full breakdown is kept by the usage tracker
+        self.num_calls = 0
+        self.total_latency = 0.0
+        self.completion_tokens = 0
+        # calls can be made from several threads at once, the usage of a response is kept per thread
+        self._calls_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def llm(self):
+        """The API client, created on first use so that constructing a model makes no connections."""
+        if self._llm is None:
+            self._llm = self.load()
+        return self._llm
+
+    @llm.setter
+    def llm(self, client) -> None:
+        self._llm = client
+
+    @property
+    def last_usage(self) -> tuple[int | None, int | None, int] | None:
+        """(prompt tokens, completion tokens, retries) of the last response received by the current thread."""
+        return getattr(self._local, "usage", None)
+
+    @last_usage.setter
+    def last_usage(self, usage: tuple[int | None, int | None, int] | None) -> None:
+        self._local.usage = usage
+
+
+    def record_call(self, latency: float, error: bool = False) -> None:
+        """Accounts for a call, with the token usage the last response reported."""
+        prompt_tokens, completion_tokens, retries = self.last_usage or (None, None, 0)
+        self.last_usage = None
+
+        with self._calls_lock:
+            self.num_calls += 1
+            self.total_latency += latency
+            self.completion_tokens += completion_tokens or 0
+        usage_tracker.record(
+            self.api.value, self.model_id, latency, prompt_tokens, completion_tokens, retries=retries, error=error
+        )
 
     @abstractmethod
     def query(
         self,
         prompt: str,
         system_prompt: str,
-        tool_schema: dict | None = None
+        tool_schema: dict | None = None,
+        max_tokens: int | None = None
     ) -> str:
         ...
 
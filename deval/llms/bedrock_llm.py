@@ -18,35 +18,45 @@ class AWSBedrockLLM(BaseLLM):
     ):
         api = LLMAPIs.BEDROCK
         super().__init__(api, model_id, model_kwargs)
-        self.llm = self.load()
 
     def query(
         self,
         prompt: str,
         system_prompt: str,
-        tool_schema: dict | None = None
+        tool_schema: dict | None = None,
+        max_tokens: int | None = None
     ):
-        self.messages = [{"content": [{"text":prompt}], "role": "user"}]
+        messages = [{"content": [{"text":prompt}], "role": "user"}]
+        self.messages = messages
         self.system_prompt = system_prompt
 
         t0 = time.time()
-        response = self.forward(messages=self.messages, tool_schema=tool_schema)
+        try:
+            response = self.forward(
+                messages=messages, tool_schema=tool_schema, system_prompt=system_prompt, max_tokens=max_tokens
+            )
+        except Exception:
+            self.record_call(time.time() - t0, error=True)
+            raise
+        self.record_call(time.time() - t0)
 
-        self.messages = self.messages + [{"content": response, "role": "assistant"}]
-        self.times = self.times + [0, time.time() - t0]
+        self.messages = messages + [{"content": response, "role": "assistant"}]
 
         return response
 
     def forward(
         self, 
         messages: list[dict[str, str]],
-        tool_schema: dict | None = None
+        tool_schema: dict | None = None,
+        system_prompt: str | None = None,
+        max_tokens: int | None = None
     ) -> str:
         # Compose sampling params
         model_kwargs = self.model_kwargs # type of Dict of LLMArgs
         temperature = model_kwargs.get("temperature", 0.2)
         top_p = model_kwargs.get("top_p", 0.95)
-        max_tokens = model_kwargs.get("max_tokens", 500)
+        max_tokens = max_tokens or model_kwargs.get("max_tokens", 500)
+        system_prompt = system_prompt or self.system_prompt
 
         inference_config = {
             'maxTokens': max_tokens,
@@ -58,7 +68,7 @@ class AWSBedrockLLM(BaseLLM):
             output = self.llm.converse(
                 modelId=self.model_id,
                 messages=messages,
-                system=[{"text": self.system_prompt}],
+                system=[{"text": system_prompt}],
                 toolConfig=tool_schema,
                 inferenceConfig=inference_config
             )
@@ -66,10 +76,14 @@ class AWSBedrockLLM(BaseLLM):
             output = self.llm.converse(
                 modelId=self.model_id,
                 messages=messages,
-                system=[{"text": self.system_prompt}],
+                system=[{"text": system_prompt}],
                 inferenceConfig=inference_config
             )
         
+        usage = output.get("usage", {})
+        retries = output.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        self.last_usage = (usage.get("inputTokens"), usage.get("outputTokens"), retries)
+
         content = self.parse_response(output)
 
         return content
@@ -109,7 +123,11 @@ class AWSBedrockLLM(BaseLLM):
         if len(tool_calls) > 0:
             tool_call = tool_calls[0]
             text = tool_call.get("text")
-            content = json.dumps(json.loads(text).get("arguments"))
+            try:
+                content = json.dumps(json.loads(text).get("arguments"))
+            except (json.JSONDecodeError, AttributeError):
+                # malformed tool calls are salvaged when the task parses them, arguments included
+                content = text
         else:
             #bt.logging.info("No tool response found, returning content")
             content = [r for r in response if "text" in r][0]
@@ -124,13 +142,15 @@ class AWSBedrockLLM(BaseLLM):
         if access_key is None or secret_key is None:
             raise ValueError("Please add AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY to your environment to use this api")
 
-        return boto3.client(
+        # a session per model, as the default session of boto3 is not thread safe and models are probed concurrently
+        return boto3.session.Session().client(
             service_name="bedrock-runtime",
             region_name='us-east-1'
         )
 
-    def check_model_id_access(self) -> bool:
-        # returns true if able to run a query against the selected model ID otherwise false
+    def check_model_id_access(self) -> bool | None:
+        # returns true if able to run a query against the selected model ID, false if access is denied and None if
+        # the check failed for another reason
         # actual feature not yet implemented so this is Janky
         # https://github.com/aws/aws-sdk/issues/810
 
@@ -143,9 +163,13 @@ class AWSBedrockLLM(BaseLLM):
             if e.response['Error']['Code'] == 'AccessDeniedException':
                 return False
 
+            bt.logging.error(f"Unhandled error at {e}")
+
         except Exception as e:
             bt.logging.error(f"Unhandled error at {e}")
 
+        return None
+
 
 
 
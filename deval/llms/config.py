@@ -18,6 +18,17 @@ class LLMArgs(BaseModel):
     format:LLMFormatType
 
 SUPPORTED_MODELS = {
-    LLMAPIs.OPENAI : ["gpt-4o-mini", "gpt-4o-2024-08-06", "gpt-4o-mini", "gpt-4o-mini"],
+    LLMAPIs.OPENAI : ["gpt-4o-mini", "gpt-4o-2024-08-06"],
     LLMAPIs.BEDROCK : ["anthropic.claude-3-haiku-20240307-v1:0", "cohere.command-r-plus-v1:0", "anthropic.claude-3-sonnet-20240229-v1:0",  "mistral.mistral-small-2402-v1:0", "mistral.mistral-large-2402-v1:0"]
-}
\ No newline at end of file
+}
+
+# estimated USD per million (prompt, completion) tokens, used for the usage accounting of task generation
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o-2024-08-06": (2.50, 10.00),
+    "anthropic.claude-3-haiku-20240307-v1:0": (0.25, 1.25),
+    "anthropic.claude-3-sonnet-20240229-v1:0": (3.00, 15.00),
+    "cohere.command-r-plus-v1:0": (3.00, 15.00),
+    "mistral.mistral-small-2402-v1:0": (1.00, 3.00),
+    "mistral.mistral-large-2402-v1:0": (4.00, 12.00),
+}
@@ -16,35 +16,40 @@ class OpenAILLM(BaseLLM):
     ):
         api = LLMAPIs.OPENAI
         super().__init__(api, model_id, model_kwargs)
-        self.llm = self.load()
 
     def query(
         self,
         prompt: str,
         system_prompt: str,
-        tool_schema: dict | None = None
+        tool_schema: dict | None = None,
+        max_tokens: int | None = None
     ):
         self.messages = [{"content": system_prompt, "role": "system"}]
         messages = self.messages + [{"content": prompt, "role": "user"}]
 
         t0 = time.time()
-        response = self.forward(messages=messages, tool_schema=tool_schema)
+        try:
+            response = self.forward(messages=messages, tool_schema=tool_schema, max_tokens=max_tokens)
+        except Exception:
+            self.record_call(time.time() - t0, error=True)
+            raise
+        self.record_call(time.time() - t0)
 
         self.messages = messages + [{"content": response, "role": "assistant"}]
-        self.times = self.times + [0, time.time() - t0]
 
         return response
 
     def forward(
         self, 
         messages: list[dict[str, str]],
-        tool_schema: dict | None = None
+        tool_schema: dict | None = None,
+        max_tokens: int | None = None
     ) -> str:
         # Compose sampling params
         model_kwargs = self.model_kwargs # type of Dict of LLMArgs
         temperature = model_kwargs.get("temperature", 0.2)
         top_p = model_kwargs.get("top_p", 0.95)
-        max_tokens = model_kwargs.get("max_tokens", 500)
+        max_tokens = max_tokens or model_kwargs.get("max_tokens", 500)
         format = model_kwargs.get("format").value # type: str
 
         if tool_schema:
@@ -67,6 +72,11 @@ class OpenAILLM(BaseLLM):
                     max_tokens = max_tokens,
                 )
         
+        usage = getattr(output, "usage", None)
+        if usage is not None:
+            # retries made by the client are not reported by the openai api
+            self.last_usage = (usage.prompt_tokens, usage.completion_tokens, 0)
+
         content = self.parse_response(output)
 
         return content
@@ -0,0 +1,85 @@
+import random
+from dataclasses import dataclass
+
+from deval.llms.base_llm import BaseLLM
+
+
+@dataclass
+class ModelStats:
+    """Exponentially weighted moving averages of the calls made to a model."""
+    calls: int = 0
+    selections: int = 0
+    latency: float | None = None # seconds per task
+    tokens_per_second: float | None = None
+    error_rate: float = 0.0
+
+    def update(self, alpha: float, latency: float | None, success: bool, completion_tokens: int | None) -> None:
+        self.calls += 1
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * (0.0 if success else 1.0)
+
+        if not success or not latency:
+            return
+        self.latency = latency if self.latency is None else (1 - alpha) * self.latency + alpha * latency
+        if completion_tokens:
+            rate = completion_tokens / latency
+            self.tokens_per_second = (
+                rate if self.tokens_per_second is None else (1 - alpha) * self.tokens_per_second + alpha * rate
+            )
+
+
+class LLMRouter:
+    """Picks the model used to generate each task, favouring fast and healthy endpoints.
+
+    Every model is tried once before any is preferred. After that a model is picked with probability proportional to
+    (1 - error_rate)^2 / latency, mixed with a uniform `exploration` share so slow models keep being measured. No model
+    is picked for more than `max_share` of the tasks while others are eligible, so generation does not collapse onto a
+    single model.
+    """
+
+    def __init__(self, alpha: float = 0.2, exploration: float = 0.1, max_share: float = 0.5):
+        self.alpha = alpha
+        self.exploration = exploration
+        self.max_share = max_share
+        self.stats: dict[str, ModelStats] = {}
+
+    def weight(self, stats: ModelStats) -> float:
+        if stats.latency is None:
+            # only failed so far, it is kept reachable through exploration
+            return 0.0
+        return (1 - stats.error_rate) ** 2 / max(stats.latency, 1e-3)
+
+    def select(self, llms: list[BaseLLM], rng: random.Random | None = None) -> BaseLLM:
+        rng = rng or random
+        stats = [self.stats.setdefault(llm.model_id, ModelStats()) for llm in llms]
+
+        untried = [llm for llm, s in zip(llms, stats) if s.calls == 0 and s.selections == 0]
+        if untried:
+            choice = untried[0]
+        else:
+            total = sum(s.selections for s in stats)
+            share_limit = max(self.max_share, 1 / len(llms)) * (total + 1)
+            eligible = [i for i, s in enumerate(stats) if s.selections < share_limit] or list(range(len(llms)))
+
+            weights = [self.weight(stats[i]) for i in eligible]
+            weight_sum = sum(weights)
+            probabilities = [
+                (1 - self.exploration) * (w / weight_sum if weight_sum > 0 else 1 / len(eligible))
+                + self.exploration / len(eligible)
+                for w in weights
+            ]
+            choice = llms[rng.choices(eligible, weights=probabilities)[0]]
+
+        self.stats[choice.model_id].selections += 1
+        return choice
+
+    def record(
+        self,
+        llm: BaseLLM,
+        latency: float | None,
+        success: bool,
+        completion_tokens: int | None = None,
+    ) -> None:
+        self.stats.setdefault(llm.model_id, ModelStats()).update(self.alpha, latency, success, completion_tokens)
+
+    def summary(self) -> dict[str, dict]:
+        return {model_id: vars(stats).copy() for model_id, stats in self.stats.items()}
@@ -0,0 +1,106 @@
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from deval.llms.config import MODEL_PRICES
+from deval.utils.tracing import Histogram
+
+
+# the task type the LLM calls of the current thread are made for, set by the task generation loop
+_current_task: ContextVar[str] = ContextVar("llm_usage_task", default="unknown")
+
+
+def estimate_cost(model_id: str, prompt_tokens: int | None, completion_tokens: int | None) -> float | None:
+    """Estimated cost in USD, None for models without a known price."""
+    prices = MODEL_PRICES.get(model_id)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return ((prompt_tokens or 0) * input_price + (completion_tokens or 0) * output_price) / 1_000_000
+
+
+@dataclass
+class UsageStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latency: Histogram = field(default_factory=Histogram)
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.completion_tokens / self.latency.total if self.latency.total else None,
+            "cost": self.cost,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class UsageTracker:
+    """Token usage, estimated cost and latency of the LLM calls, aggregated per (api, model_id, task type).
+
+    Every aggregate is a fixed set of counters and a latency histogram, so memory stays constant however many calls
+    are made.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats: dict[tuple[str, str, str], UsageStats] = {}
+
+    @contextmanager
+    def task(self, task_name: str):
+        """Attributes the LLM calls made within the block to the task type."""
+        token = _current_task.set(task_name)
+        try:
+            yield
+        finally:
+            _current_task.reset(token)
+
+    def record(
+        self,
+        api: str,
+        model_id: str,
+        latency: float,
+        prompt_tokens: int | None = None,
+        completion_tokens: int | None = None,
+        retries: int = 0,
+        error: bool = False,
+    ) -> None:
+        cost = estimate_cost(model_id, prompt_tokens, completion_tokens)
+        with self.lock:
+            stats = self.stats.setdefault((api, model_id, _current_task.get()), UsageStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.prompt_tokens += prompt_tokens or 0
+            stats.completion_tokens += completion_tokens or 0
+            stats.cost += cost or 0.0
+            stats.latency.observe(latency)
+
+    def summary(self) -> dict[str, dict]:
+        with self.lock:
+            return {"/".join(key): stats.to_dict() for key, stats in sorted(self.stats.items())}
+
+    def total_cost(self) -> float:
+        with self.lock:
+            return sum(stats.cost for stats in self.stats.values())
+
+    def export_json(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump({"total_cost": self.total_cost(), "usage": self.summary()}, f, indent=2)
+        return path
+
+
+usage_tracker = UsageTracker()
@@ -0,0 +1,54 @@
+Miner = tuple[int, str] # (uid, hotkey)
+
+
+class DuplicateScreen:
+    """Groups miners by the model hash they committed on chain, before any model is downloaded.
+
+    Within a group only the earliest committer is evaluated. Later committers of the same hash are skipped unless the
+    earliest one is not confirmed, i.e. its downloaded model did not hash to the committed value or it was not
+    evaluated at all, in which case the next committer in block order takes its place.
+    """
+
+    def __init__(self, commitments: dict[Miner, tuple[str | None, int | None]]):
+        """
+        Args:
+            commitments: the committed (model_hash, block) of each miner
+        """
+        groups = {}
+        for miner, (model_hash, block) in commitments.items():
+            if model_hash and block is not None:
+                groups.setdefault(model_hash, []).append((block, miner))
+
+        # committers of the same hash in block order, ties broken by uid
+        self.groups: dict[str, list[Miner]] = {
+            model_hash: [miner for _, miner in sorted(group)]
+            for model_hash, group in groups.items() if len(group) > 1
+        }
+        self.hashes: dict[Miner, str] = {miner: h for h, group in self.groups.items() for miner in group}
+        self.rejected: set[Miner] = set()
+        self.skipped: set[Miner] = set()
+
+    def head(self, model_hash: str) -> Miner | None:
+        """The earliest committer of the hash that has not been rejected."""
+        for miner in self.groups.get(model_hash, []):
+            if miner not in self.rejected:
+                return miner
+        return None
+
+    def should_skip(self, miner: Miner) -> bool:
+        model_hash = self.hashes.get(miner)
+        if model_hash is None or self.head(model_hash) == miner:
+            self.skipped.discard(miner)
+            return False
+
+        self.skipped.add(miner)
+        return True
+
+    def record_outcome(self, miner: Miner, confirmed: bool) -> None:
+        """Records whether the evaluated miner was confirmed as the owner of its committed hash."""
+        if miner in self.hashes and not confirmed:
+            self.rejected.add(miner)
+
+    def pending(self) -> list[Miner]:
+        """Skipped miners that have become the earliest remaining committer of their hash."""
+        return sorted(miner for miner in self.skipped if self.head(self.hashes[miner]) == miner)
@@ -0,0 +1,36 @@
+import time
+
+
+Miner = tuple[int, str] # (uid, hotkey)
+
+
+class MinerMetadataCache:
+    """Caches the (repo_id, model_id) each miner reports over the axon, so miners are not queried one at a time.
+
+    Entries are keyed by uid and hotkey, so a uid taken over by a new hotkey does not inherit the model of the previous
+    owner. They expire after `ttl` seconds and are refreshed lazily by the caller. Only successful responses are
+    cached, so miners that did not answer are queried again the next time they are needed.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: dict[Miner, tuple[str, str, float]] = {} # (uid, hotkey) -> (repo_id, model_id, fetched at)
+
+    def get(self, miner: Miner) -> tuple[str, str] | None:
+        entry = self.entries.get(miner)
+        if entry is None or time.time() - entry[2] > self.ttl:
+            return None
+        return entry[0], entry[1]
+
+    def stale(self, miners: list[Miner]) -> list[Miner]:
+        """The miners without a fresh entry."""
+        return [miner for miner in miners if self.get(miner) is None]
+
+    def update(self, metadata: dict[Miner, tuple[str, str]]) -> None:
+        now = time.time()
+        for miner, (repo_id, model_id) in metadata.items():
+            # an entry of a previous owner of the uid is dropped
+            for key in [key for key in self.entries if key[0] == miner[0] and key != miner]:
+                del self.entries[key]
+            if repo_id and model_id:
+                self.entries[miner] = (repo_id, model_id, now)
@@ -51,6 +51,8 @@ class ModelState:
 
         # reward storage
         self.rewards = {task_name: [] for task_name in TASKS.keys()}
+        # number of tasks the rewards of each task type are averaged over, when fewer than the full task set
+        self.sample_sizes: dict[str, int] = {}
 
 
     def _get_safetensor_files(self, model_dir: str | None):
@@ -64,6 +66,9 @@ class ModelState:
     def add_miner_coldkey(self, coldkey: str):
         self.coldkey = coldkey
 
+    def add_miner_hotkey(self, hotkey: str):
+        self.hotkey = hotkey
+
     def get_model_url(self):
         return self.repo_id + "/" + self.model_id
 
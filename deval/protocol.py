@@ -35,12 +35,15 @@ async def execute_dendrite_call(dendrite_call):
     return responses
 
 
-async def get_metadata_from_miner(validator, uid: int) -> list[bt.synapse]:
-    axons = [validator.metagraph.axons[uid]]
+async def get_metadata_from_miners(
+    validator, miners: list[tuple[int, str]]
+) -> dict[tuple[int, str], tuple[str, str]]:
+    """Queries the model metadata of all (uid, hotkey) miners in a single concurrent dendrite call."""
+    axons = [validator.metagraph.axons[uid] for uid, _ in miners]
     dendrite_call_task = execute_dendrite_call(validator.dendrite(axons=axons, synapse=ModelQuerySynapse(), timeout=5))
     responses = await dendrite_call_task 
 
-    return responses
+    return {miner: (synapse.repo_id, synapse.model_id) for miner, synapse in zip(miners, responses)}
 
 
 class ModelQuerySynapse(bt.Synapse):
@@ -102,17 +105,6 @@ def init_request_from_task(task: Task) -> "EvalRequest":
         llm_response = task.llm_response
     )
 
-class DendriteModelQueryEvent:
-    def __init__(
-        self, responses: list[bt.synapse], 
-    ):
-        for synapse in responses:
-            self.model_id = synapse.model_id
-            self.repo_id = synapse.repo_id
-
-    def __str__(self):
-        return f"Model location: {self.repo_id}/{self.model_id}"
-            
 class BtEvalResponse(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     uid: int
@@ -0,0 +1,108 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+# Racing (successive halving) evaluation: every miner is first screened on a small stratified subset of the tasks,
+# and only the miners that could still reach a paid tier are evaluated on the remaining tasks.
+SCREENING_STAGE = "screening"
+FINAL_STAGE = "final"
+
+# variance assumed for a task type with a single observed reward, the maximum for rewards within [0, 1]
+MAX_REWARD_VARIANCE = 0.25
+
+
+def confidence_z(confidence: float) -> float:
+    """Two sided normal quantile for a confidence level, e.g. 1.96 for 0.95."""
+    return NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+
+def screening_counts(task_counts: dict[str, int], fraction: float) -> dict[str, int]:
+    """Number of tasks of each type used for screening, at least one per non-empty task type."""
+    return {
+        task_name: min(n, max(1, math.ceil(n * fraction))) if n > 0 else 0
+        for task_name, n in task_counts.items()
+    }
+
+
+def stratified_bounds(
+    rewards: dict[str, list[float]],
+    task_counts: dict[str, int],
+    confidence: float,
+) -> tuple[float, float]:
+    """Confidence interval of the average reward a miner would get over all tasks, from its rewards on a subset.
+
+    Each task type is a stratum weighted by its share of the full task set. The finite population correction makes
+    the interval collapse once every task of a type has been evaluated.
+
+    Args:
+        rewards: observed rewards per task name
+        task_counts: total number of tasks per task name in the full evaluation
+        confidence: two sided confidence level, e.g. 0.95
+    Returns:
+        (lower, upper) bounds of the average reward
+    """
+    total = sum(task_counts.values())
+    if total == 0:
+        return 0.0, 0.0
+
+    z = confidence_z(confidence)
+    mean = 0.0
+    variance = 0.0
+    unobserved = 0.0
+    for task_name, n_total in task_counts.items():
+        weight = n_total / total
+        observed = rewards.get(task_name, [])[:n_total]
+        n = len(observed)
+
+        # a task type that was never evaluated could score anywhere within [0, 1]
+        if n == 0:
+            unobserved += weight
+            continue
+
+        mean += weight * float(np.mean(observed))
+        stratum_variance = float(np.var(observed, ddof=1)) if n > 1 else MAX_REWARD_VARIANCE
+        variance += weight ** 2 * stratum_variance / n * (1 - n / n_total)
+
+    half_width = z * math.sqrt(variance)
+    return max(mean - half_width, 0.0), mean + half_width + unobserved
+
+
+def select_contenders(
+    bounds: dict[int, tuple[float, float]],
+    num_paid_tiers: int,
+    tier_improvement_threshold: float,
+) -> list[int]:
+    """Keeps the miners that could still reach a paid tier.
+
+    Two miners are certainly in different tiers when the lower bound of one exceeds the upper bound of the other by
+    the tier improvement threshold. A miner is dropped once there is a chain of num_paid_tiers miners above it that
+    are each certainly separated from the next, as it then ranks at a tier index of num_paid_tiers or more.
+
+    Args:
+        bounds: (lower, upper) confidence bounds of the average reward per uid
+        num_paid_tiers: number of tiers receiving incentive
+        tier_improvement_threshold: the minimum score ratio between consecutive tiers
+    Returns:
+        uids of the contenders, best lower bound first
+    """
+    contenders = []
+    for uid, (_, upper) in bounds.items():
+        if upper <= 0:
+            continue
+
+        # greedily extend the chain with the miner that is certainly above and has the lowest upper bound
+        chain_length = 0
+        target = upper * tier_improvement_threshold
+        while chain_length < num_paid_tiers:
+            above = [u for other, (l, u) in bounds.items() if other != uid and l > target]
+            if not above:
+                break
+            chain_length += 1
+            target = min(above) * tier_improvement_threshold
+
+        if chain_length < num_paid_tiers:
+            contenders.append(uid)
+
+    return sorted(contenders, key=lambda uid: bounds[uid][0], reverse=True)
@@ -0,0 +1,27 @@
+from bisect import bisect_left, insort
+
+
+class IncrementalRanking:
+    """Scores of all miners kept in ranked order while they are updated one miner at a time.
+
+    The ranking is a list sorted by (-score, uid), so an update is a binary search plus a list insertion, and reading
+    the ranking needs no sort.
+    """
+
+    def __init__(self, scores: dict[int, float] | None = None):
+        self.scores: dict[int, float] = dict(scores or {})
+        self.order: list[tuple[float, int]] = sorted((-score, uid) for uid, score in self.scores.items())
+
+    def update(self, uid: int, score: float) -> None:
+        self.remove(uid)
+        self.scores[uid] = score
+        insort(self.order, (-score, uid))
+
+    def remove(self, uid: int) -> None:
+        previous = self.scores.pop(uid, None)
+        if previous is not None:
+            del self.order[bisect_left(self.order, (-previous, uid))]
+
+    def ranked(self) -> list[tuple[int, float]]:
+        """(uid, score) of the miners with a positive score, best first."""
+        return [(uid, -negative_score) for negative_score, uid in self.order if negative_score < 0]
@@ -19,48 +19,72 @@ class RewardResult:
         """ 
 
         self.reward_pipeline = reward_pipeline
-        self.responses = responses
+        self.responses = []
         self.device = device
         self.rewards = []
         self.all_reward_events = []
         self.all_penalty_events = []
 
         for r in responses:
-            reference_score = r.human_agent.reference
-            reference_mistakes = r.human_agent.reference_mistakes
-            reference_true_values = r.human_agent.reference_true_values
-
-            task_rewards = r.human_agent.task.reward_definition
-            task_penalties = r.human_agent.task.penalty_definition
-            
-            reward_events = self.reward_responses(
-                miner_score=r.response.score,
-                miner_extracted_items=r.response.mistakes,
-                reference_score=reference_score,
-                reference_extracted_items=reference_mistakes,
-                models=task_rewards,
-                reward_type=RewardModelTypeEnum.WEIGHTED_REWARD,
-            )
-            self.all_reward_events.append(reward_events)
-
-            penalty_events = self.reward_responses(
-                miner_score=r.response.score,
-                miner_extracted_items=r.response.mistakes,
-                reference_score=reference_score,
-                reference_extracted_items=reference_true_values,
-                models=task_penalties,
-                reward_type=RewardModelTypeEnum.PENALTY,
-            )
-            self.all_penalty_events.append(penalty_events)
+            self.add_response(r)
 
-            reward = self.total_reward(
-                reward_events,
-                penalty_events,
-                task_rewards,
-                task_penalties
-            )
-            self.rewards.append(reward)
+    def add_response(self, r: BtEvalResponse) -> float:
+        """Scores a single response and appends it to the result
+
+        Args:
+            r (BtEvalResponse): Network response to the prompt
+        Returns:
+            float: the total reward of the response
+        """
+        self.responses.append(r)
+
+        reference_score = r.human_agent.reference
+        reference_mistakes = r.human_agent.reference_mistakes
+        reference_true_values = r.human_agent.reference_true_values
+
+        task_rewards = r.human_agent.task.reward_definition
+        task_penalties = r.human_agent.task.penalty_definition
+        
+        reward_events = self.reward_responses(
+            miner_score=r.response.score,
+            miner_extracted_items=r.response.mistakes,
+            reference_score=reference_score,
+            reference_extracted_items=reference_mistakes,
+            models=task_rewards,
+            reward_type=RewardModelTypeEnum.WEIGHTED_REWARD,
+        )
+        self.all_reward_events.append(reward_events)
+
+        penalty_events = self.reward_responses(
+            miner_score=r.response.score,
+            miner_extracted_items=r.response.mistakes,
+            reference_score=reference_score,
+            reference_extracted_items=reference_true_values,
+            models=task_penalties,
+            reward_type=RewardModelTypeEnum.PENALTY,
+        )
+        self.all_penalty_events.append(penalty_events)
+
+        reward = self.total_reward(
+            reward_events,
+            penalty_events,
+            task_rewards,
+            task_penalties
+        )
+        self.rewards.append(reward)
+        return reward
+
+    def add_failure(self, r: BtEvalResponse) -> float:
+        """Appends a response that was never obtained from the miner, with a reward of zero and without running the
+        reward models.
+        """
+        self.responses.append(r)
+        self.all_reward_events.append([])
+        self.all_penalty_events.append([])
 
+        reward = torch.zeros((1,), dtype=torch.float32, device=self.device)
+        self.rewards.append(reward)
+        return reward
 
     def __state_dict__(self):
         # split by task where i = 0 is the first task computed
@@ -0,0 +1,102 @@
+import math
+
+from deval.racing import MAX_REWARD_VARIANCE, confidence_z, select_contenders
+
+
+class RunningStats:
+    """Running mean and variance of a stream of rewards (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @classmethod
+    def from_rewards(cls, rewards: list[float]) -> "RunningStats":
+        stats = cls()
+        for reward in rewards:
+            stats.add(reward)
+        return stats
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return MAX_REWARD_VARIANCE
+        return self.m2 / (self.count - 1)
+
+    def bounds(self, population: int, confidence: float) -> tuple[float, float]:
+        """Confidence interval of the mean reward over all `population` tasks of the task type."""
+        if self.count == 0:
+            return 0.0, 1.0
+
+        correction = max(1 - self.count / population, 0.0) if population > 0 else 0.0
+        half_width = confidence_z(confidence) * math.sqrt(self.variance / self.count * correction)
+        return max(self.mean - half_width, 0.0), self.mean + half_width
+
+
+class AdaptiveSampler:
+    """Decides when a miner has been queried enough on a task type.
+
+    Querying stops once the confidence interval of the miner's mean reward fixes its tier relative to the current
+    leaderboard: either it is certainly separated from every miner evaluated so far, or it can no longer reach a paid
+    tier. Miners whose position is uncertain keep being queried up to max_samples.
+    """
+
+    def __init__(
+        self,
+        min_samples: int,
+        max_samples: int | None,
+        confidence: float,
+        num_paid_tiers: int,
+        tier_improvement_threshold: float,
+    ):
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.confidence = confidence
+        self.num_paid_tiers = num_paid_tiers
+        self.tier_improvement_threshold = tier_improvement_threshold
+
+    def sample_limit(self, num_tasks: int) -> int:
+        return min(num_tasks, self.max_samples) if self.max_samples else num_tasks
+
+    def should_stop(
+        self,
+        stats: RunningStats,
+        population: int,
+        leaderboard: dict[int, tuple[float, float]],
+    ) -> tuple[bool, str]:
+        """
+        Args:
+            stats: the rewards of the miner on the task type so far
+            population: number of tasks of the task type
+            leaderboard: (lower, upper) bounds of the mean reward of the other miners on the task type
+        Returns:
+            whether to stop querying, and the reason for the decision
+        """
+        if stats.count >= self.sample_limit(population):
+            return True, "all samples used"
+        if stats.count < self.min_samples or not leaderboard:
+            return False, "too few samples"
+
+        lower, upper = stats.bounds(population, self.confidence)
+        threshold = self.tier_improvement_threshold
+
+        separated = all(
+            lower > other_upper * threshold or upper * threshold < other_lower
+            for other_lower, other_upper in leaderboard.values()
+        )
+        if separated:
+            return True, f"tier fixed with mean within [{lower:.3f}, {upper:.3f}]"
+
+        # the miner is keyed as None so it never collides with a leaderboard uid
+        contenders = select_contenders({**leaderboard, None: (lower, upper)}, self.num_paid_tiers, threshold)
+        if None not in contenders:
+            return True, f"unable to reach a paid tier with mean within [{lower:.3f}, {upper:.3f}]"
+
+        return False, "tier uncertain"
@@ -0,0 +1,46 @@
+Miner = tuple[int, str] # (uid, hotkey)
+
+# miners are evaluated in increasing order of priority class, so an epoch cut short has scored the miners that
+# matter most for the weights
+TIER_HOLDER_PRIORITY = 0 # holding a paid tier or a top incentive
+FRESH_PRIORITY = 1 # registered or committed a model since the previous epoch started
+UNCHANGED_PRIORITY = 2
+
+
+def miner_priority(miner: Miner, tier_holders: set[int], fresh: set[Miner]) -> int:
+    if miner[0] in tier_holders:
+        return TIER_HOLDER_PRIORITY
+    if miner in fresh:
+        return FRESH_PRIORITY
+    return UNCHANGED_PRIORITY
+
+
+def prioritize_miners(
+    miners: list[Miner],
+    scores: dict[int, float],
+    tier_holders: set[int],
+    fresh: set[Miner],
+) -> list[Miner]:
+    """Orders the miners of an epoch by the expected value of evaluating them.
+
+    Tier holders and top incentive uids come first, then new registrants and fresh commits, then the unchanged
+    miners. Within a class miners are ordered by their moving average score, so unchanged low scorers come last.
+
+    Args:
+        miners: the miners to schedule
+        scores: the moving average score of each uid
+        tier_holders: uids holding a paid tier or a top incentive
+        fresh: miners that registered or committed a model since the previous epoch started
+    Returns:
+        the miners in evaluation order
+    """
+    return sorted(
+        miners,
+        key=lambda miner: (miner_priority(miner, tier_holders, fresh), -scores.get(miner[0], 0.0), miner[0])
+    )
+
+
+def follow_schedule(schedule: list[Miner], miners: list[Miner]) -> list[Miner]:
+    """The miners in the order of the schedule, followed by miners that were not scheduled in their given order."""
+    position = {miner: i for i, miner in enumerate(schedule)}
+    return sorted(miners, key=lambda miner: position.get(miner, len(schedule)))
@@ -3,6 +3,10 @@ from deval.llms.openai_llm import OpenAILLM
 from deval.llms.bedrock_llm import AWSBedrockLLM
 from deval.llms.base_llm import BaseLLM
 from deval.llms.config import LLMAPIs, LLMArgs, LLMFormatType, SUPPORTED_MODELS
+from deval.llms.access_cache import ModelAccessCache, filter_accessible
+from deval.llms.router import LLMRouter
+from deval.llms.usage import usage_tracker
+from deval.tasks.json_repair import json_repairs
 from deval.tasks.hallucination import (
     HallucinationWikipediaTopicTask, 
     HallucinationBaseTask,
@@ -26,8 +30,9 @@ from deval.tasks.task import Task, TasksEnum
 from deval.tools import (
     WikiDataset, GenericDataset, AttributionDataset
 )
+from deval.utils.tracing import tracer
+from deval.racing import SCREENING_STAGE, FINAL_STAGE, screening_counts
 import os 
-import numpy as np
 import random 
 
 
@@ -88,8 +93,11 @@ TASKS = {
 
 class TaskRepository:
 
-    def __init__(self, allowed_models: list[str] | None = None):
+    def __init__(self, allowed_models: list[str] | None = None, access_cache: ModelAccessCache | None = None):
         self.tasks: dict[TasksEnum, list[Task]] = {} 
+        self.screening_fraction: float | None = None # set when miners are raced on a subset of the tasks first
+        self.access_cache = access_cache or ModelAccessCache()
+        self.router = LLMRouter()
 
         # initialize available models 
         self.supported_models = SUPPORTED_MODELS
@@ -100,13 +108,35 @@ class TaskRepository:
         self.available_models = self.get_available_models()
 
     def __getstate__(self):
+        # the clients can not be pickled, only which models were available is kept
         state = self.__dict__.copy()
-        del state['available_models']
+        state['available_models'] = [(llm.api, llm.model_id) for llm in self.available_models]
         return state
 
     def __setstate__(self, state):
+        state.setdefault("screening_fraction", None)
+        state.setdefault("access_cache", None)
+        state.setdefault("router", LLMRouter())
+        available_models = state.pop("available_models", None)
         self.__dict__.update(state)
-        self.available_models = self.get_available_models()
+        if self.access_cache is None:
+            self.access_cache = ModelAccessCache()
+
+        # repositories saved before the model ids were kept are checked again
+        if available_models is None:
+            self.available_models = self.get_available_models()
+        else:
+            self.available_models = [self.build_llm(api, model_id) for api, model_id in available_models]
+
+    @staticmethod
+    def build_llm(api: LLMAPIs, model_id: str) -> BaseLLM:
+        # TODO: integrate with config settings 
+        model_kwargs = LLMArgs(format = LLMFormatType.TEXT)
+        if api == LLMAPIs.OPENAI:
+            return OpenAILLM(model_id=model_id, model_kwargs=model_kwargs)
+        if api == LLMAPIs.BEDROCK:
+            return AWSBedrockLLM(model_id=model_id, model_kwargs=model_kwargs)
+        raise ValueError(f"LLM API {api} not supported")
 
     def filter_to_allowed_models(self, allowed_models: list[str] | None) -> dict:
         filtered_dict = {}
@@ -116,34 +146,25 @@ class TaskRepository:
 
         return filtered_dict
 
+    @tracer.timed("llm_availability")
     def get_available_models(self) -> list[BaseLLM]:
         available_models = []
 
-        # TODO: integrate with config settings 
-        model_kwargs = LLMArgs(format = LLMFormatType.TEXT)
-
         # go through each of our models and store the available ones
         openai_key = os.getenv("OPENAI_API_KEY", None)
         if openai_key is not None:
             for model_id in self.supported_models.get(LLMAPIs.OPENAI, []):
-                openai_llm = OpenAILLM(
-                    model_id=model_id,
-                    model_kwargs=model_kwargs
-                )
-                available_models.append(openai_llm)
+                available_models.append(self.build_llm(LLMAPIs.OPENAI, model_id))
         
         aws_access_key = os.getenv("AWS_ACCESS_KEY_ID", None)
         aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", None)
         if aws_access_key is not None and aws_secret_key is not None:
-            for model_id in self.supported_models.get(LLMAPIs.BEDROCK, []):
-                bedrock_llm = AWSBedrockLLM(
-                    model_id=model_id,
-                    model_kwargs=model_kwargs
-                )
-                is_model_accessible = bedrock_llm.check_model_id_access()
-                
-                if is_model_accessible:
-                    available_models.append(bedrock_llm)
+            bedrock_llms = [
+                self.build_llm(LLMAPIs.BEDROCK, model_id) 
+                for model_id in self.supported_models.get(LLMAPIs.BEDROCK, [])
+            ]
+            # access is only probed with a query when there is no recent result for these credentials
+            available_models += filter_accessible(bedrock_llms, self.access_cache, credentials=aws_access_key)
 
             
         # we only require that at least one model can be run 
@@ -153,7 +174,7 @@ class TaskRepository:
         return available_models
 
     def get_random_llm(self) -> BaseLLM:
-        return np.random.choice(self.available_models)
+        return self.router.select(self.available_models)
 
     def create_task(self, llm_pipeline: BaseLLM, task_name: str) -> Task:
         
@@ -182,16 +203,49 @@ class TaskRepository:
             for i in range(n):
                 print(f"Generating Task Name: {task_name}, iteration: {i}")
                 llm_pipeline = self.get_random_llm()
+                latency_before = llm_pipeline.total_latency
+                tokens_before = llm_pipeline.completion_tokens
                 try:
-                    task = self.create_task(llm_pipeline, task_name)
+                    with tracer.span(f"task_generation.{task_name}"), usage_tracker.task(task_name):
+                        task = self.create_task(llm_pipeline, task_name)
                     self.tasks[task_name].append(task)
+                    success = True
                 except:
-                    continue
+                    success = False
+
+                # the time spent in the LLM calls of the task, excluding the dataset lookups
+                latency = (llm_pipeline.total_latency - latency_before) or None
+                completion_tokens = (llm_pipeline.completion_tokens - tokens_before) or None
+                self.router.record(llm_pipeline, latency, success, completion_tokens)
+
+        print(f"LLM routing stats: {self.router.summary()}")
+        print(f"LLM usage: {usage_tracker.summary()}, estimated cost: ${usage_tracker.total_cost():.4f}")
+        print(f"Tool output parsing: {json_repairs.summary()}")
                     
 
-    def get_all_tasks(self) -> Task:
+    def get_task_counts(self, stage: str | None = None) -> dict[str, int]:
+        return {task_name: len(tasks) for task_name, tasks in self.get_all_tasks(stage)}
+
+    def get_all_tasks(self, stage: str | None = None) -> Task:
+        """Yields the tasks of each task type. The screening stage is a stratified subset of every task type and
+        the final stage holds the remaining tasks.
+        """
+        if stage is None:
+            yield from self.tasks.items()
+            return
+
+        # without a screening fraction every task belongs to the screening stage
+        counts = screening_counts(
+            {task_name: len(tasks) for task_name, tasks in self.tasks.items()}, 
+            self.screening_fraction if self.screening_fraction is not None else 1.0
+        )
         for task_name, tasks in self.tasks.items():
-            yield task_name, tasks
+            if stage == SCREENING_STAGE:
+                yield task_name, tasks[:counts[task_name]]
+            elif stage == FINAL_STAGE:
+                yield task_name, tasks[counts[task_name]:]
+            else:
+                raise ValueError(f"Unknown evaluation stage: {stage}")
 
 
 
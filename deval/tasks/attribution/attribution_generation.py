@@ -121,9 +121,7 @@ class AttributionGenerationTask(AttributionBaseTask):
 
             # format 
             try:
-                json_response = self.parse_llm_query(response)
-                json_response['true_or_false'] = true_or_false
-                resp_tmp = Config(**json_response)
+                resp_tmp = self.parse_llm_query(response, Config, true_or_false=true_or_false)
                 responses.append(resp_tmp)
             except (JSONDecodeError, ValidationError) as e:
                 num_action_groups -= 1 # we decrease number of claims for each unparseable response
@@ -113,9 +113,7 @@ class HallucinatioGenerationTask(HallucinationBaseTask):
 
             # format 
             try:
-                json_response = self.parse_llm_query(response)
-                json_response['true_or_false'] = true_or_false
-                resp_tmp = Config(**json_response)
+                resp_tmp = self.parse_llm_query(response, Config, true_or_false=true_or_false)
                 responses.append(resp_tmp)
             except (JSONDecodeError, ValidationError) as e:
                 num_claims -= 1 # we decrease number of claims for each unparseable response
@@ -112,7 +112,7 @@ class HallucinationWikipediaGenTask(HallucinationBaseTask):
                     )
                     responses.append(resp_tmp)
                     past_responses.append(json_response['response'])
-                except (JSONDecodeError, ValidationError) as e:
+                except (JSONDecodeError, ValidationError, KeyError) as e:
                     print(f"Experienced {e} in Hallucination task")
                     continue
                 
@@ -71,6 +71,10 @@ but if the difficulty is easy then it should be easy for the reader.
 Do not return any other text besides the requested summary. 
 """
 
+class KeyTopics(BaseModel):
+    key_topics: list[str]
+
+
 class Config(BaseModel):
     topic: str
     claim: str
@@ -114,10 +118,8 @@ class HallucinationWikipediaTopicTask(HallucinationBaseTask):
         )
         response = self.generate_input(llm_pipeline, query_prompt, topic_system_prompt, tool_schema)
         try:
-            json_response = self.parse_llm_query(response)
-            topics = json_response['key_topics']
+            topics = self.parse_llm_query(response, KeyTopics).key_topics
         except (JSONDecodeError, ValidationError) as e:
-            num_summaries -= 1 # we decrease number of claims for each unparseable response
             bt.logging.debug(f"Experienced {e} in Summary Completeness Wikipedia task")
 
         for topic in topics:
@@ -0,0 +1,208 @@
+# salvages the JSON of tool outputs that json.loads rejects, so that a paid generation call is not wasted
+import ast
+import json
+import re
+import threading
+from collections import Counter
+from json.decoder import JSONDecodeError
+from typing import Any
+
+from pydantic import BaseModel
+
+
+CODE_FENCE_REGEX = re.compile(r"```[\w-]*[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+
+STRING_PATTERN = r"(?:\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')"
+# the endings of a truncated output that can not be kept, a key without its value and a scalar that may be cut short
+KEY_WITH_COLON_REGEX = re.compile(STRING_PATTERN + r"\s*:$")
+KEY_WITHOUT_COLON_REGEX = re.compile(r"([{,])\s*" + STRING_PATTERN + r"$")
+BARE_SCALAR_REGEX = re.compile(r"([:,\[])\s*[\w.+-]+$")
+
+# keys of a tool call wrapping the arguments, as returned by mistral
+TOOL_CALL_KEYS = {"name", "arguments", "type", "id"}
+
+
+class RepairStats:
+    """How many tool outputs parsed as is, were repaired (by repair) or could not be salvaged."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts: Counter[str] = Counter()
+
+    def record(self, outcome: str, repairs: list[str] = ()) -> None:
+        with self.lock:
+            self.counts[outcome] += 1
+            self.counts.update(f"repair.{repair}" for repair in repairs)
+
+    def summary(self) -> dict[str, int]:
+        with self.lock:
+            return dict(sorted(self.counts.items()))
+
+
+json_repairs = RepairStats()
+
+
+def scan(text: str, start: int) -> tuple[int | None, list[str], int | None]:
+    """Scans the JSON value starting at `start`, with strings in either quote.
+
+    Returns:
+        the end of the value (None if it is not closed), the closers of the brackets left open and the start of the
+        string left open
+    """
+    closers = []
+    quote = None
+    string_start = None
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            string_start = i
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+            if not closers:
+                return i + 1, [], None
+    return None, closers, string_start if quote is not None else None
+
+
+def close_truncated(body: str) -> str:
+    """Closes a truncated value, keeping only its complete parts.
+
+    Only the value at the very end, an open string or a trailing scalar, may have been cut short. It is dropped with
+    the key or separator left dangling before it, and the values preceding it are kept. A required field that was cut
+    off is therefore missing rather than shortened, and fails validation.
+    """
+    _, closers, string_start = scan(body, 0)
+    if string_start is not None:
+        body = body[:string_start]
+    else:
+        body = BARE_SCALAR_REGEX.sub(r"\1", body.rstrip())
+
+    body = KEY_WITH_COLON_REGEX.sub("", body.rstrip())
+    if closers and closers[-1] == "}":
+        # in an object a string after a bracket or a separator is a key
+        body = KEY_WITHOUT_COLON_REGEX.sub(r"\1", body)
+    body = body.rstrip()
+    if body.endswith(","):
+        body = body[:-1]
+    return body + "".join(reversed(closers))
+
+
+def loads(text: str) -> tuple[Any, bool]:
+    """Parses JSON, or a python literal for outputs with single quotes. Returns the value and if it was a literal."""
+    try:
+        return json.loads(text), False
+    except JSONDecodeError:
+        pass
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        raise JSONDecodeError("Unable to repair the JSON", text, 0)
+    if not isinstance(value, (dict, list)):
+        raise JSONDecodeError("Unable to repair the JSON", text, 0)
+    return value, True
+
+
+def repair_json(text: str) -> tuple[Any, list[str]]:
+    """Parses the JSON of an LLM output, repairing the common ways it is malformed.
+
+    Handles markdown code fences, text around the JSON, single quoted strings and python literals, and outputs
+    truncated by the token limit, whose complete parts are kept and whose brackets are closed.
+
+    Returns:
+        the parsed value and the repairs that were needed
+    Raises:
+        JSONDecodeError: the output could not be salvaged
+    """
+    try:
+        return json.loads(text), []
+    except JSONDecodeError as e:
+        error = e
+
+    repairs = []
+    fence = CODE_FENCE_REGEX.search(text)
+    if fence:
+        text = fence.group(1)
+        repairs.append("code_fence")
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise error
+    start = min(starts)
+
+    end, _, _ = scan(text, start)
+    body = text[start:end].strip() if end is not None else text[start:].rstrip()
+    if text[:start].strip() or (end is not None and text[end:].strip()):
+        repairs.append("surrounding_text")
+
+    if end is None:
+        repairs.append("truncated")
+        body = close_truncated(body)
+
+    try:
+        value, literal = loads(body)
+    except JSONDecodeError:
+        raise error
+    if literal:
+        repairs.append("python_literal")
+    return value, repairs
+
+
+def unwrap_tool_call(value: Any, repairs: list[str]) -> Any:
+    """The arguments of a tool call wrapping the output, which may themselves be encoded as a JSON string."""
+    if isinstance(value, str):
+        value, nested = repair_json(value)
+        repairs.extend(["encoded_string", *nested])
+
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict) and "arguments" in value[0]:
+        value = value[0]
+    if isinstance(value, dict) and "arguments" in value and set(value) <= TOOL_CALL_KEYS:
+        value = value["arguments"]
+        repairs.append("arguments")
+        if isinstance(value, str):
+            value, nested = repair_json(value)
+            repairs.extend(nested)
+    return value
+
+
+def parse_tool_output(text: str, model: type[BaseModel] | None = None, **fields) -> dict | BaseModel:
+    """Parses the JSON object of a tool output, repairing it where needed, and counts the outcome.
+
+    Args:
+        text: the output of the LLM
+        model: the pydantic model the output is validated against, with `fields` added to it
+    Returns:
+        the model, or the parsed object without a model
+    Raises:
+        JSONDecodeError: the output is not a JSON object, even after repairs
+        ValidationError: the output does not match the model
+    """
+    repairs = []
+    try:
+        if not isinstance(text, str):
+            raise JSONDecodeError(f"Expected a string, got {type(text).__name__}", "", 0)
+        value, repairs = repair_json(text)
+        value = unwrap_tool_call(value, repairs)
+        if not isinstance(value, dict):
+            raise JSONDecodeError(f"Expected a JSON object, got {type(value).__name__}", text, 0)
+        if model is not None:
+            value = model(**{**value, **fields})
+    except Exception:
+        json_repairs.record("failed", repairs)
+        raise
+
+    json_repairs.record("repaired" if repairs else "valid", repairs)
+    return value
@@ -83,10 +83,7 @@ class RelevancyWikipediaTask(RelevancyBaseTask):
         response = self.generate_input(llm_pipeline, query_prompt, system_prompt, tool_schema)
 
         # format 
-        json_response = self.parse_llm_query(response)
-        json_response['context'] = content
-        json_response['relevant_or_not'] = relevant_or_not
-        response = Config(**json_response)
+        response = self.parse_llm_query(response, Config, context=content, relevant_or_not=relevant_or_not)
         
 
         self.generate_reference(response)
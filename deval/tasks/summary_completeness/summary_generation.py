@@ -93,8 +93,7 @@ class CompletenessGenerationTask(CompletenessBaseTask):
 
             # format 
             try:
-                json_response = self.parse_llm_query(response)
-                resp_tmp = Config(**json_response)
+                resp_tmp = self.parse_llm_query(response, Config)
                 responses.append(resp_tmp)
             except (JSONDecodeError, ValidationError) as e:
                 num_summaries -= 1 # we decrease number of claims for each unparseable response
@@ -1,4 +1,6 @@
 import bittensor as bt
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from deval.tasks.tool_schema import ToolSchemaGenerator
 import random
@@ -51,11 +53,43 @@ that we are looking to summarize.  The summary should only summarize information
 Do not return any other text besides the requested summary. 
 """
 
+TOPIC_SUMMARIES_PROMPT_TEMPLATE = """\
+Your goal is to generate one summary for each of the provided topics using the provided context. Each summary should be no more \
+than 100 words and should only summarize its topic.  You must return a summary for every topic, in the order the topics are given.
+
+I will provide two pieces of information: a context and a list of topics.  The context represents the entire article and each topic is a key point \
+that we are looking to summarize.  The summaries should only summarize information based on the provided context and should not contain extra fluff. 
+
+# Context:
+{context}
+
+# Topics:
+{topics}
+
+#JSON structure
+{{
+    "summaries": list[{{"topic": string, "summary": string}}]
+}}
+
+Return the requested information as dictated by the provided tool schema. Do not return any other text besides the JSON response.
+"""
+
+# output tokens allowed per topic when all summaries are generated in one call, a 100 word summary is ~130 tokens
+SUMMARY_TOKENS_PER_TOPIC = 200
+
+class KeyTopics(BaseModel):
+    key_topics: list[str]
+
+
 class Config(BaseModel):
     topic: str
     summary: str
 
 
+class TopicSummaries(BaseModel):
+    summaries: list[Config]
+
+
 @dataclass
 class CompletenessWikipediaTask(CompletenessBaseTask):
     properties = {
@@ -69,12 +103,31 @@ class CompletenessWikipediaTask(CompletenessBaseTask):
     }
     required_values = ["key_topics"]
 
+    summaries_properties = {
+        "summaries": {
+            "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "topic": {"type": "string", "description": "The topic, exactly as provided."},
+                        "summary": {"type": "string", "description": "The summary of the topic."},
+                    },
+                    "required": ["topic", "summary"],
+                },
+            "description": "The generated summaries, one for each provided topic and in the same order.",
+        },
+    }
+    summaries_required_values = ["summaries"]
+
+    # generate all topic summaries in a single call, topics it does not cover are summarized one call per topic
+    single_call_summaries = True
+    max_parallel_summaries = 8
+
 
     def __init__(self, llm_pipeline, context):
         full_content = context.content
         self.context = context
         topics = []
-        summaries = []
 
 
         topic_system_prompt = TOPIC_GEN_SYSTEM_PROMPT
@@ -88,28 +141,12 @@ class CompletenessWikipediaTask(CompletenessBaseTask):
         response = self.generate_input(llm_pipeline, query_prompt, topic_system_prompt, tool_schema)
         
         try:
-            json_response = self.parse_llm_query(response)
-            topics = json_response['key_topics']
+            topics = self.parse_llm_query(response, KeyTopics).key_topics
         except (JSONDecodeError, ValidationError) as e:
-            num_summaries -= 1 # we decrease number of claims for each unparseable response
             bt.logging.debug(f"Experienced {e} in Summary Completeness Wikipedia task")
 
-        for topic in topics:
-            
-            query_prompt = TOPIC_SUMMARY_PROMPT_TEMPLATE.format(
-                topic=topic, 
-                context=full_content
-            )
-            summary = self.generate_input(llm_pipeline, query_prompt, TOPIC_GEN_SYSTEM_PROMPT, None)
-
-            # format 
-            summaries.append(
-                Config(
-                    topic=topic,
-                    summary=summary
-                )
-            )
-               
+        summaries = self.generate_summaries(llm_pipeline, topics, full_content)
+
         self.generate_reference(summaries, len(summaries), full_content)
         
         self.topic = context.title
@@ -118,6 +155,62 @@ class CompletenessWikipediaTask(CompletenessBaseTask):
         self.api = llm_pipeline.api.value
         self.model_id = llm_pipeline.model_id
 
+    def generate_summaries(self, llm_pipeline, topics: list[str], context: str) -> list[Config]:
+        """One summary per topic, in the order of the topics."""
+        summaries = {}
+        if self.single_call_summaries and topics:
+            summaries = self.generate_summaries_single_call(llm_pipeline, topics, context)
+
+        missing = [topic for topic in topics if topic not in summaries]
+        if missing:
+            summaries.update(self.generate_summaries_per_topic(llm_pipeline, missing, context))
+
+        return [Config(topic=topic, summary=summaries[topic]) for topic in topics]
+
+    def generate_summaries_single_call(self, llm_pipeline, topics: list[str], context: str) -> dict[str, str]:
+        """Summaries of the topics from a single tool call, only the topics it returned a summary for are included."""
+        tool_schema_generator = ToolSchemaGenerator(
+            self.name, self.desc, self.summaries_properties, self.summaries_required_values
+        )
+        query_prompt = TOPIC_SUMMARIES_PROMPT_TEMPLATE.format(
+            context=context,
+            topics="\n".join(f"- {topic}" for topic in topics)
+        )
+        response = self.generate_input(
+            llm_pipeline,
+            query_prompt,
+            TOPIC_SUMMARY_SYSTEM_PROMPT,
+            tool_schema_generator.get_schema(llm_pipeline),
+            max_tokens=SUMMARY_TOKENS_PER_TOPIC * len(topics)
+        )
+
+        try:
+            returned = self.parse_llm_query(response, TopicSummaries).summaries
+        except (JSONDecodeError, ValidationError) as e:
+            bt.logging.debug(f"Experienced {e} generating all summaries at once, summarizing each topic separately")
+            return {}
+
+        if len(returned) == len(topics):
+            # topics can come back reworded, a summary for each of them is matched by position
+            return {topic: r.summary for topic, r in zip(topics, returned) if r.summary.strip()}
+
+        by_topic = {r.topic.strip().lower(): r.summary for r in returned if r.summary.strip()}
+        return {topic: by_topic[topic.strip().lower()] for topic in topics if topic.strip().lower() in by_topic}
+
+    def generate_summaries_per_topic(self, llm_pipeline, topics: list[str], context: str) -> dict[str, str]:
+        """Summaries of the topics with one call per topic, made concurrently."""
+        def summarize(topic: str) -> str:
+            query_prompt = TOPIC_SUMMARY_PROMPT_TEMPLATE.format(
+                topic=topic, 
+                context=context
+            )
+            return self.generate_input(llm_pipeline, query_prompt, TOPIC_GEN_SYSTEM_PROMPT, None)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_summaries, len(topics))) as pool:
+            # each call runs in a copy of the current context, so its usage is attributed to this task
+            futures = [pool.submit(contextvars.copy_context().run, summarize, topic) for topic in topics]
+            return {topic: future.result() for topic, future in zip(topics, futures)}
+
     def generate_reference(self, responses: list[Config], num_summaries: int, context: str):
         # context input 
         self.rag_context = context
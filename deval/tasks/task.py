@@ -2,8 +2,9 @@ import time
 from abc import ABC
 from dataclasses import dataclass, asdict
 from enum import Enum
+from pydantic import BaseModel
 from deval.llms.base_llm import BaseLLM
-import json
+from deval.tasks.json_repair import parse_tool_output
 from enum import Enum
 
 class TasksEnum(Enum):
@@ -65,21 +66,26 @@ class Task(ABC):
         return state
 
 
-    def generate_input(self, llm_pipeline: BaseLLM, prompt: str, system_prompt: str, tool_schema: dict) -> str:
+    def generate_input(
+        self, llm_pipeline: BaseLLM, prompt: str, system_prompt: str, tool_schema: dict, max_tokens: int | None = None
+    ) -> str:
         """Generates a query to be used for generating the challenge"""
         t0 = time.time()
+        # the output limit is only overridden when asked for, so pipelines without the argument keep working
+        limits = {} if max_tokens is None else {"max_tokens": max_tokens}
         input = llm_pipeline.query(
             prompt=prompt,
             system_prompt=system_prompt,
-            tool_schema = tool_schema
+            tool_schema = tool_schema,
+            **limits
         )
 
         self.query_time = time.time() - t0
         return input
 
-    def parse_llm_query(self, query) -> dict:
-        json_query = json.loads(query)
-        return json_query
+    def parse_llm_query(self, query, model: type[BaseModel] | None = None, **fields) -> dict | BaseModel:
+        """Parses the tool output of the LLM, repairing malformed JSON, and validates it against `model` if given."""
+        return parse_tool_output(query, model, **fields)
 
     def format_challenge(self, challenge) -> str:
         """Formats the challenge to be used for the conversation"""
@@ -78,6 +78,7 @@ class Dataset(ABC):
 
         info["source"] = self.__class__.__name__
         info["stats"] = {
+            **(info.get("stats") or {}),  # stats recorded by the dataset, such as the context budget
             "fetch_time": time.time() - t0,
             "num_tries": tries,
             "fetch_method": method,
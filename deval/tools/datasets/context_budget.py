@@ -0,0 +1,179 @@
+import math
+import os
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+
+import bittensor as bt
+
+
+DEFAULT_CONTEXT_TOKENS = 3000
+# the tokenizer of the relevance reward model, which the validator downloads anyway, so it is normally cached locally
+DEFAULT_TOKENIZER = "WhereIsAI/UAE-Large-V1"
+TOKENIZER_RETRY_INTERVAL = 600
+CHARS_PER_TOKEN = 3 # conservative estimate for english text, only used while the tokenizer can not be loaded
+
+WORD_REGEX = re.compile(r"\w+")
+
+_tokenizer = None
+_tokenizer_retry_at = 0.0
+_tokenizer_lock = threading.Lock()
+
+
+def default_context_tokens() -> int:
+    """The token cap of article contexts, 0 disables trimming."""
+    return int(os.getenv("WIKI_CONTEXT_MAX_TOKENS", DEFAULT_CONTEXT_TOKENS))
+
+
+def tokenizer_id() -> str:
+    """The Hugging Face tokenizer contexts are counted with, set by CONTEXT_TOKENIZER."""
+    return os.getenv("CONTEXT_TOKENIZER", DEFAULT_TOKENIZER)
+
+
+def load_tokenizer():
+    """Loads the tokenizer from the local Hugging Face cache, and only from the hub when it is not cached."""
+    error = None
+    for local_files_only in (True, False):
+        try:
+            from transformers import AutoTokenizer
+            # articles are longer than the model window of the tokenizer, they are only counted and never fed to it
+            return AutoTokenizer.from_pretrained(
+                tokenizer_id(), model_max_length=sys.maxsize, local_files_only=local_files_only
+            )
+        except Exception as e:
+            error = e
+
+    bt.logging.warning(
+        f"Unable to load the {tokenizer_id()} tokenizer, context tokens are estimated for the next "
+        f"{TOKENIZER_RETRY_INTERVAL}s: {error}"
+    )
+    return None
+
+
+def get_tokenizer():
+    """The transformers tokenizer used to count tokens, None while it can not be loaded.
+
+    A failed load is retried after `TOKENIZER_RETRY_INTERVAL` seconds, so a transient hub failure does not leave the
+    process on the estimate.
+    """
+    global _tokenizer, _tokenizer_retry_at
+    if _tokenizer is not None or time.monotonic() < _tokenizer_retry_at:
+        return _tokenizer
+
+    with _tokenizer_lock:
+        if _tokenizer is None and time.monotonic() >= _tokenizer_retry_at:
+            _tokenizer = load_tokenizer()
+            if _tokenizer is None:
+                _tokenizer_retry_at = time.monotonic() + TOKENIZER_RETRY_INTERVAL
+            else:
+                # counts cached while the tokenizer was missing are estimates
+                count_tokens.cache_clear()
+    return _tokenizer
+
+
+def tokenizer_name() -> str:
+    return tokenizer_id() if get_tokenizer() is not None else "estimate"
+
+
+def encode(text: str) -> list[int]:
+    return get_tokenizer().encode(text, add_special_tokens=False)
+
+
+@lru_cache(maxsize=10000)
+def count_tokens(text: str) -> int:
+    """Number of tokens of the text, cached so that the sections of a cached article are only tokenized once."""
+    if get_tokenizer() is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """The longest prefix of the text within `max_tokens`, cut at a line or word boundary where possible."""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        prefix = text[:max_tokens * CHARS_PER_TOKEN]
+    elif max_tokens <= 0:
+        prefix = ""
+    elif not tokenizer.is_fast:
+        prefix = tokenizer.decode(encode(text)[:max_tokens])
+    else:
+        # the prefix is cut from the text itself, decoding the tokens would normalize it, e.g. lowercase it
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        prefix = text[:offsets[max_tokens - 1][1]]
+
+    for boundary in ("\n", " "):
+        cut = prefix.rfind(boundary)
+        if cut > len(prefix) // 2:
+            return prefix[:cut].rstrip()
+    return prefix
+
+
+def words(text: str) -> set[str]:
+    return set(WORD_REGEX.findall(text.lower()))
+
+
+def budget_sections(
+    sections: dict,
+    max_tokens: int,
+    reference: str = "",
+) -> tuple[dict, dict]:
+    """Picks the most informative sections of an article that fit in `max_tokens`.
+
+    A section is worth the number of distinct words it shares with the reference (the article summary) plus a fraction
+    of its other distinct words, so sections about the subject of the article are preferred over lists and trivia.
+    Sections are taken greedily by worth per token and returned in article order. When not even the best section fits
+    it is truncated to the budget, so the context is never empty.
+
+    Args:
+        sections: section key to the lines of the section, as returned by `process_page`
+        max_tokens: the token cap of the joined content, 0 keeps every section
+        reference: text describing the subject of the article
+    Returns:
+        the selected sections, and the budget stats to record in the context
+    """
+    # the content is joined with newlines, one token per separator is a safe upper bound
+    tokens = {key: count_tokens("\n".join(lines)) + 1 for key, lines in sections.items()}
+    article_tokens = sum(tokens.values())
+    stats = {
+        "max_tokens": max_tokens,
+        "article_tokens": article_tokens,
+        "tokens": article_tokens,
+        "sections_total": len(sections),
+        "sections_kept": len(sections),
+        "truncated": False,
+        "tokenizer": tokenizer_name(),
+    }
+    if not max_tokens or article_tokens <= max_tokens:
+        return sections, stats
+
+    reference_words = words(reference)
+
+    def worth(key) -> float:
+        section_words = words("\n".join(sections[key]))
+        shared = len(section_words & reference_words)
+        return shared + 0.1 * (len(section_words) - shared)
+
+    ranked = sorted(sections, key=lambda key: worth(key) / tokens[key], reverse=True)
+
+    selected, used = set(), 0
+    for key in ranked:
+        if used + tokens[key] <= max_tokens:
+            selected.add(key)
+            used += tokens[key]
+
+    if selected:
+        kept = {key: lines for key, lines in sections.items() if key in selected}
+    else:
+        best = max(sections, key=worth)
+        text = truncate_to_tokens("\n".join(sections[best]), max_tokens - 1)
+        kept = {best: text.splitlines()}
+        used = count_tokens(text) + 1
+        stats["truncated"] = True
+
+    stats.update(tokens=used, sections_kept=len(kept))
+    return kept, stats
@@ -20,18 +20,48 @@ import re
 import sys
 import random
 import datetime
+import numpy as np
 import bittensor as bt
 import wikipedia as wiki
 from typing import Dict, List
 from queue import Queue, Full
 from functools import lru_cache
 from .base import Dataset
+from .context_budget import budget_sections, default_context_tokens
 from ..selector import Selector
 
 
 # Create a queue called CACHED_ARTICLES to store wikipedia articles that have been fetched
 CACHED_ARTICLES = Queue(maxsize=300)
 
+# matches wikipedia section headings such as "== History ==" or "=== Early life ==="
+SECTION_HEADING_REGEX = re.compile(r"^(=+)\s*(.+?)\s*\1\s*$", re.MULTILINE)
+
+
+def index_sections(content: str) -> Dict[str, str]:
+    """Split the page content into sections in a single pass.
+
+    Mirrors the behaviour of `WikipediaPage.section`: the content of a section runs until the next heading of any
+    level and only the first occurrence of a title is kept.
+
+    Args:
+        content (str): raw page content
+    Returns:
+        dict: mapping of section title to section content
+    """
+    index = {}
+    headings = list(SECTION_HEADING_REGEX.finditer(content))
+    for i, heading in enumerate(headings):
+        title = heading.group(2)
+        if title in index:
+            continue
+
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        index[title] = content[heading.end():end].strip()
+
+    return index
+
+
 # speed up page loading
 @lru_cache(maxsize=1000)
 def _get_page(
@@ -49,6 +79,9 @@ def _get_page(
                 for line in page.content.splitlines()
                 if re.search(r"=+\s+.*\s+=+", line)
             ]
+
+        # index the sections once so that they are cached alongside the page
+        page._section_index = index_sections(page.content)
         return page
 
     except wiki.DisambiguationError as e:
@@ -95,8 +128,12 @@ def process_page(
     header = ""
     sections = {}
 
+    section_index = getattr(page, "_section_index", None)
+    if section_index is None:
+        section_index = index_sections(page.content)
+
     for section_title in page.sections:
-        content = page.section(section_title)
+        content = section_index.get(section_title)
         if not content:
             header = section_title
             continue
@@ -119,20 +156,35 @@ def process_page(
 
 def most_relevant_links(page, num_links=10, num_summary_words=50, return_scores=False):
     """Return the most relevant links to a Wikipedia page based on the intersection over union (IOU) of the link and the page summary."""
-    link_scores = {}
+    links = list(page.links)
+    if not links:
+        return []
+
     summary_words = set(page.summary.split()[:num_summary_words])
-    for link in page.links:
-        link_words = set(link.split())
-        iou = len(summary_words.intersection(link_words)) / len(
-            summary_words.union(link_words)
-        )
-        link_scores[link] = iou / len(link.split())
 
-    sorted_links = sorted(link_scores.items(), key=lambda x: x[1], reverse=True)
+    # map every word to an integer id so that all links can be scored at once
+    vocab = {word: i for i, word in enumerate(summary_words)}
+    link_word_ids = [[vocab.setdefault(word, len(vocab)) for word in link.split()] for link in links]
+    num_words = np.array([len(word_ids) for word_ids in link_word_ids])
+
+    owners = np.repeat(np.arange(len(links)), num_words)
+    word_ids = np.fromiter((i for ids in link_word_ids for i in ids), dtype=np.int64, count=num_words.sum())
+
+    # deduplicate (link, word) pairs to match set semantics
+    vocab_size = max(len(vocab), 1)
+    pairs = np.unique(owners * vocab_size + word_ids)
+    pair_owners = pairs // vocab_size
+    in_summary = (pairs % vocab_size) < len(summary_words)
+
+    intersection = np.bincount(pair_owners, weights=in_summary, minlength=len(links))
+    union = len(summary_words) + np.bincount(pair_owners, minlength=len(links)) - intersection
+    scores = intersection / np.maximum(union, 1) / np.maximum(num_words, 1)
+
+    order = np.argsort(-scores, kind="stable")[:num_links]
     if return_scores:
-        return sorted_links[:num_links]
+        return [(links[i], float(scores[i])) for i in order]
 
-    return [link for link, _ in sorted_links[:num_links]]
+    return [links[i] for i in order]
 
 
 def filter_categories(categories, exclude=None, include=None):
@@ -162,14 +214,18 @@ class WikiDataset(Dataset):
         self,
         min_length_words: int = 50,
         max_links: int = 10,
+        max_context_tokens: int = None,
     ):
         """
         Args:
             min_length_words (int, optional): Minimum section length. Defaults to 50.
             max_links (int, optional): _description_. Defaults to 10.
+            max_context_tokens (int, optional): Token cap of the article content, 0 disables it. Defaults to the
+                WIKI_CONTEXT_MAX_TOKENS environment variable, or 3000.
         """
         self.min_length_words = min_length_words
         self.max_links = max_links
+        self.max_context_tokens = default_context_tokens() if max_context_tokens is None else max_context_tokens
 
     def get(
         self,
@@ -205,7 +261,10 @@ class WikiDataset(Dataset):
         )
         if not sections:
             return None
-        
+
+        # keep the most informative sections within the token cap, every prompt built from the article is bounded
+        sections, budget = budget_sections(sections, self.max_context_tokens, reference=f"{name}\n{page.summary}")
+
         topic = "All Sections"
         content = "\n".join(["\n".join(s) for _, s in sections.items()])
         section_length = len(content.split())
@@ -226,6 +285,7 @@ class WikiDataset(Dataset):
                 "page_length": len(page.content.split()),
                 "section_length": section_length,
             },
+            "stats": {"context_budget": budget},
         }
         try:
             CACHED_ARTICLES.put(context, block=False)
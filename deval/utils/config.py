@@ -146,6 +146,20 @@ def add_args(cls, parser):
         default="",
     )
 
+    parser.add_argument(
+        "--wandb.queue_size",
+        type=int,
+        help="Maximum number of events waiting to be sent to wandb. Events are spilled to disk when the queue is full.",
+        default=1000,
+    )
+
+    parser.add_argument(
+        "--wandb.batch_size",
+        type=int,
+        help="Maximum number of queued events sent to wandb per batch.",
+        default=50,
+    )
+
 
 def add_miner_args(cls, parser):
     """Add miner specific arguments to the parser."""
@@ -411,6 +425,97 @@ def add_validator_args(cls, parser):
         default=64800,
     )
 
+    parser.add_argument(
+        "--neuron.tracing",
+        action="store_true",
+        help="Records per-stage timings of the validator epoch and exports them alongside the validator state.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.tracing_port",
+        type=int,
+        help="Port to serve the stage timings in Prometheus text format at /metrics. Disabled when 0.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.metadata_ttl",
+        type=float,
+        help="Seconds the model metadata reported by a miner is reused before querying the miner again.",
+        default=3600,
+    )
+
+    parser.add_argument(
+        "--neuron.racing",
+        action="store_true",
+        help="Screens every miner on a subset of the tasks and only runs the rest for miners that can reach a paid tier.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.racing_fraction",
+        type=float,
+        help="The fraction of each task type used to screen miners when racing.",
+        default=0.3,
+    )
+
+    parser.add_argument(
+        "--neuron.racing_confidence",
+        type=float,
+        help="The confidence level required before a screened miner is dropped from the race.",
+        default=0.95,
+    )
+
+    parser.add_argument(
+        "--neuron.disable_provisional_weights",
+        action="store_true",
+        help="Only recompute weights once every miner of the epoch is evaluated, instead of after each miner.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.miner_time_budget",
+        type=float,
+        help="Seconds a miner may spend answering the queries of an epoch before its remaining tasks are scored as failures. 0 for no limit.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.max_consecutive_failures",
+        type=int,
+        help="Consecutive timed out or failed queries after which a miner's remaining tasks are scored as failures. 0 to disable.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.adaptive_sampling",
+        action="store_true",
+        help="Stops querying a miner on a task type once its tier relative to the other miners is settled.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.min_samples",
+        type=int,
+        help="The minimum number of tasks of each type a miner is queried on with adaptive sampling.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.max_samples",
+        type=int,
+        help="The maximum number of tasks of each type a miner is queried on with adaptive sampling. No limit when 0.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.sampling_confidence",
+        type=float,
+        help="The confidence level at which adaptive sampling considers a miner's tier settled.",
+        default=0.95,
+    )
+
 
 def config(cls):
     """
@@ -11,6 +11,9 @@ class Constants(BaseModel):
 
     alpha:float = 0.8
     alpha_decay:float = 0.02
+
+    # kept in the save state directory across epochs, unlike the other save files
+    wandb_spill_file:str = "wandb_spill.jsonl"
         
 
 
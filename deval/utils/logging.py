@@ -1,7 +1,10 @@
 import json
 import os
 import copy
+import atexit
+import threading
 import wandb
+from queue import Queue, Full, Empty
 import bittensor as bt
 from dataclasses import asdict, dataclass
 from datetime import datetime
@@ -12,6 +15,7 @@ from deval.protocol import BtEvalResponse
 from deval.rewards.reward import RewardResult
 from deval.utils.config import config as get_config, add_args
 from deval.model.model_state import ModelState
+from deval.utils.constants import constants
 
 logger = logging.getLogger("deval")
 
@@ -32,7 +36,13 @@ class Log:
     # extra_info: dict
 
 class WandBLogger:
-    
+    """Sends evaluation events to wandb from a background thread.
+
+    Events are pushed onto a bounded queue and drained in batches by the thread, so that the evaluation loop never
+    waits on the network. Each event stays its own wandb step. Events which cannot be queued or sent are spilled to a
+    JSONL file instead.
+    """
+
     # TODO: fix -  the storage of settings is janky
     def __init__(self, hotkey_address, netuid, active_tasks, config = None, force_off = False):
         self.hotkey_address = hotkey_address
@@ -47,6 +57,12 @@ class WandBLogger:
         if force_off:
             self.config.wandb.off = True
 
+        self.queue = Queue(maxsize=getattr(self.config.wandb, "queue_size", 1000))
+        self.batch_size = getattr(self.config.wandb, "batch_size", 50)
+        self.spill_path = os.path.join(getattr(self.config.neuron, "full_path", "."), constants.wandb_spill_file)
+        self.spill_lock = threading.Lock()
+        self.thread = None
+
     @classmethod
     def add_args(cls, parser):
         add_args(cls, parser)
@@ -123,6 +139,11 @@ class WandBLogger:
         reward_result: RewardResult,
         miner_state: ModelState
     ) -> None:
+        if self.config.wandb.off:
+            return
+
+        self.start()
+
         reward_dict = reward_result.__state_dict__()
         for i, response in enumerate(responses):
             agent = response.human_agent
@@ -137,11 +158,83 @@ class WandBLogger:
             #if not self.config.neuron.dont_save_events:
             #    logger.log(38, event)
 
-            if self.config.wandb.off:
+            try:
+                self.queue.put_nowait(event)
+            except Full:
+                self.spill([event])
+
+    def start(self) -> None:
+        """Starts the background logging thread if it is not already running."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def close(self, timeout: float = 30) -> None:
+        """Flushes the queued events and stops the background logging thread."""
+        if self.thread is None:
+            return
+
+        try:
+            self.queue.put(None, timeout=timeout)
+        except Full:
+            bt.logging.warning("wandb queue is full on shutdown, remaining events are spilled to disk")
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            # the thread is still consuming the queue, draining it here as well would spill events it is sending
+            bt.logging.warning(f"wandb logging did not finish within {timeout}s, queued events may be lost")
+            return
+        self.thread = None
+
+        # anything left over was not sent in time
+        self.spill([event for event in self._drain(self.queue.qsize()) if event is not None])
+        atexit.unregister(self.close)
+
+    def spill(self, events: list[dict]) -> None:
+        """Appends events which could not be sent to wandb to a local JSONL file."""
+        if not events:
+            return
+
+        try:
+            with self.spill_lock, open(self.spill_path, "a") as f:
+                for event in events:
+                    f.write(json.dumps(event, default=str) + "\n")
+        except Exception as e:
+            bt.logging.warning(f"Unable to spill {len(events)} wandb events to {self.spill_path}: {e}")
+
+    def _drain(self, max_events: int) -> list[dict]:
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return events
+
+    def _run(self) -> None:
+        while True:
+            # block for the first event then batch whatever else is already queued
+            events = [self.queue.get()]
+            events += self._drain(self.batch_size - 1)
+
+            stop = None in events
+            events = [event for event in events if event is not None]
+
+            sent = 0
+            try:
+                if events and not getattr(self, "wandb", None):
+                    self.init_wandb()
+
+                # every event is a step of its own, logging them with commit=False would merge them into one
+                for event in events:
+                    self.wandb.log(event)
+                    sent += 1
+            except Exception as e:
+                # only the events which were not sent, the others are already in the run
+                bt.logging.warning(f"Unable to log {len(events) - sent} events to wandb, spilling to disk: {e}")
+                self.spill(events[sent:])
+
+            if stop:
                 return
-                  
-            if not getattr(self, "wandb", None):
-                self.init_wandb()
-
-            # Log the event to wandb.
-            self.wandb.log(event)
\ No newline at end of file
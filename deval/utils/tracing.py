@@ -0,0 +1,160 @@
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+# histogram buckets in seconds, spanning single requests up to full container restarts
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+_DISABLED_SPAN = nullcontext()
+
+
+class Histogram:
+    """Cumulative latency histogram following the Prometheus bucket conventions."""
+
+    def __init__(self, buckets: tuple[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.bucket_counts)},
+        }
+
+
+class Tracer:
+    """Aggregates the time spent in each stage of the validator epoch.
+
+    Spans are aggregated into histograms keyed by stage and, optionally, by uid. When disabled, `span` returns a
+    shared no-op context manager so instrumented code pays close to nothing.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: tuple[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.server = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stages: dict[str, Histogram] = {}
+            self.stages_by_uid: dict[tuple[str, int], Histogram] = {}
+
+    def observe(self, stage: str, duration: float, uid: int | None = None) -> None:
+        with self.lock:
+            self.stages.setdefault(stage, Histogram(self.buckets)).observe(duration)
+            if uid is not None:
+                self.stages_by_uid.setdefault((stage, uid), Histogram(self.buckets)).observe(duration)
+
+    def span(self, stage: str, uid: int | None = None):
+        """Context manager timing the enclosed block under `stage`."""
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return self._span(stage, uid)
+
+    @contextmanager
+    def _span(self, stage: str, uid: int | None):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0, uid)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator timing every call of the wrapped function under `stage`."""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._span(stage, None):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {
+                "stages": {stage: h.to_dict() for stage, h in self.stages.items()},
+                "stages_by_uid": {
+                    f"{stage}/{uid}": h.to_dict() for (stage, uid), h in self.stages_by_uid.items()
+                },
+            }
+
+    def export_json(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP deval_stage_seconds Time spent in each stage of the validator epoch.",
+            "# TYPE deval_stage_seconds histogram",
+        ]
+        with self.lock:
+            series = [({"stage": stage}, h) for stage, h in self.stages.items()]
+            series += [({"stage": stage, "uid": uid}, h) for (stage, uid), h in self.stages_by_uid.items()]
+
+            for labels, h in series:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                for bound, count in zip(h.buckets, h.bucket_counts):
+                    lines.append(f'deval_stage_seconds_bucket{{{label_str},le="{bound}"}} {count}')
+                lines.append(f'deval_stage_seconds_bucket{{{label_str},le="+Inf"}} {h.count}')
+                lines.append(f"deval_stage_seconds_sum{{{label_str}}} {h.total}")
+                lines.append(f"deval_stage_seconds_count{{{label_str}}} {h.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Serves /metrics (Prometheus text) and /metrics.json from a background thread."""
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = tracer.prometheus_text(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(tracer.summary()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                body = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+tracer = Tracer()
@@ -1,3 +1,4 @@
+import asyncio
 import bittensor as bt
 import time
 from deval.base.validator import BaseValidatorNeuron
@@ -8,17 +9,30 @@ from dotenv import load_dotenv, find_dotenv
 from deval.utils.uids import get_top_incentive_uids, get_candidate_uids
 from deval.model.model_state import ModelState
 from deval.contest import DeValContest
-from deval.protocol import get_metadata_from_miner, DendriteModelQueryEvent
+from deval.protocol import get_metadata_from_miners
 from deval.agent import HumanAgent
 from deval.protocol import init_request_from_task, BtEvalResponse
 from deval.api.miner_docker_client import MinerDockerClient
+from deval.api.models import EvalResponse, APIStatus
 from deval.tasks.task import Task
 from deval.utils.logging import WandBLogger
 from deval.model.chain_metadata import ChainModelMetadataStore
+from deval.model.duplicates import DuplicateScreen
+from deval.model.metadata_cache import MinerMetadataCache
 import traceback
+import copy
 from deval.utils.constants import constants
 from deval.utils.misc import restart_current_process
+from deval.utils.tracing import tracer
+from deval.racing import SCREENING_STAGE, FINAL_STAGE
+from deval.sampling import AdaptiveSampler, RunningStats
+from deval.budget import QueryBudget
+from deval.scheduling import prioritize_miners, follow_schedule
+from deval.ranking import IncrementalRanking
+from deval.llms.usage import usage_tracker
+from deval.tasks.json_repair import json_repairs
 import torch
+import os
 
 class Validator(BaseValidatorNeuron):
     """
@@ -50,7 +64,8 @@ class Validator(BaseValidatorNeuron):
         )
 
 
-        self.miner_docker_client = MinerDockerClient()
+        self.miner_docker_client = MinerDockerClient(max_disk_gb=constants.max_model_size_gbs + 2)
+        self.metadata_cache = MinerMetadataCache(ttl=self.config.neuron.metadata_ttl)
         self.wandb_logger = WandBLogger(
             self.wallet.hotkey.ss58_address, 
             self.metagraph.netuid, 
@@ -68,6 +83,21 @@ class Validator(BaseValidatorNeuron):
         )
         self.load_state()
 
+        # stops querying a miner on a task type once its tier is settled
+        self.sampler = None
+        if self.config.neuron.adaptive_sampling:
+            self.sampler = AdaptiveSampler(
+                min_samples=self.config.neuron.min_samples,
+                max_samples=self.config.neuron.max_samples,
+                confidence=self.config.neuron.sampling_confidence,
+                num_paid_tiers=len(DeValContest.TIERS),
+                tier_improvement_threshold=constants.tier_improvement_threshold,
+            )
+
+        tracer.enabled = self.config.neuron.tracing
+        if tracer.enabled and self.config.neuron.tracing_port:
+            tracer.serve(self.config.neuron.tracing_port)
+
     async def forward(self):
         bt.logging.info("🚀 Starting forward loop...")
         forward_start_time = time.time()
@@ -76,17 +106,28 @@ class Validator(BaseValidatorNeuron):
         top_incentive_uids = get_top_incentive_uids(self, k=self.miner_incentive_threshold, netuid=self.config.netuid).to(self.device)
         available_uids = get_candidate_uids(self, k = constants.num_uids_total)
 
+        # miners that registered or committed since the previous contest started are scheduled early
+        previous_start_block = None
+
         if self.start_over:
             bt.logging.info("Starting from scratch")
+            previous_start_block = getattr(getattr(self, "contest", None), "start_block", None)
             self.contest = DeValContest(
                 self.reward_pipeline, 
                 forward_start_time, 
-                self.config.neuron.timeout
+                self.config.neuron.timeout,
+                start_block=self.block
             )
-            self.task_repo = TaskRepository(allowed_models=self.allowed_models)
+            tracer.reset()
+            usage_tracker.reset()
+            json_repairs.reset()
+            with tracer.span("task_generation"):
+                self.task_repo = await asyncio.to_thread(TaskRepository, allowed_models=self.allowed_models)
+                if self.config.neuron.racing:
+                    self.task_repo.screening_fraction = self.config.neuron.racing_fraction
 
-            # generate all tasks for miners to be evaluated on
-            self.task_repo.generate_all_tasks(task_probabilities=self.task_sample_rate)
+                # generate all tasks for miners to be evaluated on
+                await asyncio.to_thread(self.task_repo.generate_all_tasks, task_probabilities=self.task_sample_rate)
 
             
 
@@ -96,46 +137,51 @@ class Validator(BaseValidatorNeuron):
             available_uids = get_candidate_uids(self, k = constants.num_uids_total)
             available_uids = [uid_and_hotkey for uid_and_hotkey in available_uids if uid_and_hotkey not in self.queried_uids]
 
-        for uid, hotkey in available_uids:
-            try:
-                # get the model metadata information from miner
-                bt.logging.info(f"Beginning step for uid: {uid}")
-                responses = await get_metadata_from_miner(self, uid)
-                response_event = DendriteModelQueryEvent(responses)
-                bt.logging.info(f"Created DendriteResponseEvent:\n {response_event}") 
-
-                miner_state = ModelState(response_event.repo_id, response_event.model_id, uid, self.config.netuid)
-                miner_state.add_miner_coldkey(self.get_uid_coldkey(uid))
-
-                is_valid = miner_state.should_run_evaluation(
-                    uid, constants.max_model_size_gbs, self.subtensor.block, top_incentive_uids
-                )
-
-                if is_valid:
-                    chain_metadata = self.metadata_store.retrieve_model_metadata(hotkey)
-                    miner_state.add_chain_metadata(chain_metadata)
-
-                    miner_state = Validator.run_epoch(
-                        self.contest,
-                        miner_state, 
-                        self.task_repo, 
-                        self.miner_docker_client,
-                        self.wandb_logger
-                    )
+        with tracer.span("metadata_query"):
+            await self.refresh_miner_metadata(available_uids)
 
-                # update contest
-                self.contest.update_model_state_with_rewards(miner_state) 
-                self.queried_uids.add((uid, hotkey))
+        if self.contest.duplicate_screen is None or self.contest.schedule is None:
+            with tracer.span("chain_commitments"):
+                commitments = await asyncio.to_thread(self.get_chain_commitments, available_uids)
 
-                if is_valid:
-                    self.save_state()
-                    self.sync()
-                del miner_state
+            # group the miners by their committed hash so copies of a model are not downloaded and evaluated
+            if self.contest.duplicate_screen is None:
+                self.contest.duplicate_screen = DuplicateScreen(commitments)
+                bt.logging.info(f"Chain hashes committed by several miners: {self.contest.duplicate_screen.groups}")
 
+            if self.contest.schedule is None:
+                self.contest.schedule = self.schedule_miners(
+                    available_uids, top_incentive_uids, commitments, previous_start_block
+                )
+                bt.logging.info(f"Miner evaluation order: {[uid for uid, _ in self.contest.schedule]}")
+                await asyncio.to_thread(self.save_state)
+
+        # a resumed epoch continues in the order of the saved schedule
+        available_uids = follow_schedule(self.contest.schedule, available_uids)
+
+        stage = SCREENING_STAGE if self.config.neuron.racing else None
+        await self.evaluate_miners(available_uids, top_incentive_uids, stage)
+
+        # when the earliest committer of a hash is not confirmed, the next committer is evaluated in its place
+        while pending := self.contest.duplicate_screen.pending():
+            await self.evaluate_miners(follow_schedule(self.contest.schedule, pending), top_incentive_uids, stage)
+
+        if self.config.neuron.racing:
+            # once every miner has been screened, only those that can still reach a paid tier see the remaining tasks
+            if self.contest.racing_finalists is None:
+                self.contest.racing_finalists = self.contest.select_racing_finalists(
+                    sorted(self.queried_uids), 
+                    self.task_repo.get_task_counts(), 
+                    self.config.neuron.racing_confidence
+                )
+                bt.logging.info(f"Racing finalists: {self.contest.racing_finalists} out of {len(self.queried_uids)} screened miners")
+                await asyncio.to_thread(self.save_state)
 
-            except Exception as e:
-                self.queried_uids.add((uid, hotkey))
-                bt.logging.info(f"Error in forward pass for uid: {uid} skipping to next round. Exception: {e}, traceback: {traceback.format_exc()}")
+            remaining = [
+                uid_and_hotkey for uid_and_hotkey in self.contest.racing_finalists 
+                if uid_and_hotkey not in self.contest.racing_completed
+            ]
+            await self.evaluate_miners(remaining, top_incentive_uids, FINAL_STAGE)
 
         # ensure we reset weights before recalculating to prevent errors from persisting
         self.weights = []
@@ -144,30 +190,257 @@ class Validator(BaseValidatorNeuron):
         denom = sum([len(tasks) for tasks in self.task_repo.tasks.values()])
 
         if denom > 0:
-            formatted_scores = self.update_scores(self.contest.model_rewards, denom)
+            # miners sampled on fewer tasks, by racing or adaptive sampling, are averaged over the tasks they were sampled on
+            avg_rewards = self.contest.get_average_rewards(self.task_repo.get_task_counts())
+            formatted_scores = self.update_scores(avg_rewards)
             self.weights = self.contest.rank_and_select_winners(formatted_scores)
-            self.save_state(save_weights=True)
+            await asyncio.to_thread(self.save_state, save_weights=True)
         else:
             num_tasks = [len(tasks) for tasks in self.task_repo.tasks.values()]
             bt.logging.info(f"ERROR with div by 0: Task Repo num tasks: {self.task_repo.tasks.keys()}, task repo num tasks: {num_tasks}, Model Rewards: {self.contest.model_rewards}")
-        self.sync()
+        await asyncio.to_thread(self.sync)
         self.start_over = True
         self.reset()
+
+        # exported after the reset so the timings are kept alongside the weights
+        if tracer.enabled:
+            tracer.observe("forward", time.time() - forward_start_time)
+            trace_path = tracer.export_json(os.path.join(self.config.neuron.full_path, "epoch_timings.json"))
+            bt.logging.info(f"Exported epoch stage timings to {trace_path}")
+
+        usage_path = usage_tracker.export_json(os.path.join(self.config.neuron.full_path, "llm_usage.json"))
+        bt.logging.info(f"Exported LLM usage of the epoch, estimated cost ${usage_tracker.total_cost():.4f}, to {usage_path}")
         #restart_current_process()
 
-        
+    async def evaluate_miners(
+        self, 
+        uids_and_hotkeys: list[tuple[int, str]], 
+        top_incentive_uids: torch.Tensor, 
+        stage: str | None = None,
+    ) -> None:
+        """Runs the epoch of each miner in turn, saving the contest after every evaluated miner.
+
+        Args:
+            uids_and_hotkeys: the miners to evaluate
+            top_incentive_uids: miners that are evaluated regardless of their registration date
+            stage: the racing stage, selecting which tasks are run. None runs every task
+        """
+        # later committers of a chain hash wait for the earliest committer to be confirmed
+        if stage != FINAL_STAGE and self.contest.duplicate_screen is not None:
+            skipped = [m for m in uids_and_hotkeys if self.contest.duplicate_screen.should_skip(m)]
+            for uid, hotkey in skipped:
+                bt.logging.info(f"Skipping uid: {uid}, its chain hash was committed earlier by another miner")
+                self.mark_evaluated(uid, hotkey, stage)
+            uids_and_hotkeys = [m for m in uids_and_hotkeys if m not in skipped]
+
+        # the eligibility checks of the next miner overlap with the evaluation of the current one
+        prepare = self.prepare_finalist if stage == FINAL_STAGE else self.prepare_miner
+        next_preparation = None
+        try:
+            for i, (uid, hotkey) in enumerate(uids_and_hotkeys):
+                try:
+                    bt.logging.info(f"Beginning step for uid: {uid}")
+                    preparation = next_preparation or asyncio.ensure_future(
+                        prepare(uid, hotkey, top_incentive_uids, self.subtensor.block)
+                    )
+                    next_preparation = None
+                    miner_state, is_valid = await preparation
+
+                    # finalists continue from the rewards of their screening
+                    if stage == FINAL_STAGE:
+                        miner_state.rewards = copy.deepcopy(self.contest.model_rewards.get(uid, miner_state.rewards))
+                        miner_state.sample_sizes = dict(self.contest.model_sample_sizes.get(uid, {}))
+
+                    if is_valid:
+                        with tracer.span("chain_metadata", uid):
+                            chain_metadata = await asyncio.to_thread(self.metadata_store.retrieve_model_metadata, hotkey)
+                        miner_state.add_chain_metadata(chain_metadata)
+
+                        if i + 1 < len(uids_and_hotkeys):
+                            next_preparation = asyncio.ensure_future(
+                                prepare(*uids_and_hotkeys[i + 1], top_incentive_uids, self.subtensor.block)
+                            )
+
+                        with tracer.span("run_epoch", uid):
+                            miner_state = await Validator.run_epoch(
+                                self.contest,
+                                miner_state, 
+                                self.task_repo, 
+                                self.miner_docker_client,
+                                self.wandb_logger,
+                                stage,
+                                self.sampler,
+                                QueryBudget(
+                                    self.contest.timeout,
+                                    total_time=self.config.neuron.miner_time_budget or None,
+                                    max_consecutive_failures=self.config.neuron.max_consecutive_failures,
+                                ),
+                            )
+
+                    # update contest
+                    self.contest.update_model_state_with_rewards(miner_state) 
+                    self.update_provisional_weights(uid)
+                    self.contest.record_duplicate_outcome(uid, hotkey)
+                    self.mark_evaluated(uid, hotkey, stage)
+
+                    if is_valid:
+                        await asyncio.to_thread(self.save_state)
+                        await asyncio.to_thread(self.sync)
+                    del miner_state
+
+
+                except Exception as e:
+                    self.contest.record_duplicate_outcome(uid, hotkey)
+                    self.mark_evaluated(uid, hotkey, stage)
+                    bt.logging.info(f"Error in forward pass for uid: {uid} skipping to next round. Exception: {e}, traceback: {traceback.format_exc()}")
+        finally:
+            # a timed out forward must not leave a lookup running into the next one
+            if next_preparation is not None:
+                next_preparation.cancel()
+
+    def get_chain_commitments(self, uids_and_hotkeys: list[tuple[int, str]]) -> dict[tuple[int, str], tuple[str | None, int]]:
+        """Reads the committed model hash and block of every miner from the chain."""
+        commitments = {}
+        for uid, hotkey in uids_and_hotkeys:
+            try:
+                chain_metadata = self.metadata_store.retrieve_model_metadata(hotkey)
+            except Exception as e:
+                bt.logging.info(f"Unable to retrieve chain metadata for uid: {uid}: {e}")
+                continue
+
+            if chain_metadata is not None:
+                commitments[(uid, hotkey)] = (chain_metadata.model_hash, chain_metadata.block)
+
+        return commitments
+
+    def schedule_miners(
+        self, 
+        uids_and_hotkeys: list[tuple[int, str]], 
+        top_incentive_uids: torch.Tensor,
+        commitments: dict[tuple[int, str], tuple[str | None, int]],
+        previous_start_block: int | None,
+    ) -> list[tuple[int, str]]:
+        """Orders the miners of the epoch so those most likely to affect the weights are evaluated first."""
+        tier_holders = {uid for uid, weight in self.weights if weight > 0} | set(top_incentive_uids.tolist())
+
+        fresh = set()
+        if previous_start_block is not None:
+            for uid, hotkey in uids_and_hotkeys:
+                registered = int(self.metagraph.block_at_registration[uid])
+                _, committed = commitments.get((uid, hotkey), (None, None))
+                if registered > previous_start_block or (committed is not None and committed > previous_start_block):
+                    fresh.add((uid, hotkey))
+
+        scores = {uid: float(self.scores[uid]) for uid, _ in uids_and_hotkeys if uid < len(self.scores)}
+        return prioritize_miners(uids_and_hotkeys, scores, tier_holders, fresh)
+
+    def update_provisional_weights(self, uid: int) -> None:
+        """Re-ranks the miners with the rewards of the miner that just finished, so the weights set on chain while the 
+        epoch is running reflect the miners evaluated so far. Miners not evaluated yet keep their carried over score.
+        """
+        if self.config.neuron.disable_provisional_weights:
+            return
+
+        if self.contest.provisional_ranking is None:
+            self.contest.provisional_ranking = IncrementalRanking(dict(enumerate(self.scores.tolist())))
+
+        if uid < len(self.scores):
+            avg_reward = self.contest.get_average_reward(uid, self.task_repo.get_task_counts())
+            self.contest.provisional_ranking.update(uid, self.provisional_score(uid, avg_reward))
+
+        ranked_rewards = self.contest.provisional_ranking.ranked()
+        if ranked_rewards:
+            self.weights = self.contest.select_winners(ranked_rewards, provisional=True)
+
+    def mark_evaluated(self, uid: int, hotkey: str, stage: str | None) -> None:
+        if stage == FINAL_STAGE:
+            self.contest.racing_completed.add((uid, hotkey))
+        else:
+            self.queried_uids.add((uid, hotkey))
+
+    async def refresh_miner_metadata(self, miners: list[tuple[int, str]]) -> None:
+        """Queries the model metadata of the (uid, hotkey) miners without a fresh cache entry in one dendrite call."""
+        stale_miners = self.metadata_cache.stale(miners)
+        if stale_miners:
+            self.metadata_cache.update(await get_metadata_from_miners(self, stale_miners))
+
+    async def prepare_miner(
+        self, 
+        uid: int, 
+        hotkey: str,
+        top_incentive_uids: torch.Tensor, 
+        current_block: int,
+    ) -> tuple[ModelState, bool]:
+        """Queries the miner for its model metadata and decides whether it should be evaluated this round.
+
+        The blocking Hugging Face and substrate lookups run in the default executor so the event loop stays free.
+        The current block is read by the caller, as the subtensor connection is not shared across threads.
+        """
+        # the model metadata is normally fetched for all miners at the start of the epoch, expired entries are
+        # refreshed here
+        metadata = self.metadata_cache.get((uid, hotkey))
+        if metadata is None:
+            with tracer.span("metadata_query", uid):
+                await self.refresh_miner_metadata([(uid, hotkey)])
+            metadata = self.metadata_cache.get((uid, hotkey))
+        repo_id, model_id = metadata or ("", "")
+        bt.logging.info(f"Model location for uid {uid}: {repo_id}/{model_id}") 
+
+        with tracer.span("eligibility", uid):
+            miner_state = await asyncio.to_thread(
+                ModelState, repo_id, model_id, uid, self.config.netuid
+            )
+            miner_state.add_miner_coldkey(self.get_uid_coldkey(uid))
+            miner_state.add_miner_hotkey(hotkey)
+
+            is_valid = await asyncio.to_thread(
+                miner_state.should_run_evaluation,
+                uid, constants.max_model_size_gbs, current_block, top_incentive_uids
+            )
+
+        return miner_state, is_valid
+
+    async def prepare_finalist(
+        self, 
+        uid: int, 
+        hotkey: str,
+        top_incentive_uids: torch.Tensor, 
+        current_block: int,
+    ) -> tuple[ModelState, bool]:
+        """Reuses the model state a racing finalist passed the eligibility checks with during screening.
+
+        Its container still has to be recreated, the containers of the miners screened after it replaced it, and the
+        model hash is checked again against the downloaded model as the repository may have changed since.
+        """
+        miner_state = self.contest.get_screened_model(uid, hotkey)
+        if miner_state is None:
+            return await self.prepare_miner(uid, hotkey, top_incentive_uids, current_block)
+        return miner_state, True
+
     @staticmethod
-    def run_epoch(
+    async def run_epoch(
         contest: DeValContest, 
         miner_state: ModelState, 
         task_repo: TaskRepository, 
         miner_docker_client: MinerDockerClient,
         wandb_logger: WandBLogger,
+        stage: str | None = None,
+        sampler: AdaptiveSampler | None = None,
+        budget: QueryBudget | None = None,
     ):
-        valid_connection = miner_docker_client.initialize_miner_api(miner_state.get_model_url())
-        container_size = miner_docker_client.get_container_size()
-        model_hash = miner_docker_client.get_model_hash()
-        model_coldkey = miner_docker_client.get_model_coldkey()
+        uid = miner_state.uid
+        # a single budget spans all task types, so a miner that stopped answering is not queried again, its timeouts
+        # are estimated per task type
+        budget = budget or QueryBudget(contest.timeout)
+        with tracer.span("initialize_miner_api", uid):
+            valid_connection = await asyncio.to_thread(
+                miner_docker_client.initialize_miner_api, miner_state.get_model_url()
+            )
+        # the first sample of the monitor is normally taken while the api is loading the model
+        container_size = await asyncio.to_thread(miner_docker_client.get_container_size, 60)
+        with tracer.span("hashing", uid):
+            model_hash = await asyncio.to_thread(miner_docker_client.get_model_hash)
+        model_coldkey = await asyncio.to_thread(miner_docker_client.get_model_coldkey)
         bt.logging.info(f"Recording model hash: {model_hash} for uid: {miner_state.uid} with coldkey: {model_coldkey}")
         is_valid = contest.validate_model(miner_state, model_hash, model_coldkey, container_size, constants.max_model_size_gbs+ 2)
         if not is_valid:
@@ -175,66 +448,129 @@ class Validator(BaseValidatorNeuron):
 
         # run through all tasks if we can connect, otherwise skip
         if valid_connection:
-            for task_name, tasks in task_repo.get_all_tasks():
-                miner_state = Validator.run_step(
-                    task_name, 
-                    tasks, 
-                    miner_docker_client, 
-                    miner_state, 
-                    contest, 
-                    wandb_logger
-                )
+            for task_name, tasks in task_repo.get_all_tasks(stage):
+                if not tasks:
+                    continue
+                with tracer.span(f"run_step.{task_name}", uid):
+                    miner_state = await Validator.run_step(
+                        task_name, 
+                        tasks, 
+                        miner_docker_client, 
+                        miner_state, 
+                        contest, 
+                        wandb_logger,
+                        sampler,
+                        budget
+                    )
 
         
         return miner_state
 
     @staticmethod
-    def run_step(
+    async def run_step(
         task_name: str,
         tasks: list[Task], 
         docker_client: MinerDockerClient,
         miner_state: ModelState,
         contest: DeValContest,
-        wandb_logger: WandBLogger
+        wandb_logger: WandBLogger,
+        sampler: AdaptiveSampler | None = None,
+        budget: QueryBudget | None = None,
     ):
-        
+        budget = budget or QueryBudget(contest.timeout)
         responses = []
+        reward_result = RewardResult(
+            contest.reward_pipeline,
+            responses=[],
+            device="cpu" # self.device,
+        )
+
+        # with adaptive sampling the running rewards, including those of an earlier racing stage, are compared 
+        # against the miners evaluated so far
+        prior_rewards = miner_state.rewards.get(task_name, [])
+        population = len(prior_rewards) + len(tasks)
+        stats = RunningStats.from_rewards(prior_rewards)
+        leaderboard = {}
+        if sampler is not None:
+            leaderboard = {
+                uid: RunningStats.from_rewards(rewards[task_name]).bounds(
+                    max(population, len(rewards[task_name])), sampler.confidence
+                )
+                for uid, rewards in contest.model_rewards.items() 
+                if uid != miner_state.uid and rewards.get(task_name)
+            }
+        sample_size = len(tasks)
 
-        curr_container_sz = docker_client.get_container_size()
+        # the container is sampled in the background, so checking its size is normally only a read from memory
+        curr_container_sz = await asyncio.to_thread(docker_client.get_container_size)
 
         for i, task in enumerate(tasks):
-            # query docker container with task 
+            abort_reason = budget.abort_reason()
+            if abort_reason is not None:
+                bt.logging.info(
+                    f"Aborting evaluation of uid: {miner_state.uid} on {task_name} after {i}/{len(tasks)} tasks: "
+                    f"{abort_reason}, the remaining tasks are scored as failures"
+                )
+                status = APIStatus.ERROR if budget.tripped else APIStatus.TIMEOUT
+                for remaining_task in tasks[i:]:
+                    failure = BtEvalResponse(
+                        uid = miner_state.uid,
+                        response = EvalResponse(score=-1, mistakes=[], response_time=None, status_message=status),
+                        human_agent = HumanAgent(task=remaining_task)
+                    )
+                    responses.append(failure)
+                    reward_result.add_failure(failure)
+                break
+
+            # query docker container with task, each await being a point where a timed out forward can be cancelled
             agent = HumanAgent(
                 task=task
             )
             request = init_request_from_task(task)
-            response = docker_client.query_eval(request, contest.timeout)
+            with tracer.span("inference", miner_state.uid):
+                response = await asyncio.to_thread(docker_client.query_eval, request, budget.next_timeout(task_name))
+            budget.record(task_name, response.status_message, response.response_time)
             bt_response = BtEvalResponse(
                 uid = miner_state.uid,
                 response = response,
                 human_agent = agent
             )
 
-            if i % 10 == 0:
-                container_sz = docker_client.get_container_size()
-                if container_sz > constants.max_model_size_gbs + 2:
-                    break
-                if abs(curr_container_sz - container_sz) > 2:
-                    break
+            violation = docker_client.monitor.violation
+            if violation is not None:
+                bt.logging.info(f"Stopping evaluation of uid: {miner_state.uid}, container {violation}")
+                break
+            container_sz = await asyncio.to_thread(docker_client.get_container_size)
+            if container_sz is None:
+                bt.logging.info(f"Stopping evaluation of uid: {miner_state.uid}, unable to read the container size")
+                break
+            if curr_container_sz is None:
+                curr_container_sz = container_sz
+            elif abs(curr_container_sz - container_sz) > 2:
+                break
 
             responses.append(bt_response)
 
+            # generate and store reward  
+            with tracer.span("scoring", miner_state.uid):
+                reward = await asyncio.to_thread(reward_result.add_response, bt_response)
+
+            if sampler is not None:
+                stats.add(reward)
+                should_stop, reason = sampler.should_stop(stats, population, leaderboard)
+                if should_stop:
+                    bt.logging.info(
+                        f"Adaptive sampling for uid: {miner_state.uid} on {task_name} stopped after "
+                        f"{stats.count}/{population} tasks: {reason}"
+                    )
+                    sample_size = len(responses)
+                    break
             
-            
-        # generate and store reward  
-        reward_result = RewardResult(
-            contest.reward_pipeline,
-            responses=responses,
-            device="cpu" # self.device,
-        )
-        wandb_logger.log_event(responses, reward_result, miner_state)
+        with tracer.span("wandb", miner_state.uid):
+            wandb_logger.log_event(responses, reward_result, miner_state)
         
         miner_state.add_reward(task_name, reward_result)
+        miner_state.sample_sizes[task_name] = miner_state.sample_sizes.get(task_name, 0) + sample_size
 
 
         return miner_state
@@ -270,3 +606,6 @@ class Validator(BaseValidatorNeuron):
             self.thread.join(5)
             self.is_running = False
             bt.logging.debug("Stopped")
+
+        # flush any events still waiting to be sent to wandb
+        self.wandb_logger.close()
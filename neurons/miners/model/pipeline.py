@@ -1,8 +1,11 @@
-from transformers import Pipeline, AutoTokenizer, AutoModelForCausalLM
+from transformers import Pipeline, AutoTokenizer, AutoModelForCausalLM, StoppingCriteria, StoppingCriteriaList
 import torch
+import os
 import re
+import copy
 from contextlib import nullcontext
 from .prompts import (
+    CONTEXT_PREFIX_PROMPT,
     RELEVANCY_PROMPT, 
     HALLUCINATION_PROMPT, 
     HALLUCINATION_MISTAKES_PROMPT,
@@ -13,6 +16,61 @@ from .prompts import (
 )
 import time
 
+# a complete score: the number must be followed by something other than a digit so that e.g. `0.8` is not cut from `0.85`
+SCORE_REGEX = re.compile(r"response:\s*(0\.\d+|1\.0+|0|1|\.\d+)(?=\.?[^\d.])")
+# the prefix forced onto the score head in structured mode, matching the `Response: score` format of the prompts
+STRUCTURED_SCORE_PREFIX = "Response: "
+
+
+class ScoreStoppingCriteria(StoppingCriteria):
+    """Stops a score generation as soon as a parseable `response: <float>` has been emitted.
+
+    Only the last `window` new tokens are decoded at each step, which is enough to hold the score pattern. In a batch
+    that also holds mistakes prompts only the rows in `score_rows` are stopped, the others run to their end.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, window: int = 16, score_rows: list[bool] | None = None):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.window = window
+        self.score_rows = score_rows
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        start = max(self.prompt_length, input_ids.shape[-1] - self.window)
+        texts = self.tokenizer.batch_decode(input_ids[:, start:], skip_special_tokens=True)
+        score_rows = self.score_rows or [True] * len(texts)
+        done = [row and SCORE_REGEX.search(text.lower()) is not None for row, text in zip(score_rows, texts)]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
+class ScoreGrammar:
+    """Constrains the score head to a number between 0 and 1, used as `prefix_allowed_tokens_fn`.
+
+    The prompt already ends with STRUCTURED_SCORE_PREFIX so only the number itself is generated, followed by a
+    terminator once it is complete.
+    """
+
+    partial_regex = re.compile(r"(0(\.\d{0,3})?|1(\.0{0,3})?)?")
+    complete_regex = re.compile(r"0|0\.\d{1,3}|1|1\.0{1,3}")
+
+    def __init__(self, tokenizer, prompt_length: int, number_tokens: dict[int, str], terminators: list[int]):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.number_tokens = number_tokens
+        self.terminators = terminators
+
+    def __call__(self, batch_id: int, input_ids: torch.Tensor) -> list[int]:
+        text = self.tokenizer.decode(input_ids[self.prompt_length:], skip_special_tokens=True)
+
+        allowed = [
+            token_id for token_id, token in self.number_tokens.items() 
+            if self.partial_regex.fullmatch(text + token)
+        ]
+        if self.complete_regex.fullmatch(text) or not allowed:
+            allowed += self.terminators
+        return allowed
+
+
 class DeValPipeline(Pipeline):
 
     def __init__(self, model=None, tokenizer=None, model_dir = None, **kwargs):
@@ -25,22 +83,87 @@ class DeValPipeline(Pipeline):
 
         # init tokenizer and model then attach
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        # batching settings - smaller batches on CPU where padding is expensive
+        self.batch_size = 8 if self.device == "cuda" else 2
+        self.bucket_width = 256 # max difference in prompt tokens within a batch
+
+        # reuse the KV cache of the shared context when the score and mistakes prompts share at least this many tokens
+        self.min_shared_prefix_tokens = 256
+
+        # stop the score head as soon as the score can be parsed, or constrain it to the score grammar entirely
+        self.early_stop_scores = True
+        self.structured_scores = False
+        self.max_structured_score_tokens = 8
+        self._number_tokens = None
+
+        # seconds spent in each loading phase, reported by the miner api
+        self.load_timings = {}
+
+        start_time = time.time()
         tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        self.load_timings["tokenizer"] = time.time() - start_time
+
+        # safetensors checkpoints are memory mapped, and low_cpu_mem_usage avoids materializing random weights first
+        start_time = time.time()
         model = AutoModelForCausalLM.from_pretrained(
             model_dir, 
             device_map=self.device,
-            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+            torch_dtype=self._get_dtype(),
+            low_cpu_mem_usage=True,
+            use_safetensors=any(f.endswith(".safetensors") for f in os.listdir(model_dir)),
         )
+        self.load_timings["model"] = time.time() - start_time
+
+        # optionally swap the linear layers for dynamically quantized int8 ones when running on CPU
+        if self.device == "cpu" and os.getenv("MODEL_CPU_INT8", "") == "1":
+            start_time = time.time()
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.load_timings["quantization"] = time.time() - start_time
+
         print(f"putting model to {self.device}")
         super().__init__(model=model, tokenizer=tokenizer, **kwargs)
 
+    def _get_dtype(self) -> torch.dtype:
+        """float16 on GPU. On CPU float32 unless a reduced dtype, e.g. bfloat16, is set through MODEL_CPU_DTYPE."""
+        if self.device == "cuda":
+            return torch.float16
+        return getattr(torch, os.getenv("MODEL_CPU_DTYPE", "") or "float32")
+
+    def warmup(self) -> float:
+        """Runs a short synthetic evaluation through both heads so lazy initialization and kernel selection
+        happen before the first real query.
+
+        Returns:
+            seconds spent warming up
+        """
+        start_time = time.time()
+        max_tokens = self.max_tokens
+        self.max_tokens = 8
+        try:
+            self(
+                "", 
+                tasks=["hallucination"], 
+                rag_context="The earth is round. The sky is blue.", 
+                query="", 
+                llm_response="The sky is green.",
+            )
+        finally:
+            self.max_tokens = max_tokens
+
+        self.load_timings["warmup"] = time.time() - start_time
+        return self.load_timings["warmup"]
+
     def _sanitize_parameters(self, **kwargs):
         preprocess_kwargs = {}
         for k, v in kwargs.items():
             preprocess_kwargs[k] = kwargs[k]
         return preprocess_kwargs, {}, {}
 
-    def _gen_input_ids(self, prompt: str) -> str:
+    def _gen_input_ids(self, prompt: str) -> list[int]:
         messages = [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": prompt},
@@ -49,11 +172,248 @@ class DeValPipeline(Pipeline):
         input_ids = self.tokenizer.apply_chat_template(
             messages,
             add_generation_prompt=True,
-            return_tensors="pt"
-        ).to(self.device)
+        )
 
         return input_ids
 
+    def _get_terminators(self) -> list[int]:
+        return [
+            self.tokenizer.eos_token_id,
+            self.tokenizer.convert_tokens_to_ids("<|eot_id|>")
+        ]
+
+    def _get_number_tokens(self) -> dict[int, str]:
+        """Vocabulary entries made only of digits and dots, computed once and used by the score grammar.
+
+        The raw vocabulary is used rather than decoding each token on its own, which strips the word boundary marker
+        (`▁` or `Ġ`) of a token such as `▁5` and would let the grammar continue `0.` with a space. Tokens with a marker
+        contain other characters and are left out.
+        """
+        if self._number_tokens is None:
+            token_ids = list(range(len(self.tokenizer)))
+            tokens = self.tokenizer.convert_ids_to_tokens(token_ids)
+            self._number_tokens = {
+                i: token for i, token in zip(token_ids, tokens) 
+                if token and all(c in "0123456789." for c in token)
+            }
+        return self._number_tokens
+
+    def _generation_kwargs(self, heads: list[str | None] | None = None, prompt_length: int = 0) -> dict:
+        kwargs = {
+            "max_new_tokens": self.max_tokens,
+            "eos_token_id": self._get_terminators(),
+            "pad_token_id": self.tokenizer.pad_token_id,
+            "do_sample": True,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+        }
+
+        score_rows = [head == "score" for head in heads or []]
+        if score_rows and all(score_rows) and self.structured_scores:
+            kwargs["max_new_tokens"] = self.max_structured_score_tokens
+            kwargs["prefix_allowed_tokens_fn"] = ScoreGrammar(
+                self.tokenizer, prompt_length, self._get_number_tokens(), self._get_terminators()
+            )
+        elif any(score_rows) and self.early_stop_scores:
+            kwargs["stopping_criteria"] = StoppingCriteriaList([
+                ScoreStoppingCriteria(self.tokenizer, prompt_length, score_rows=score_rows)
+            ])
+
+        return kwargs
+
+    def _inference_context(self):
+        if self.device == "cuda":
+            return torch.cuda.amp.autocast()
+        return nullcontext()
+
+    def _schedule(self, input_ids: list[list[int]]) -> list[list[int]]:
+        """Groups prompts of similar length into batches to limit the amount of padding.
+
+        Returns:
+            list of batches, where each batch is a list of indices into input_ids
+        """
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+
+        batches = []
+        for i in order:
+            if (
+                batches 
+                and len(batches[-1]) < self.batch_size 
+                and len(input_ids[i]) - len(input_ids[batches[-1][0]]) <= self.bucket_width
+            ):
+                batches[-1].append(i)
+            else:
+                batches.append([i])
+
+        return batches
+
+    def _generate_batch(self, input_ids: list[list[int]], heads: list[str | None] | None = None) -> list[torch.Tensor]:
+        """Runs a single padded generate call and returns the generated tokens for each prompt."""
+        padded = self.tokenizer.pad(
+            {"input_ids": input_ids},
+            padding=True,
+            return_tensors="pt",
+        ).to(self.device)
+
+        # prompts are left padded so new tokens always start after the padded prompt length
+        prompt_length = padded["input_ids"].shape[-1]
+        outputs = self.model.generate(
+            input_ids=padded["input_ids"],
+            attention_mask=padded["attention_mask"],
+            **self._generation_kwargs(heads, prompt_length),
+        )
+
+        return [output[prompt_length:] for output in outputs]
+
+    def _generate(self, input_ids: list[list[int]], heads: list[str] | None = None) -> list[torch.Tensor]:
+        """Generates completions for all prompts using length-bucketed batches.
+
+        Score and mistakes prompts share batches, with early stopping applied to the score rows only. Structured scores
+        are the exception: the score grammar and its token limit apply to a whole generate call, so in that mode score
+        prompts are batched separately from the mistakes prompts.
+        """
+        responses = [None] * len(input_ids)
+        heads = heads or [None] * len(input_ids)
+
+        groups = {}
+        for i in range(len(input_ids)):
+            group = heads[i] if self.structured_scores else None
+            groups.setdefault(group, []).append(i)
+
+        with torch.inference_mode(), self._inference_context():
+            for group, indices in groups.items():
+                for batch in self._schedule([input_ids[i] for i in indices]):
+                    batch = [indices[i] for i in batch]
+                    start_time = time.time()
+                    outputs = self._generate_batch([input_ids[i] for i in batch], [heads[i] for i in batch])
+                    for i, output in zip(batch, outputs):
+                        responses[i] = output
+                    print(f"Batch of {len(batch)} {group or ''} generation time: {time.time()-start_time}")
+
+        return responses
+
+    @staticmethod
+    def _common_prefix_length(input_ids: list[list[int]]) -> int:
+        """Number of leading tokens shared by all prompts, leaving at least one uncached token per prompt."""
+        prefix_length = 0
+        for tokens in zip(*input_ids):
+            if any(t != tokens[0] for t in tokens):
+                break
+            prefix_length += 1
+
+        return min(prefix_length, min(len(ids) for ids in input_ids) - 1)
+
+    def _prefill(self, prefix_ids: list[int]):
+        """Runs the shared prefix through the model once and returns its KV cache."""
+        outputs = self.model(
+            input_ids=torch.tensor([prefix_ids], device=self.device),
+            use_cache=True,
+        )
+        return outputs.past_key_values
+
+    def _generate_from_prefix(
+        self, 
+        input_ids: list[list[int]], 
+        prefix_length: int, 
+        heads: list[str] | None = None,
+    ) -> list[torch.Tensor]:
+        """Prefills the shared prefix once, then forks generation for each prompt from a copy of the cache."""
+        responses = []
+
+        with torch.inference_mode(), self._inference_context():
+            start_time = time.time()
+            past_key_values = self._prefill(input_ids[0][:prefix_length])
+            print(f"Shared prefix of {prefix_length} tokens prefill time: {time.time()-start_time}")
+
+            for ids, head in zip(input_ids, heads or [None] * len(input_ids)):
+                start_time = time.time()
+                ids_tensor = torch.tensor([ids], device=self.device)
+                outputs = self.model.generate(
+                    input_ids=ids_tensor,
+                    attention_mask=torch.ones_like(ids_tensor),
+                    past_key_values=copy.deepcopy(past_key_values),
+                    **self._generation_kwargs([head], len(ids)),
+                )
+                responses.append(outputs[0][len(ids):])
+                print(f"Forked generation time: {time.time()-start_time}")
+
+        return responses
+
+    def measure_prefill(self, request: dict, num_runs: int = 3) -> dict:
+        """Compares the prefill time of the score and mistakes prompts with and without a shared KV cache.
+
+        Args:
+            request: dict with the keys tasks, rag_context, query and llm_response
+        Returns:
+            dict with the average seconds spent on prefill when each prompt is processed from scratch and when the
+            shared prefix is computed once
+        """
+        model_inputs = self.preprocess("", **request)
+        input_ids = [model_inputs["score_input_ids"]]
+        if model_inputs.get("mistakes_input_ids") is not None:
+            input_ids.append(model_inputs["mistakes_input_ids"])
+        prefix_length = self._common_prefix_length(input_ids)
+
+        def timed(fn):
+            if self.device == "cuda":
+                torch.cuda.synchronize()
+            start_time = time.time()
+            fn()
+            if self.device == "cuda":
+                torch.cuda.synchronize()
+            return time.time() - start_time
+
+        def prefill_separately():
+            for ids in input_ids:
+                self._prefill(ids)
+
+        def prefill_shared():
+            past_key_values = self._prefill(input_ids[0][:prefix_length])
+            for ids in input_ids:
+                self.model(
+                    input_ids=torch.tensor([ids[prefix_length:]], device=self.device),
+                    past_key_values=copy.deepcopy(past_key_values),
+                    use_cache=True,
+                )
+
+        with torch.inference_mode(), self._inference_context():
+            separate = sum(timed(prefill_separately) for _ in range(num_runs)) / num_runs
+            shared = sum(timed(prefill_shared) for _ in range(num_runs)) / num_runs
+
+        return {
+            "prompt_tokens": [len(ids) for ids in input_ids],
+            "shared_prefix_tokens": prefix_length,
+            "separate_prefill_time": separate,
+            "shared_prefill_time": shared,
+            "prefill_time_saved": separate - shared,
+        }
+
+    def evaluate_batch(self, requests: list[dict]) -> list[dict]:
+        """Evaluates many requests together, batching the score and mistakes prompts of all of them.
+
+        Args:
+            requests: list of dicts with the keys tasks, rag_context, query and llm_response
+        Returns:
+            list of dicts with score_completion and mistakes_completion, in the order of requests
+        """
+        model_inputs = [self.preprocess("", **request) for request in requests]
+
+        # flatten the score and mistakes prompts so they share batches
+        heads = []
+        input_ids = []
+        for i, inputs in enumerate(model_inputs):
+            for head in ["score", "mistakes"]:
+                ids = inputs.get(f"{head}_input_ids")
+                if ids is not None:
+                    heads.append((i, head))
+                    input_ids.append(ids)
+
+        responses = [{"score_response": None, "mistakes_response": None} for _ in requests]
+        for (i, head), output in zip(heads, self._generate(input_ids, [head for _, head in heads])):
+            responses[i][f"{head}_response"] = output
+
+        return [self.postprocess(response) for response in responses]
+
        
     def _get_prompt(
         self, 
@@ -61,16 +421,19 @@ class DeValPipeline(Pipeline):
     ) -> str:
         if task == "attribution":
             return {
+                "prefix": CONTEXT_PREFIX_PROMPT,
                 "score": ATTRIBUTION_PROMPT,
                 "mistakes": ATTRIBUTION_MISTAKES_PROMPT,
             }
         elif task == 'summary_completeness':
             return {
+                "prefix": CONTEXT_PREFIX_PROMPT,
                 "score": SUMMARY_COMPLETENESS_PROMPT,
                 "mistakes": SUMMARY_MISTAKES_PROMPT,
             }
         elif task == "hallucination":
             return {
+                "prefix": CONTEXT_PREFIX_PROMPT,
                 "score": HALLUCINATION_PROMPT,
                 "mistakes": HALLUCINATION_MISTAKES_PROMPT,
             }
@@ -109,17 +472,23 @@ class DeValPipeline(Pipeline):
             task=tasks[0],
         )
 
+        # the context is placed first so the score and mistakes prompts share a common prefix
+        prefix_prompt = prompts.get("prefix", "")
+        prefix_prompt = prefix_prompt.format(rag_context = rag_context, llm_response = llm_response)
+
         # prep score evaluation 
         score_prompt = prompts.get("score")
-        score_prompt = score_prompt.format(rag_context = rag_context, query = query, llm_response = llm_response)
+        score_prompt = prefix_prompt + score_prompt.format(rag_context = rag_context, query = query, llm_response = llm_response)
         score_input_ids =self._gen_input_ids(score_prompt)
+        if self.structured_scores:
+            score_input_ids = score_input_ids + self.tokenizer.encode(STRUCTURED_SCORE_PREFIX, add_special_tokens=False)
 
         # prep mistake identification 
         mistakes_prompt = prompts.get("mistakes", None)
                 
         # we do not evaluate for all tasks
         if mistakes_prompt:
-            mistakes_prompt = mistakes_prompt.format(rag_context = rag_context, llm_response = llm_response)
+            mistakes_prompt = prefix_prompt + mistakes_prompt.format(rag_context = rag_context, llm_response = llm_response)
             mistakes_input_ids =self._gen_input_ids(mistakes_prompt)
         else:
             mistakes_input_ids = None
@@ -134,44 +503,22 @@ class DeValPipeline(Pipeline):
         score_input_ids = model_inputs['score_input_ids']
         mistake_input_ids = model_inputs.get('mistakes_input_ids', None)
 
-        terminators = [
-            self.tokenizer.eos_token_id,
-            self.tokenizer.convert_tokens_to_ids("<|eot_id|>")
-        ]
-        with torch.cuda.amp.autocast() if self.device == "cuda" else nullcontext():
-
-            start_score_time = time.time()
-            # run eval score
-            score_outputs = self.model.generate(
-                input_ids=score_input_ids,
-                max_new_tokens=self.max_tokens,
-                eos_token_id=terminators,
-                do_sample=True,
-                temperature=self.temperature,
-                top_p=self.top_p,
-            )
-            score_response = score_outputs[0][score_input_ids.shape[-1]:]
-            print(f"Score generation time: {time.time()-start_score_time}")
-
-            # run mistakes eval score
-            start_mistakes_time = time.time()
-            mistakes_response = None
-            if mistake_input_ids is not None:
-                mistakes_outputs = self.model.generate(
-                    input_ids=mistake_input_ids,
-                    max_new_tokens=self.max_tokens,
-                    eos_token_id=terminators,
-                    do_sample=True,
-                    temperature=self.temperature,
-                    top_p=self.top_p,
-                )
-                mistakes_response = mistakes_outputs[0][score_input_ids.shape[-1]:]
-                print(f"Mistakes generation time: {time.time()-start_mistakes_time}")
+        input_ids = [score_input_ids]
+        heads = ["score"]
+        if mistake_input_ids is not None:
+            input_ids.append(mistake_input_ids)
+            heads.append("mistakes")
 
+        # long shared contexts are prefilled once and reused by both prompts, otherwise we batch them
+        prefix_length = self._common_prefix_length(input_ids) if len(input_ids) > 1 else 0
+        if prefix_length >= self.min_shared_prefix_tokens:
+            outputs = self._generate_from_prefix(input_ids, prefix_length, heads)
+        else:
+            outputs = self._generate(input_ids, heads)
 
         return {
-            "score_response": score_response,
-            "mistakes_response": mistakes_response
+            "score_response": outputs[0],
+            "mistakes_response": outputs[1] if mistake_input_ids is not None else None
         }
 
     def postprocess(self, response):
@@ -180,6 +527,8 @@ class DeValPipeline(Pipeline):
 
         # decode and parse score
         score_decoded = self.tokenizer.decode(score_response, skip_special_tokens=True)
+        if self.structured_scores:
+            score_decoded = STRUCTURED_SCORE_PREFIX + score_decoded
         score_completion = self._parse_score_response(score_decoded)
 
         # decode and parse mistakes
@@ -208,4 +557,7 @@ if __name__ == "__main__":
     query = "What color is the sky"
 
     pipe = DeValPipeline("de_val", model_dir = model_dir)
-    print(pipe("", tasks=tasks, rag_context=rag_context, query=query, llm_response=llm_response))
\ No newline at end of file
+    print(pipe("", tasks=tasks, rag_context=rag_context, query=query, llm_response=llm_response))
+    # measure the prefill time saved by sharing a long, wikipedia sized context between the score and mistakes prompts
+    long_context = " ".join([rag_context] * 500)
+    print(pipe.measure_prefill({"tasks": ["hallucination"], "rag_context": long_context, "query": query, "llm_response": llm_response}))
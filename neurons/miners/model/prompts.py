@@ -1,3 +1,15 @@
+# Shared by the score and mistakes prompts of a task so that the model only needs to process
+# the (long) RAG context and LLM response once. The task specific instructions follow this prefix.
+CONTEXT_PREFIX_PROMPT = """\
+# RAG Context
+{rag_context}
+
+# LLM Response
+{llm_response}
+
+"""
+
+
 RELEVANCY_PROMPT = """\
 Your goal is to determine if the provided LLM response is relevant to the user's query.\
     You should disregard whether the response is factually accurate or not and only be concerned with relevance. 
@@ -23,7 +35,7 @@ Return your response if the format of "Response: score" where the score is your
 HALLUCINATION_PROMPT = """\
 Your goal is to determine if the provided LLM response is hallucinating given the provided RAG context.  \
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of claims derived from the RAG context
 
@@ -32,13 +44,6 @@ You should return a score between 0 and 1 based on how accurate you perceive the
 - If the entire response is hallucinated then return a value of 0
 - if half of the response is hallucinated then return a score of 0.5
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
-
 Return your response if the format of "Response: score" where the score is your estimation on relevancy. Return no other text
 """
 
@@ -47,7 +52,7 @@ Your goal is to extract the hallucinations from the provided respnse given the u
 Essentially, you must compare the response to the RAG context, determine if any of the claims in the response are false, and \
 return back any false claims you identify.  
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of claims derived from the RAG context
 
@@ -56,12 +61,6 @@ Requirements:
 - You must return each false claim separated by a newline character 
 - Do not return any other text unless you consider it to be false based on the provided RAG context
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
 Do not return any other text beside the false claims separated by a newline character. 
 """
 
@@ -70,7 +69,7 @@ Do not return any other text beside the false claims separated by a newline char
 ATTRIBUTION_PROMPT = """\
 Your goal is to determine if the provided LLM response is mis-attributing action items to the wrong person given the provided RAG context.  \
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of summarized action items attributed to a participant derived from the RAG context
 
@@ -82,13 +81,6 @@ You should return a score between 0 and 1 based on how accurate you perceive the
 - If the entire response is misattributed then return a value of 0
 - if half of the response is misattributed then return a score of 0.5
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
-
 Return your response if the format of "Response: score" where the score is your estimation on relevancy. Return no other text
 """
 
@@ -101,7 +93,7 @@ For example, if the RAG context says that Person A must achieve Task 1, but the
 then this would be a misattribution.  You must return this action item if it was misattributed.
 
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of summarized action items attributed to a participant derived from the RAG context
 
@@ -110,12 +102,6 @@ Requirements:
 - You must return each misattributed action items separated by a newline character 
 - Do not return any other text unless you consider it to be misattributed based on the provided RAG context
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
 Do not return any other text beside the misattributed action items separated by a newline character. 
 """
 
@@ -123,7 +109,7 @@ Do not return any other text beside the misattributed action items separated by
 SUMMARY_COMPLETENESS_PROMPT = """\
 Your goal is to determine if the provided LLM response is a complete summary given the provided RAG context.  \
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of claims derived from the RAG context
 
@@ -135,13 +121,6 @@ You should return a score between 0 and 1 based on how accurate you perceive the
 - If the response is missing all important information from RAG context then return a value of 0
 - if the response is missing half of the important information from the RAG context then return a score of 0.5
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
-
 Return your response if the format of "Response: score" where the score is your estimation on relevancy. Return no other text
 """
 
@@ -154,7 +133,7 @@ missing key information that you identified.
 
 For example, if the RAG context contains important information that should be summarized then this would be considered an incomplete summary.
 
-In this task, I will provide you with the following:
+Above, I have provided you with the following:
 - RAG Context: the provided context which will act as your source of truth
 - LLM Response: a series of claims derived from the RAG context
 
@@ -164,11 +143,5 @@ Requirements:
 - You must return each summary separated by a newline character 
 - Do not return any other text unless you consider it to be a summary of missing information from RAG context.
 
-# RAG Context
-{rag_context}
-
-# LLM Response
-{llm_response}
-
 Do not return any other text beside the summaries separated by a newline character. 
 """
@@ -1,3 +1,4 @@
+import asyncio
 from deval.contest import DeValContest
 from deval.validator import Validator
 import time
@@ -77,13 +78,13 @@ if is_valid:
     chain_metadata = metadata_store.retrieve_model_metadata(hotkey)
     miner_state.add_chain_metadata(chain_metadata)
 
-    miner_state = Validator.run_epoch(
+    miner_state = asyncio.run(Validator.run_epoch(
         contest,
         miner_state, 
         task_repo, 
         miner_docker_client,
         wandb_logger
-    )
+    ))
     print("Completed epoch")
 
 print("updating contest with rewards and ranking")
@@ -0,0 +1,54 @@
+from unittest import mock
+import pytest
+from deval.api.models import APIStatus
+from deval.budget import QueryBudget
+
+
+def test_timeout_adapts_to_reported_response_times():
+    budget = QueryBudget(max_timeout=60, min_timeout=2)
+    assert budget.next_timeout("hallucination") == 60
+
+    # the first response includes the warm-up of the model and is not part of the estimate
+    budget.record("hallucination", APIStatus.SUCCESS, 50.0)
+    for _ in range(20):
+        budget.record("hallucination", APIStatus.SUCCESS, 1.0)
+
+    assert budget.next_timeout("hallucination") == pytest.approx(2.0)
+
+    budget.record("hallucination", APIStatus.SUCCESS, 9.0)
+    assert 2.0 < budget.next_timeout("hallucination") < 60
+
+
+def test_timeouts_are_estimated_per_task_type():
+    budget = QueryBudget(max_timeout=60)
+    assert budget.min_timeout == 15
+
+    for _ in range(20):
+        budget.record("hallucination", APIStatus.SUCCESS, 1.0)
+
+    assert budget.next_timeout("hallucination") == pytest.approx(15)
+    assert budget.next_timeout("summary_completeness") == 60
+
+
+def test_breaker_trips_on_consecutive_failures_only():
+    budget = QueryBudget(max_timeout=60, max_consecutive_failures=3)
+    for status in (APIStatus.TIMEOUT, APIStatus.ERROR, APIStatus.SUCCESS, APIStatus.TIMEOUT, APIStatus.ERROR):
+        budget.record("relevancy", status, 1.0)
+    assert budget.abort_reason() is None
+
+    budget.record("hallucination", APIStatus.TIMEOUT, None)
+    assert budget.tripped
+    assert "3 consecutive" in budget.abort_reason()
+
+
+def test_timeout_never_exceeds_the_remaining_budget():
+    with mock.patch("deval.budget.time.monotonic", return_value=100.0):
+        budget = QueryBudget(max_timeout=60, total_time=90)
+
+    with mock.patch("deval.budget.time.monotonic", return_value=170.0):
+        assert budget.next_timeout("relevancy") == pytest.approx(20)
+        assert budget.abort_reason() is None
+
+    with mock.patch("deval.budget.time.monotonic", return_value=191.0):
+        assert budget.next_timeout("relevancy") == 0
+        assert "exhausted" in budget.abort_reason()
@@ -0,0 +1,100 @@
+import pytest
+from deval.api.container_backend import ContainerSpec, DockerEngineBackend, FakeBackend, MINER_API_IMAGE
+from deval.api.docker_engine import DockerEngineError
+from deval.api.miner_docker_client import MinerDockerClient
+
+
+class RecordingEngine:
+    def __init__(self):
+        self.calls = []
+
+    def image_exists(self, image):
+        return True
+
+    def ensure_network(self, name):
+        self.calls.append(("ensure_network", name))
+
+    def remove_container(self, name, force=False):
+        self.calls.append(("remove_container", name))
+        raise DockerEngineError(404, "No such container")
+
+    def create_container(self, name, config):
+        self.calls.append(("create_container", name, config))
+        return "abc"
+
+    def start_container(self, name):
+        self.calls.append(("start_container", name))
+
+
+def test_engine_backend_recreates_from_the_prebuilt_image():
+    engine = RecordingEngine()
+    spec = ContainerSpec(name="miner-api", env={"MODEL_URL": "org/model"})
+
+    DockerEngineBackend(engine).recreate(spec)
+
+    assert [call[0] for call in engine.calls] == [
+        "ensure_network", "remove_container", "create_container", "start_container"
+    ]
+    config = engine.calls[2][2]
+    assert config["Image"] == MINER_API_IMAGE
+    assert config["Env"] == ["MODEL_URL=org/model"]
+    assert config["HostConfig"]["PortBindings"] == {"8000/tcp": [{"HostPort": "8000"}]}
+    assert config["HostConfig"]["CapDrop"] == ["ALL"]
+
+
+def test_client_builds_the_image_once():
+    backend = FakeBackend()
+    client = MinerDockerClient(backend=backend)
+
+    client.restart_service("org/model-a")
+    client.restart_service("org/model-b")
+
+    assert backend.builds == 1
+    assert backend.containers["miner-api"].env["MODEL_URL"] == "org/model-b"
+    backend.close_events()
+
+
+def test_readiness_stops_when_the_container_exits():
+    backend = FakeBackend()
+    client = MinerDockerClient(backend=backend)
+    client._start_event_watcher()
+    client.restart_service("org/model")
+    backend.stop("miner-api")
+
+    assert not client._poll_service_for_readiness(max_wait_time=50)
+    assert client.container_exited.is_set()
+    backend.close_events()
+
+
+def test_event_watcher_reconnects_after_the_stream_ends():
+    backend = FakeBackend()
+    client = MinerDockerClient(backend=backend)
+    client.event_retry_interval = 0.01
+    client._start_event_watcher()
+
+    backend.close_events()
+    client.restart_service("org/model")
+    assert client.container_started.wait(5)
+    backend.stop("miner-api")
+    assert client.container_exited.wait(5)
+
+    client.close()
+    backend.close_events()
+    client.event_thread.join(5)
+    assert not client.event_thread.is_alive()
+
+
+def test_container_size_comes_from_the_monitor_and_fails_closed():
+    client = MinerDockerClient(backend=FakeBackend())
+    client.monitor._memory_and_cpu = lambda: (None, None)
+
+    client.monitor._disk_gb = lambda: None
+    client.monitor.sample()
+    assert client.get_container_size() is None
+
+    client.monitor.reset()
+    assert client.get_container_size(timeout=0.01) is None
+
+    client.monitor._disk_gb = lambda: 3.0
+    client.monitor.sample()
+    assert client.get_container_size() == pytest.approx(3)
@@ -0,0 +1,70 @@
+from deval.api.container_monitor import ContainerMonitor, GB
+
+
+class FakeEngine:
+    def __init__(self, size_rw: int, usage: int):
+        self.size_rw = size_rw
+        self.usage = usage
+        self.total_usage = 0
+        self.system_usage = 0
+
+    def inspect_container(self, name: str, size: bool = False) -> dict:
+        info = {"GraphDriver": {"Data": {"UpperDir": "/does/not/exist"}}}
+        if size:
+            info["SizeRw"] = self.size_rw
+        return info
+
+    def container_stats(self, name: str) -> dict:
+        self.total_usage += 50
+        self.system_usage += 100
+        return {
+            "memory_stats": {"usage": self.usage, "stats": {"inactive_file": GB}},
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": self.total_usage},
+                "system_cpu_usage": self.system_usage,
+                "online_cpus": 4,
+            },
+        }
+
+
+def test_monitor_caches_the_latest_readings():
+    monitor = ContainerMonitor("miner-api", engine=FakeEngine(size_rw=3 * GB, usage=5 * GB))
+
+    first = monitor.sample()
+    second = monitor.sample()
+
+    assert first.disk_gb == 3
+    assert first.memory_gb == 4
+    assert first.cpu_percent is None
+    assert second.cpu_percent == 200
+    assert monitor.disk_gb == 3
+    assert monitor.violation is None
+
+
+def test_monitor_records_limit_violations():
+    violations = []
+    monitor = ContainerMonitor(
+        "miner-api", 
+        engine=FakeEngine(size_rw=25 * GB, usage=GB), 
+        max_disk_gb=20, 
+        on_violation=violations.append
+    )
+    monitor.sample()
+
+    assert monitor.violation.resource == "disk_gb"
+    assert violations == [monitor.violation]
+
+    monitor.reset()
+    assert monitor.violation is None
+    assert monitor.disk_gb is None
+
+
+def test_background_thread_provides_the_first_sample():
+    monitor = ContainerMonitor("miner-api", engine=FakeEngine(size_rw=GB, usage=GB), sample_interval=60)
+    monitor.start()
+    try:
+        stats = monitor.wait_for_sample(timeout=5)
+    finally:
+        monitor.stop()
+
+    assert stats.disk_gb == 1
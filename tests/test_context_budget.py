@@ -0,0 +1,76 @@
+from deval.tools.datasets import context_budget
+from deval.tools.datasets.context_budget import budget_sections, count_tokens, truncate_to_tokens
+
+
+def section(word: str, n: int) -> list[str]:
+    return [" ".join(f"{word}{i % 40}" for i in range(n))]
+
+
+SECTIONS = {
+    ("", "Early life"): section("life", 200),
+    ("", "Career"): section("work", 200),
+    ("", "Discography"): section("disc", 200),
+}
+
+
+def joined_tokens(sections: dict) -> int:
+    return count_tokens("\n".join("\n".join(lines) for lines in sections.values()))
+
+
+def test_articles_within_the_budget_are_kept_whole():
+    kept, stats = budget_sections(SECTIONS, max_tokens=100_000)
+
+    assert kept == SECTIONS
+    assert stats["sections_kept"] == stats["sections_total"] == 3
+    assert stats["tokens"] == stats["article_tokens"]
+    assert not stats["truncated"]
+
+
+def test_sections_sharing_the_subject_are_kept_within_the_budget():
+    max_tokens = joined_tokens(SECTIONS) * 3 // 4
+    reference = " ".join(SECTIONS[("", "Career")][0].split()[:40] + SECTIONS[("", "Early life")][0].split()[:40])
+
+    kept, stats = budget_sections(SECTIONS, max_tokens=max_tokens, reference=reference)
+
+    assert list(kept) == [("", "Early life"), ("", "Career")]
+    assert joined_tokens(kept) <= stats["tokens"] <= max_tokens
+    assert stats["sections_kept"] == 2
+
+
+def test_a_section_larger_than_the_budget_is_truncated():
+    kept, stats = budget_sections(SECTIONS, max_tokens=50, reference="work1 work2")
+
+    assert list(kept) == [("", "Career")]
+    assert stats["truncated"]
+    assert joined_tokens(kept) <= 50
+
+
+def test_zero_budget_disables_trimming():
+    kept, stats = budget_sections(SECTIONS, max_tokens=0)
+    assert kept == SECTIONS
+
+
+def test_truncation_cuts_at_a_word_boundary():
+    text = " ".join(["word"] * 1000)
+    truncated = truncate_to_tokens(text, 20)
+
+    assert count_tokens(truncated) <= 20
+    assert text.startswith(truncated)
+    assert truncated.endswith("word")
+
+
+def test_a_failed_tokenizer_load_is_retried(monkeypatch):
+    loads = []
+    monkeypatch.setattr(context_budget, "_tokenizer", None)
+    monkeypatch.setattr(context_budget, "_tokenizer_retry_at", 0.0)
+    monkeypatch.setattr(context_budget, "load_tokenizer", lambda: loads.append(1))
+
+    assert context_budget.get_tokenizer() is None
+    assert context_budget.get_tokenizer() is None
+    assert len(loads) == 1
+
+    tokenizer = object()
+    monkeypatch.setattr(context_budget, "_tokenizer_retry_at", 0.0)
+    monkeypatch.setattr(context_budget, "load_tokenizer", lambda: tokenizer)
+    assert context_budget.get_tokenizer() is tokenizer
+    count_tokens.cache_clear()
@@ -0,0 +1,67 @@
+from deval.model.duplicates import DuplicateScreen
+
+
+COMMITMENTS = {
+    (1, "a"): ("hash-1", 100),
+    (2, "b"): ("hash-1", 50),
+    (3, "c"): ("hash-1", 200),
+    (4, "d"): ("hash-2", 10),
+    (5, "e"): (None, 20),
+}
+
+
+def test_only_the_earliest_committer_is_evaluated():
+    screen = DuplicateScreen(COMMITMENTS)
+
+    assert screen.groups == {"hash-1": [(2, "b"), (1, "a"), (3, "c")]}
+    assert [m for m in COMMITMENTS if screen.should_skip(m)] == [(1, "a"), (3, "c")]
+
+
+def test_confirmed_committer_keeps_copies_skipped():
+    screen = DuplicateScreen(COMMITMENTS)
+    for miner in COMMITMENTS:
+        screen.should_skip(miner)
+
+    screen.record_outcome((2, "b"), confirmed=True)
+
+    assert screen.pending() == []
+
+
+def test_next_committer_replaces_an_unconfirmed_one():
+    screen = DuplicateScreen(COMMITMENTS)
+    for miner in COMMITMENTS:
+        screen.should_skip(miner)
+
+    screen.record_outcome((2, "b"), confirmed=False)
+    assert screen.pending() == [(1, "a")]
+
+    assert not screen.should_skip((1, "a"))
+    screen.record_outcome((1, "a"), confirmed=False)
+    assert screen.pending() == [(3, "c")]
+
+
+def screened_state(uid: int, hotkey: str, block: int):
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        uid=uid, hotkey=hotkey, coldkey="coldkey", block=block, chain_model_hash="hash-1",
+        get_last_commit_date=lambda: datetime(2020, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_a_finalist_is_not_a_duplicate_of_its_own_screening():
+    from deval.contest import DeValContest
+    contest = DeValContest(reward_pipeline=None, forward_start_time=2_000_000_000, timeout=10)
+    contest.model_rewards[1] = {"relevancy": [0.5]}
+
+    screening = screened_state(1, "a", 100)
+    assert contest.validate_model(screening, "hash-1", "coldkey", 10, 20)
+    assert contest.get_screened_model(1, "a") is screening
+
+    final = screened_state(1, "a", 100)
+    assert contest.validate_model(final, "hash-1", "coldkey", 10, 20)
+    assert contest.model_rewards[1] == {"relevancy": [0.5]}
+    assert contest.model_hashes["hash-1"] is final
+
+    # another hotkey on the same uid committing the same hash later is still a duplicate
+    assert not contest.validate_model(screened_state(1, "b", 300), "hash-1", "coldkey", 10, 20)
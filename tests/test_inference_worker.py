@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import pytest
+from deval.api.inference_worker import InferenceWorker, WorkerSaturated
+
+
+class FakePipe:
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, inputs, **request):
+        self.release.wait()
+        self.batches.append(1)
+        return {"score_completion": len(request["llm_response"]), "mistakes_completion": []}
+
+    def evaluate_batch(self, requests):
+        self.release.wait()
+        self.batches.append(len(requests))
+        return [{"score_completion": len(r["llm_response"]), "mistakes_completion": []} for r in requests]
+
+
+def make_request(llm_response: str) -> dict:
+    return {"tasks": ["relevancy"], "rag_context": "", "query": "", "llm_response": llm_response}
+
+
+def test_worker_micro_batches_concurrent_requests():
+    pipe = FakePipe()
+    worker = InferenceWorker(pipe, max_batch_size=8, max_batch_wait=0.2)
+    worker.start()
+
+    async def run():
+        return await asyncio.gather(*[worker.submit([make_request("a" * i)]) for i in range(1, 5)])
+
+    completions = asyncio.run(run())
+
+    assert [c[0]["score_completion"] for c in completions] == [1, 2, 3, 4]
+    assert sum(pipe.batches) == 4
+    assert max(pipe.batches) > 1
+    assert worker.stats()["processed"] == 4
+
+
+def test_worker_rejects_when_saturated():
+    pipe = FakePipe()
+    pipe.release.clear()
+    worker = InferenceWorker(pipe, max_queue_size=1, max_batch_size=1, max_batch_wait=0)
+    worker.start()
+
+    async def run():
+        first = asyncio.ensure_future(worker.submit([make_request("a")]))
+        # wait until the worker has picked up the first request so it is in flight
+        while worker.stats()["in_flight"] == 0:
+            await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(worker.submit([make_request("b")]))
+        await asyncio.sleep(0)
+
+        with pytest.raises(WorkerSaturated) as exc_info:
+            await worker.submit([make_request("c")])
+
+        stats = worker.stats()
+        pipe.release.set()
+        await asyncio.gather(first, second)
+        return exc_info.value, stats
+
+    error, stats = asyncio.run(run())
+
+    assert error.retry_after >= 1
+    assert stats["queue_depth"] == 1
+    assert stats["in_flight"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_worker_propagates_pipeline_errors():
+    class FailingPipe:
+        def __call__(self, inputs, **request):
+            raise RuntimeError("out of memory")
+
+    worker = InferenceWorker(FailingPipe())
+    worker.start()
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        asyncio.run(worker.submit([make_request("a")]))
+
+
+def test_worker_keeps_serving_after_an_empty_batch():
+    pipe = FakePipe()
+    worker = InferenceWorker(pipe)
+    worker.start()
+
+    async def run():
+        return await worker.submit([]), await worker.submit([make_request("ab")])
+
+    empty, completions = asyncio.run(run())
+
+    assert empty == []
+    assert completions[0]["score_completion"] == 2
+    assert worker.thread.is_alive()
@@ -0,0 +1,76 @@
+import json
+import pytest
+from json.decoder import JSONDecodeError
+from pydantic import BaseModel, ValidationError
+from deval.tasks.json_repair import json_repairs, parse_tool_output, repair_json
+
+
+class Claim(BaseModel):
+    context: str
+    claim: str
+    true_or_false: bool
+
+
+EXPECTED = {"context": "The report is due Friday.", "claim": "Bob's report is late."}
+
+
+@pytest.mark.parametrize(
+    "output, repairs",
+    [
+        (json.dumps(EXPECTED), []),
+        (f"```json\n{json.dumps(EXPECTED, indent=2)}\n```", ["code_fence"]),
+        (f"Here is the JSON:\n{json.dumps(EXPECTED)}\nLet me know if you need more.", ["surrounding_text"]),
+        ("{'context': 'The report is due Friday.', 'claim': \"Bob's report is late.\",}", ["python_literal"]),
+        (json.dumps({"name": "tool", "arguments": EXPECTED}), ["arguments"]),
+        (json.dumps({"name": "tool", "arguments": json.dumps(EXPECTED)}), ["arguments"]),
+        (json.dumps(json.dumps(EXPECTED)), ["encoded_string"]),
+    ],
+)
+def test_outputs_are_repaired(output, repairs):
+    json_repairs.reset()
+    assert parse_tool_output(output) == EXPECTED
+
+    counts = json_repairs.summary()
+    assert counts["repaired" if repairs else "valid"] == 1
+    assert all(counts[f"repair.{repair}"] == 1 for repair in repairs)
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        ('{"context": "The report", "claim": "Bob\'s rep', {"context": "The report"}),
+        ('{"key_topics": ["history", "geogra', {"key_topics": ["history"]}),
+        ('{"key_topics": ["history", "geography"', {"key_topics": ["history", "geography"]}),
+        ('{"context": "The report", "claim":', {"context": "The report"}),
+        ('{"context": "The report", "cla', {"context": "The report"}),
+        ('{"context": "The report", "claim"', {"context": "The report"}),
+        ('{"context": "The report", "valid": tr', {"context": "The report"}),
+        ('[{"topic": "a", "summary": "b"}, {"topic": "c", "summary": "d', [{"topic": "a", "summary": "b"}, {"topic": "c"}]),
+        ('{"a": 1, "b": true, "c": "tr', {"a": 1, "b": True}),
+        ('{"a": [1, 2', {"a": [1]}),
+        ('{"context": "The report", "true_or_false": true, "claim": "Bob', {"context": "The report", "true_or_false": True}),
+    ],
+)
+def test_truncated_outputs_keep_only_complete_values(output, expected):
+    value, repairs = repair_json(output)
+    assert value == expected
+    assert "truncated" in repairs
+
+
+def test_outputs_are_validated_against_the_model():
+    json_repairs.reset()
+    claim = parse_tool_output(f"```{json.dumps(EXPECTED)}```", Claim, true_or_false=True)
+    assert claim == Claim(**EXPECTED, true_or_false=True)
+
+    # a required field cut off by the token limit is missing rather than shortened
+    with pytest.raises(ValidationError):
+        parse_tool_output('{"context": "The report", "claim": "Bob\'s rep', Claim, true_or_false=True)
+    assert json_repairs.summary()["failed"] == 1
+
+
+@pytest.mark.parametrize("output", ["No JSON here.", "[1, 2, 3]", None, "```\n```"])
+def test_unsalvageable_outputs_raise(output):
+    json_repairs.reset()
+    with pytest.raises(JSONDecodeError):
+        parse_tool_output(output)
+    assert json_repairs.summary()["failed"] == 1
@@ -0,0 +1,53 @@
+import pytest
+from deval.llms.base_llm import BaseLLM
+from deval.llms.config import LLMAPIs, LLMArgs, LLMFormatType
+from deval.llms.usage import UsageTracker, usage_tracker
+
+
+class FakeLLM(BaseLLM):
+    def __init__(self, model_id: str):
+        super().__init__(LLMAPIs.OPENAI, model_id, LLMArgs(format=LLMFormatType.TEXT))
+
+    def query(self, prompt: str, system_prompt: str, tool_schema: dict | None = None) -> str:
+        response = self.forward([])
+        self.record_call(0.5)
+        return response
+
+    def forward(self, messages: list[dict[str, str]]) -> str:
+        self.last_usage = (1000, 200, 1)
+        return "response"
+
+    def parse_response(self, output) -> str:
+        return output
+
+    def load(self):
+        return None
+
+
+def test_calls_are_aggregated_per_model_and_task():
+    usage_tracker.reset()
+    llm = FakeLLM("gpt-4o-mini")
+    with usage_tracker.task("relevancy"):
+        for _ in range(3):
+            llm.query("prompt", "system prompt")
+    llm.query("prompt", "system prompt")
+
+    summary = usage_tracker.summary()
+    stats = summary["openai/gpt-4o-mini/relevancy"]
+    assert stats["calls"] == 3
+    assert stats["retries"] == 3
+    assert stats["prompt_tokens"] == 3000
+    assert stats["tokens_per_second"] == pytest.approx(400)
+    assert stats["cost"] == pytest.approx(3 * (1000 * 0.15 + 200 * 0.6) / 1e6)
+    assert summary["openai/gpt-4o-mini/unknown"]["calls"] == 1
+    assert llm.num_calls == 4 and llm.completion_tokens == 800
+
+
+def test_unknown_models_and_errors_are_counted_without_cost():
+    tracker = UsageTracker()
+    tracker.record("aws_bedrock", "unpriced-model", 2.0, error=True)
+
+    stats = tracker.summary()["aws_bedrock/unpriced-model/unknown"]
+    assert stats["errors"] == 1
+    assert stats["cost"] == 0.0
+    assert stats["latency"]["count"] == 1
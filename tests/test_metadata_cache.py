@@ -0,0 +1,35 @@
+from unittest import mock
+from deval.model.metadata_cache import MinerMetadataCache
+
+
+def test_only_answered_miners_are_cached():
+    cache = MinerMetadataCache(ttl=60)
+    cache.update({(1, "a"): ("org", "model"), (2, "b"): ("", ""), (3, "c"): ("org", "")})
+
+    assert cache.get((1, "a")) == ("org", "model")
+    assert cache.stale([(1, "a"), (2, "b"), (3, "c"), (4, "d")]) == [(2, "b"), (3, "c"), (4, "d")]
+
+
+def test_entries_expire_after_ttl():
+    cache = MinerMetadataCache(ttl=60)
+    with mock.patch("deval.model.metadata_cache.time.time", return_value=1000.0):
+        cache.update({(1, "a"): ("org", "model")})
+
+    with mock.patch("deval.model.metadata_cache.time.time", return_value=1059.0):
+        assert cache.get((1, "a")) == ("org", "model")
+
+    with mock.patch("deval.model.metadata_cache.time.time", return_value=1061.0):
+        assert cache.get((1, "a")) is None
+        assert cache.stale([(1, "a")]) == [(1, "a")]
+
+
+def test_a_new_hotkey_does_not_inherit_the_model_of_the_uid():
+    cache = MinerMetadataCache(ttl=60)
+    cache.update({(1, "old"): ("org", "old-model")})
+
+    assert cache.get((1, "new")) is None
+    assert cache.stale([(1, "new")]) == [(1, "new")]
+
+    cache.update({(1, "new"): ("org", "new-model")})
+    assert cache.get((1, "new")) == ("org", "new-model")
+    assert cache.get((1, "old")) is None
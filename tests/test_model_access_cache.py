@@ -0,0 +1,40 @@
+from unittest import mock
+from deval.llms.access_cache import ModelAccessCache, filter_accessible
+
+
+class FakeLLM:
+    def __init__(self, model_id: str, accessible: bool | None):
+        self.model_id = model_id
+        self.accessible = accessible
+        self.checks = 0
+
+    def check_model_id_access(self) -> bool | None:
+        self.checks += 1
+        return self.accessible
+
+
+def test_access_results_are_reused_from_disk(tmp_path):
+    path = str(tmp_path / "model_access.json")
+    llms = [FakeLLM("claude", True), FakeLLM("mistral", False), FakeLLM("cohere", None)]
+
+    available = filter_accessible(llms, ModelAccessCache(path, ttl=60), credentials="key")
+    assert [llm.model_id for llm in available] == ["claude"]
+
+    # a new cache, as built by the next task repository, reads the conclusive results back
+    available = filter_accessible(llms, ModelAccessCache(path, ttl=60), credentials="key")
+    assert [llm.model_id for llm in available] == ["claude"]
+    assert [llm.checks for llm in llms] == [1, 1, 2]
+
+
+def test_results_expire_and_depend_on_the_credentials(tmp_path):
+    cache = ModelAccessCache(str(tmp_path / "model_access.json"), ttl=60)
+    llm = FakeLLM("claude", True)
+
+    with mock.patch("deval.llms.access_cache.time.time", return_value=1000.0):
+        filter_accessible([llm], cache, credentials="key")
+        filter_accessible([llm], cache, credentials="other key")
+    assert llm.checks == 2
+
+    with mock.patch("deval.llms.access_cache.time.time", return_value=1100.0):
+        filter_accessible([llm], cache, credentials="key")
+    assert llm.checks == 3
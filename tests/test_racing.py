@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from deval.racing import screening_counts, stratified_bounds, select_contenders
+
+
+TIER_IMPROVEMENT_THRESHOLD = 1.08
+NUM_PAID_TIERS = 5
+
+
+def test_screening_counts_keeps_every_task_type():
+    counts = screening_counts({"relevancy": 30, "hallucination": 2, "attribution": 0}, 0.2)
+
+    assert counts == {"relevancy": 6, "hallucination": 1, "attribution": 0}
+
+
+def test_stratified_bounds_collapse_when_fully_evaluated():
+    rewards = {"relevancy": [0.2, 0.4], "hallucination": [1.0, 0.0, 1.0, 0.0]}
+    lower, upper = stratified_bounds(rewards, {"relevancy": 2, "hallucination": 4}, confidence=0.95)
+
+    assert lower == pytest.approx(upper)
+    assert lower == pytest.approx((0.6 + 2.0) / 6)
+
+
+def test_stratified_bounds_widen_for_unobserved_task_types():
+    rewards = {"relevancy": [0.5, 0.5, 0.5]}
+    lower, upper = stratified_bounds(rewards, {"relevancy": 10, "hallucination": 10}, confidence=0.95)
+
+    assert lower == pytest.approx(0.25)
+    assert upper == pytest.approx(0.75)
+
+
+def test_select_contenders_requires_a_chain_of_separated_tiers():
+    bounds = {i: (0.9 / 1.2 ** i, 0.9 / 1.2 ** i) for i in range(NUM_PAID_TIERS + 1)}
+    # overlaps with every other miner, so it can not be ruled out
+    bounds[10] = (0.0, 1.0)
+
+    contenders = select_contenders(bounds, NUM_PAID_TIERS, TIER_IMPROVEMENT_THRESHOLD)
+
+    assert sorted(contenders) == [0, 1, 2, 3, 4, 10]
+
+
+def exhaustive_tiers(means: dict[int, float]) -> dict[int, int]:
+    ranked = sorted(means.items(), key=lambda x: x[1], reverse=True)
+    tiers, last_tier_score, tier = {}, ranked[0][1], 0
+    for uid, score in ranked:
+        if last_tier_score > score * TIER_IMPROVEMENT_THRESHOLD:
+            last_tier_score = score
+            tier += 1
+        tiers[uid] = tier
+    return tiers
+
+
+def test_racing_keeps_paid_miners_with_fewer_evaluations():
+    rng = np.random.default_rng(0)
+    task_counts = {"relevancy": 30, "hallucination": 30, "attribution": 30, "summary_completeness": 30}
+    screening = screening_counts(task_counts, 0.3)
+
+    # a few clearly separated leaders and a long tail of weak miners
+    num_miners = 40
+    quality = np.concatenate([0.9 / 1.25 ** np.arange(6), rng.uniform(0.02, 0.2, size=num_miners - 6)])
+    rewards = {
+        uid: {
+            task: np.clip(rng.normal(quality[uid], 0.1, size=n), 0, 1).tolist() 
+            for task, n in task_counts.items()
+        }
+        for uid in range(num_miners)
+    }
+
+    means = {uid: np.mean([r for task in rewards[uid].values() for r in task]) for uid in rewards}
+    paid = {uid for uid, tier in exhaustive_tiers(means).items() if tier < NUM_PAID_TIERS}
+
+    bounds = {
+        uid: stratified_bounds(
+            {task: r[:screening[task]] for task, r in rewards[uid].items()}, task_counts, confidence=0.95
+        )
+        for uid in rewards
+    }
+    contenders = select_contenders(bounds, NUM_PAID_TIERS, TIER_IMPROVEMENT_THRESHOLD)
+
+    evaluated = num_miners * sum(screening.values()) + len(contenders) * sum(
+        task_counts[task] - screening[task] for task in task_counts
+    )
+    assert paid <= set(contenders)
+    assert evaluated < 0.7 * num_miners * sum(task_counts.values())
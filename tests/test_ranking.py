@@ -0,0 +1,24 @@
+import random
+from deval.ranking import IncrementalRanking
+
+
+def test_ranking_matches_a_full_sort_after_updates():
+    rng = random.Random(0)
+    scores = {uid: rng.random() for uid in range(50)}
+    ranking = IncrementalRanking(scores)
+
+    for _ in range(200):
+        uid = rng.randrange(60)
+        scores[uid] = rng.choice([0.0, rng.random()])
+        ranking.update(uid, scores[uid])
+
+    expected = sorted(((uid, s) for uid, s in scores.items() if s > 0), key=lambda x: x[1], reverse=True)
+    assert ranking.ranked() == expected
+
+
+def test_removed_miners_are_not_ranked():
+    ranking = IncrementalRanking({1: 0.5, 2: 0.7})
+    ranking.remove(2)
+    ranking.remove(3)
+
+    assert ranking.ranked() == [(1, 0.5)]
@@ -0,0 +1,32 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+from deval.llms.router import LLMRouter
+
+
+LLMS = [SimpleNamespace(model_id=model_id) for model_id in ("fast", "slow", "broken")]
+LATENCY = {"fast": 1.0, "slow": 8.0, "broken": 1.0}
+
+
+def simulate(router: LLMRouter, num_tasks: int) -> Counter:
+    rng = random.Random(0)
+    picks = Counter()
+    for _ in range(num_tasks):
+        llm = router.select(LLMS, rng)
+        picks[llm.model_id] += 1
+        router.record(llm, LATENCY[llm.model_id], success=llm.model_id != "broken")
+    return picks
+
+
+def test_router_prefers_fast_healthy_models():
+    picks = simulate(LLMRouter(), 400)
+
+    assert picks["fast"] > picks["slow"] > picks["broken"]
+    assert min(picks.values()) > 0
+
+
+def test_router_keeps_models_below_the_max_share():
+    picks = simulate(LLMRouter(exploration=0.0, max_share=0.5), 400)
+
+    assert picks["fast"] <= 201
+    assert picks["slow"] > 100
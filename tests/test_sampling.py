@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+from deval.sampling import RunningStats, AdaptiveSampler
+
+
+def make_sampler(**kwargs) -> AdaptiveSampler:
+    defaults = dict(
+        min_samples=5, 
+        max_samples=None, 
+        confidence=0.95, 
+        num_paid_tiers=2, 
+        tier_improvement_threshold=1.08,
+    )
+    return AdaptiveSampler(**{**defaults, **kwargs})
+
+
+def test_running_stats_match_numpy():
+    rewards = np.random.default_rng(0).uniform(size=50)
+    stats = RunningStats.from_rewards(rewards.tolist())
+
+    assert stats.count == 50
+    assert stats.mean == pytest.approx(rewards.mean())
+    assert stats.variance == pytest.approx(rewards.var(ddof=1))
+
+
+def test_sampler_respects_min_and_max_samples():
+    stats = RunningStats.from_rewards([0.1] * 3)
+    leaderboard = {1: (0.9, 0.95)}
+
+    assert make_sampler().should_stop(stats, 30, leaderboard)[0] is False
+    assert make_sampler(max_samples=3).should_stop(stats, 30, leaderboard)[0] is True
+
+
+def test_sampler_stops_once_tier_is_fixed():
+    stats = RunningStats.from_rewards([0.9, 0.92, 0.88, 0.91, 0.9, 0.89])
+
+    should_stop, reason = make_sampler().should_stop(stats, 30, {1: (0.4, 0.5), 2: (0.2, 0.3)})
+
+    assert should_stop
+    assert "tier fixed" in reason
+
+
+def test_sampler_stops_below_paid_tiers():
+    stats = RunningStats.from_rewards([0.1, 0.12, 0.08, 0.11, 0.1, 0.09])
+    # overlaps with uid 3, but two separated tiers are certainly above it
+    leaderboard = {1: (0.8, 0.85), 2: (0.4, 0.45), 3: (0.05, 0.15)}
+
+    should_stop, reason = make_sampler().should_stop(stats, 30, leaderboard)
+
+    assert should_stop
+    assert "paid tier" in reason
+
+
+def test_sampler_continues_when_rank_is_uncertain():
+    stats = RunningStats.from_rewards([0.5, 0.9, 0.1, 0.7, 0.3, 0.6])
+
+    assert make_sampler().should_stop(stats, 30, {1: (0.45, 0.55)}) == (False, "tier uncertain")
@@ -0,0 +1,20 @@
+from deval.scheduling import prioritize_miners, follow_schedule
+
+
+MINERS = [(1, "a"), (2, "b"), (3, "c"), (4, "d"), (5, "e")]
+
+
+def test_tier_holders_then_fresh_miners_then_unchanged_by_score():
+    scores = {1: 0.1, 2: 0.5, 3: 0.0, 4: 0.3, 5: 0.9}
+
+    order = prioritize_miners(MINERS, scores, tier_holders={4, 5}, fresh={(3, "c")})
+
+    assert order == [(5, "e"), (4, "d"), (3, "c"), (2, "b"), (1, "a")]
+
+
+def test_resumed_epoch_follows_the_saved_schedule():
+    schedule = [(5, "e"), (4, "d"), (3, "c"), (2, "b"), (1, "a")]
+    # miner 4 was evaluated before the restart and miner 6 registered since
+    remaining = [(1, "a"), (6, "f"), (2, "b"), (3, "c"), (5, "e")]
+
+    assert follow_schedule(schedule, remaining) == [(5, "e"), (3, "c"), (2, "b"), (1, "a"), (6, "f")]
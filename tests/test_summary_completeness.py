@@ -0,0 +1,99 @@
+import json
+import threading
+from deval.llms.base_llm import BaseLLM
+from deval.llms.config import LLMAPIs, LLMArgs, LLMFormatType
+from deval.tasks.context import Context
+from deval.tasks.summary_completeness.summary_wikipedia import CompletenessWikipediaTask
+
+
+TOPICS = [f"topic {i}" for i in range(5)]
+
+
+class FakeLLM(BaseLLM):
+    """Answers the topic extraction and summary calls, optionally leaving topics out of the combined call."""
+
+    def __init__(self, summarized_topics: list[str] | None = None, malformed: bool = False):
+        super().__init__(LLMAPIs.OPENAI, "fake", LLMArgs(format=LLMFormatType.TEXT))
+        self.summarized_topics = TOPICS if summarized_topics is None else summarized_topics
+        self.malformed = malformed
+        self.lock = threading.Lock()
+        self.prompts = []
+        self.max_tokens = []
+
+    def query(self, prompt: str, system_prompt: str, tool_schema: dict | None = None, max_tokens: int | None = None):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.max_tokens.append(max_tokens)
+        if tool_schema is None:
+            topic = prompt.split("# Topic:\n", 1)[1].split("\n", 1)[0]
+            return f"summary of {topic}"
+
+        properties = tool_schema["function"]["parameters"]["properties"]
+        if "key_topics" in properties:
+            return json.dumps({"key_topics": TOPICS})
+        if self.malformed:
+            return '{"summaries": [{"topic": "topic 0"'
+        return json.dumps({"summaries": [{"topic": t, "summary": f"summary of {t}"} for t in self.summarized_topics]})
+
+    def forward(self, messages):
+        ...
+
+    def parse_response(self, output) -> str:
+        return output
+
+    def load(self):
+        return None
+
+
+def make_context() -> Context:
+    return Context(
+        title="Article",
+        topic="All Sections",
+        subtopic=None,
+        content="The article content.",
+        internal_links=[],
+        external_links=[],
+        source="Wikipedia",
+        sections={},
+        tags=[],
+        extra={},
+        stats={},
+    )
+
+
+def summaries(task: CompletenessWikipediaTask) -> set[str]:
+    return set(task.reference_true_values + task.reference_mistakes)
+
+
+def test_all_summaries_come_from_one_call():
+    llm = FakeLLM()
+    task = CompletenessWikipediaTask(llm, make_context())
+
+    assert len(llm.prompts) == 2
+    assert llm.max_tokens[1] >= 5 * 100
+    assert summaries(task) == {f"summary of {t}" for t in TOPICS}
+
+
+def test_topics_missing_from_the_combined_call_are_summarized_separately():
+    llm = FakeLLM(summarized_topics=TOPICS[:3])
+    task = CompletenessWikipediaTask(llm, make_context())
+
+    assert len(llm.prompts) == 2 + 2
+    assert summaries(task) == {f"summary of {t}" for t in TOPICS}
+
+
+def test_unparseable_combined_call_falls_back_to_one_call_per_topic():
+    llm = FakeLLM(malformed=True)
+    task = CompletenessWikipediaTask(llm, make_context())
+
+    assert len(llm.prompts) == 2 + len(TOPICS)
+    assert summaries(task) == {f"summary of {t}" for t in TOPICS}
+
+
+def test_per_topic_mode_skips_the_combined_call(monkeypatch):
+    monkeypatch.setattr(CompletenessWikipediaTask, "single_call_summaries", False)
+    llm = FakeLLM()
+    task = CompletenessWikipediaTask(llm, make_context())
+
+    assert len(llm.prompts) == 1 + len(TOPICS)
+    assert summaries(task) == {f"summary of {t}" for t in TOPICS}
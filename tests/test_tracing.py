@@ -0,0 +1,55 @@
+import pytest
+from deval.utils.tracing import Tracer, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(1, 5, 10))
+    for value in (0.5, 2, 7, 20):
+        histogram.observe(value)
+
+    assert histogram.bucket_counts == [1, 2, 3]
+    assert histogram.count == 4
+    assert histogram.total == pytest.approx(29.5)
+    assert histogram.max == 20
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+
+    @tracer.timed("decorated")
+    def work():
+        return 1
+
+    with tracer.span("stage", uid=1):
+        pass
+
+    assert work() == 1
+    assert tracer.summary() == {"stages": {}, "stages_by_uid": {}}
+
+
+def test_enabled_tracer_aggregates_by_stage_and_uid():
+    tracer = Tracer(enabled=True)
+
+    @tracer.timed("decorated")
+    def work():
+        return 1
+
+    for uid in (1, 1, 2):
+        with tracer.span("inference", uid=uid):
+            pass
+    work()
+
+    summary = tracer.summary()
+    assert summary["stages"]["inference"]["count"] == 3
+    assert summary["stages"]["decorated"]["count"] == 1
+    assert summary["stages_by_uid"]["inference/1"]["count"] == 2
+    assert summary["stages_by_uid"]["inference/2"]["count"] == 1
+
+
+def test_prometheus_text():
+    tracer = Tracer(enabled=True, buckets=(1,))
+    tracer.observe("hashing", 0.5, uid=3)
+
+    text = tracer.prometheus_text()
+    assert 'deval_stage_seconds_bucket{stage="hashing",le="1"} 1' in text
+    assert 'deval_stage_seconds_count{stage="hashing",uid="3"} 1' in text
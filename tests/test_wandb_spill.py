@@ -0,0 +1,21 @@
+import json
+from types import SimpleNamespace
+from deval.base.validator import BaseValidatorNeuron
+from deval.utils.logging import WandBLogger
+
+
+def test_spilled_events_survive_the_epoch_reset(tmp_path):
+    config = SimpleNamespace(
+        wandb=SimpleNamespace(off=False, queue_size=10, batch_size=5),
+        neuron=SimpleNamespace(full_path=str(tmp_path)),
+    )
+    logger = WandBLogger("hotkey", 15, [], config=config)
+    logger.spill([{"uid": 1, "reward": 0.5}])
+    (tmp_path / "state.pt").write_text("")
+    (tmp_path / "weights.pt").write_text("")
+
+    BaseValidatorNeuron.reset(SimpleNamespace(config=config))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["wandb_spill.jsonl", "weights.pt"]
+    events = [json.loads(line) for line in open(logger.spill_path)]
+    assert events == [{"uid": 1, "reward": 0.5}]
@@ -0,0 +1,59 @@
+import pytest
+from types import SimpleNamespace
+from deval.tools.datasets.wiki import (
+    index_sections,
+    process_page,
+    most_relevant_links,
+)
+
+
+CONTENT = """Intro text.
+
+== History ==
+Some history here.
+
+=== Early years ===
+Early years content.
+
+== Legacy ==
+
+== See also ==
+Other pages
+"""
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("History", "Some history here."),
+        ("Early years", "Early years content."),
+        ("Legacy", ""),
+        ("See also", "Other pages"),
+    ],
+)
+def test_index_sections(title, expected):
+    assert index_sections(CONTENT)[title] == expected
+
+
+def test_process_page_uses_section_index():
+    page = SimpleNamespace(
+        content=CONTENT,
+        sections=["History", "Early years", "Legacy", "See also"],
+    )
+    sections = process_page(page, valid_header=lambda x: x != "Legacy")
+
+    assert sections == {
+        ("", "History"): ["Some history here."],
+        ("", "Early years"): ["Early years content."],
+    }
+
+
+def test_most_relevant_links():
+    page = SimpleNamespace(
+        summary="the cat sat on the mat",
+        links=["dog park", "cat dog", "mat", "the sat"],
+    )
+    links = most_relevant_links(page, num_links=3, return_scores=True)
+
+    assert [link for link, _ in links] == ["mat", "the sat", "cat dog"]
+    assert links[0][1] == pytest.approx(1 / 5)